@@ -0,0 +1,66 @@
+"""Benchmark the CSV serialization paths on the bundled training set.
+
+Run with `uv run python benchmarks/csv_serialization.py`.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from tabpfn_common_utils.utils import serialize_to_csv_formatted_bytes
+
+
+DATASETS = Path(__file__).resolve().parent.parent / "datasets"
+
+
+def measure(fn: Callable[[], bytes], repeats: int = 10) -> tuple[float, int]:
+    """Return the best wall time in seconds over `repeats` runs and the size."""
+    best = float("inf")
+    size = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        size = len(fn())
+        best = min(best, time.perf_counter() - start)
+    return best, size
+
+
+def main() -> None:
+    frame = pd.read_csv(DATASETS / "X_train.csv")
+    x_train = frame.to_numpy()
+
+    cases = {
+        "pandas to_csv": lambda: frame.to_csv(index=False).encode(),
+        "pandas float_format=%.6g": lambda: frame.to_csv(
+            index=False, float_format="%.6g"
+        ).encode(),
+        "ndarray (C order)": lambda: serialize_to_csv_formatted_bytes(x_train),
+        "ndarray (F order)": lambda: serialize_to_csv_formatted_bytes(
+            np.asfortranarray(x_train)
+        ),
+        "DataFrame": lambda: serialize_to_csv_formatted_bytes(frame),
+        "DataFrame float_precision=7": lambda: serialize_to_csv_formatted_bytes(
+            frame, float_precision=7
+        ),
+        "DataFrame float_precision=6": lambda: serialize_to_csv_formatted_bytes(
+            frame, float_precision=6
+        ),
+    }
+
+    print(f"X_train.csv: {x_train.shape[0]}x{x_train.shape[1]} {x_train.dtype}")
+    baseline = None
+    for name, fn in cases.items():
+        seconds, size = measure(fn)
+        baseline = baseline or seconds
+        print(
+            f"{name:<30} {seconds * 1e3:8.2f} ms {size / seconds / 1e6:8.1f} MB/s "
+            f"{size / x_train.size:6.2f} B/cell {baseline / seconds:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Benchmark every serialization format and option on bundled and synthetic data.
+
+For each dataset and case, records the payload size, the serialization and
+round-trip times (best of `--repeats` runs), the serialization throughput
+in MB of input per second and the peak memory traced while serializing.
+
+The cases cover every format, and vary one option at a time from the
+defaults: compression, precision, the CSV options, `n_jobs`, streaming with
+`iter_csv_formatted_bytes`, pooled buffers and cache hits. Options are not
+crossed with each other beyond parallel compression, as the full product
+would multiply the run time without showing more than the single axes.
+
+Results are written as JSON, and can be compared with an earlier run:
+
+    uv run python benchmarks/serialization_formats.py --output results.json
+    uv run python benchmarks/serialization_formats.py --compare results.json
+
+Synthetic datasets come from `get_dataset_with_specific_size`, their sizes
+are set with e.g. `--sizes 10000x100 100000x100`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from tabpfn_common_utils.serialization.arrow import _HAS_PYARROW
+from tabpfn_common_utils.serialization.cache import PayloadCache
+from tabpfn_common_utils.serialization.pool import BufferPool
+from tabpfn_common_utils.utils import (
+    deserialize_from_formatted_bytes,
+    get_dataset_with_specific_size,
+    iter_csv_formatted_bytes,
+    serialize_to_formatted_bytes,
+    serialize_to_pooled_buffer,
+)
+
+
+DATASETS = Path(__file__).resolve().parent.parent / "datasets"
+BUNDLED = ("X_train.csv", "X_test.csv", "X_train_small.csv")
+
+RESULTS_VERSION = 2
+
+
+def cases() -> Dict[str, Dict[str, Any]]:
+    """Return the options of every case.
+
+    The options are keyword arguments of `serialize_to_formatted_bytes`,
+    except for "serializer", which selects "iter_csv", "pooled" or "cached"
+    serialization instead, see `make_case`.
+    """
+    formats = ["csv", "binary"] + (["arrow"] if _HAS_PYARROW else [])
+    result: Dict[str, Dict[str, Any]] = {}
+    for format in formats:
+        result[format] = {"format": format}
+        for compression in ("gzip", "zlib", "lzma"):
+            result[f"{format} {compression}"] = {
+                "format": format,
+                "compression": compression,
+            }
+        for precision in ("float32", "float16"):
+            result[f"{format} precision={precision}"] = {
+                "format": format,
+                "precision": precision,
+            }
+        result[f"{format} gzip n_jobs=-1"] = {
+            "format": format,
+            "compression": "gzip",
+            "n_jobs": -1,
+        }
+        result[f"{format} cached"] = {"format": format, "serializer": "cached"}
+
+    result["csv float_precision=7"] = {"format": "csv", "float_precision": 7}
+    result["csv include_schema"] = {"format": "csv", "include_schema": True}
+    result["csv dictionary_encode"] = {"format": "csv", "dictionary_encode": True}
+    result["csv n_jobs=-1"] = {"format": "csv", "n_jobs": -1}
+    result["csv iter"] = {"format": "csv", "serializer": "iter_csv"}
+    for format in ("csv", "binary"):
+        result[f"{format} pooled"] = {"format": format, "serializer": "pooled"}
+    return result
+
+
+def datasets(sizes: List[str]) -> Dict[str, pd.DataFrame]:
+    """Load the bundled datasets and generate the synthetic ones."""
+    result = {name: pd.read_csv(DATASETS / name) for name in BUNDLED}
+    for size in sizes:
+        n_rows, n_columns = (int(n) for n in size.lower().split("x"))
+        x_train, _, _, _ = get_dataset_with_specific_size(n_rows, n_columns)
+        result[f"synthetic {size}"] = pd.DataFrame(x_train)
+    return result
+
+
+def best_time(fn: Callable[[], Any], repeats: int) -> float:
+    """Return the best wall time in seconds over `repeats` runs."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(fn: Callable[[], Any]) -> int:
+    """Return the peak number of bytes allocated while running `fn`."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def make_case(
+    frame: pd.DataFrame, options: Dict[str, Any]
+) -> Tuple[Callable[[], int], Callable[[], None]]:
+    """Return functions serializing `frame` as described by a case.
+
+    Returns:
+        A tuple of (a function serializing and returning the payload size,
+        a function serializing and deserializing).
+    """
+    options = dict(options)
+    serializer = options.pop("serializer", None)
+    format = options["format"]
+    compression = options.get("compression")
+
+    def deserialize(payload: Any) -> None:
+        deserialize_from_formatted_bytes(
+            payload, format=format, compression=compression
+        )
+
+    if serializer == "iter_csv":
+        del options["format"]
+
+        def serialize() -> int:
+            # Consume the chunks without joining them, like a request body
+            chunks = iter_csv_formatted_bytes(frame, **options)
+            return sum(len(chunk) for chunk in chunks)
+
+        def round_trip() -> None:
+            deserialize(b"".join(iter_csv_formatted_bytes(frame, **options)))
+
+        return serialize, round_trip
+
+    if serializer == "pooled":
+        pool = BufferPool()
+
+        def serialize() -> int:
+            view = serialize_to_pooled_buffer(frame, pool, **options)
+            size = len(view)
+            pool.release(view)
+            return size
+
+        def round_trip() -> None:
+            view = serialize_to_pooled_buffer(frame, pool, **options)
+            # Decoded binary columns are views of the buffer, drop them first
+            deserialize(view)
+            pool.release(view)
+
+        return serialize, round_trip
+
+    if serializer == "cached":
+        # Measures cache hits, the first serialization fills the cache
+        options["cache"] = PayloadCache()
+    elif serializer is not None:
+        raise ValueError(f"Unknown serializer: {serializer}")
+
+    def serialize() -> int:
+        return len(serialize_to_formatted_bytes(frame, **options))
+
+    def round_trip() -> None:
+        deserialize(serialize_to_formatted_bytes(frame, **options))
+
+    return serialize, round_trip
+
+
+def run_case(frame: pd.DataFrame, options: Dict[str, Any], repeats: int) -> Dict:
+    """Measure a single case on a single dataset."""
+    serialize, round_trip = make_case(frame, options)
+    # Also warms up pools and caches
+    payload_bytes = serialize()
+
+    serialize_s = best_time(serialize, repeats)
+    input_bytes = int(frame.memory_usage(index=False, deep=True).sum())
+    return {
+        "bytes": payload_bytes,
+        "input_bytes": input_bytes,
+        "serialize_s": serialize_s,
+        "serialize_mb_per_s": input_bytes / serialize_s / 1e6,
+        "round_trip_s": best_time(round_trip, repeats),
+        "peak_memory_bytes": peak_memory(serialize),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the versions the results were measured with."""
+    try:
+        version: Optional[str] = metadata.version("tabpfn-common-utils")
+    except metadata.PackageNotFoundError:
+        version = None
+    return {
+        "package_version": version,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def compare(results: List[Dict], baseline_path: Path) -> None:
+    """Print the change of every metric relative to an earlier run."""
+    baseline = json.loads(baseline_path.read_text())
+    previous = {(r["dataset"], r["case"]): r for r in baseline["results"]}
+    print(f"\nCompared to {baseline_path} ({baseline['environment']['timestamp']}):")
+    for result in results:
+        before = previous.get((result["dataset"], result["case"]))
+        if before is None:
+            continue
+        ratios = "  ".join(
+            f"{metric} {result[metric] / before[metric]:5.2f}x"
+            for metric in ("bytes", "serialize_s", "round_trip_s", "peak_memory_bytes")
+            if before[metric]
+        )
+        print(f"{result['dataset']:<22} {result['case']:<26} {ratios}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        nargs="*",
+        default=["10000x100"],
+        help="Synthetic dataset sizes, as ROWSxCOLUMNS.",
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Write the results to this file.")
+    parser.add_argument("--compare", type=Path, help="Results of an earlier run.")
+    args = parser.parse_args()
+
+    results = []
+    for dataset, frame in datasets(args.sizes).items():
+        print(f"{dataset}: {frame.shape[0]}x{frame.shape[1]}")
+        for case, options in cases().items():
+            result = {
+                "dataset": dataset,
+                "rows": frame.shape[0],
+                "columns": frame.shape[1],
+                "case": case,
+                "options": options,
+                **run_case(frame, options, args.repeats),
+            }
+            results.append(result)
+            print(
+                f"  {case:<26} {result['bytes'] / 1e6:9.3f} MB "
+                f"{result['serialize_s'] * 1e3:9.2f} ms "
+                f"{result['serialize_mb_per_s']:8.1f} MB/s "
+                f"round trip {result['round_trip_s'] * 1e3:9.2f} ms "
+                f"peak {result['peak_memory_bytes'] / 1e6:8.2f} MB"
+            )
+
+    report = {
+        "version": RESULTS_VERSION,
+        "environment": environment(),
+        "results": results,
+    }
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.compare is not None:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Framing shared by the binary payload formats.
+
+A payload starts with a fixed-size preamble of a 4-byte magic, a 2-byte
+version and the 4-byte length of the JSON header that follows it. The header
+and every buffer after it are padded to a multiple of `ALIGNMENT` bytes.
+
+This module has no dependencies, so formats can share it without importing
+NumPy or pandas.
+"""
+
+import struct
+
+# Buffers start at multiples of this many bytes
+ALIGNMENT = 8
+
+# Magic, version, two padding bytes and header length
+PREAMBLE = struct.Struct("<4sH2xI")
+
+
+def padded(size: int) -> int:
+    """Round a size up to the next multiple of `ALIGNMENT`.
+
+    Args:
+        size: The size in bytes.
+
+    Returns:
+        The padded size.
+    """
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+def padding(size: int) -> bytes:
+    """Get the zero bytes that pad a size to a multiple of `ALIGNMENT`.
+
+    Args:
+        size: The size in bytes.
+
+    Returns:
+        The padding bytes.
+    """
+    return b"\x00" * (padded(size) - size)
@@ -1,13 +1,40 @@
+import json
+import mmap
+
 import numpy as np
-from typing import Dict, Any, List
+from numpy.typing import ArrayLike
+from collections.abc import Mapping
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .framing import PREAMBLE, padded, padding
+
+QUANTILE_PREFIX = "quantile_"
+
+RESULT_MAGIC = b"TPFR"
+RESULT_VERSION = 1
+
+# Size of the temporary arrays of `RegressionPredictResult.sample`
+DEFAULT_SAMPLE_BYTES = 1 << 26
 
 
 class RegressionPredictResult:
+    """Predictions of a regressor: point estimates and quantiles per sample.
+
+    The quantiles are stored as `quantile_levels`, a sorted float array, and
+    `quantile_values`, a contiguous `(n_quantiles, n_samples)` array whose
+    rows follow the levels, so operations across quantiles are single NumPy
+    calls. `quantiles` is a read-only view of the rows by their original
+    "quantile_<level>" keys.
+
+    Results created from lists keep the original lists behind `quantiles`,
+    and only stack them into `quantile_values` when it is first accessed.
+    """
+
     def __init__(self, res: Dict[str, Any]):
         self.mean = res["mean"]
         self.median = res["median"]
         self.mode = res["mode"]
-        self.quantiles = {k: v for k, v in res.items() if k.startswith("quantile_")}
+        quantiles = {k: v for k, v in res.items() if k.startswith(QUANTILE_PREFIX)}
 
         # assume values are either all numpy arrays or lists
         if isinstance(self.mean, np.ndarray):
@@ -18,13 +45,213 @@ class RegressionPredictResult:
             raise ValueError(f"Invalid type for mean: {type(self.mean)}")
 
         # assert all values are of the same type
-        for val in [self.mean, self.median, self.mode, *self.quantiles.values()]:
+        for val in [self.mean, self.median, self.mode, *quantiles.values()]:
             assert isinstance(val, self._val_type)
 
+        keys = list(quantiles)
+        levels, _, rows = _sort_quantile_keys(keys)
+        if self._val_type is list:
+            self._set_quantiles(levels, None, rows, lists=quantiles)
+        else:
+            self._set_quantiles(
+                levels, _stack_rows(quantiles, rows, len(self.mean)), rows
+            )
+
+    def _set_quantiles(
+        self,
+        levels: np.ndarray,
+        values: Optional[np.ndarray],
+        rows: Dict[str, int],
+        lists: Optional[Dict[str, List]] = None,
+    ) -> None:
+        self.quantile_levels = levels
+        self._quantile_values = values
+        self.quantiles = _QuantileView(rows, values, lists)
+
+    @property
+    def quantile_values(self) -> np.ndarray:
+        """The quantiles of all samples, of shape `(n_quantiles, n_samples)`."""
+        if self._quantile_values is None:
+            self._quantile_values = _stack_rows(
+                self.quantiles, self.quantiles._rows, len(self.mean)
+            )
+        return self._quantile_values
+
     @property
     def val_type(self):
         return self._val_type
 
+    def quantile(self, levels: ArrayLike) -> np.ndarray:
+        """Interpolate the quantiles of every sample at arbitrary levels.
+
+        The quantiles are interpolated linearly between the stored levels,
+        after sorting the stored quantiles of every sample so that crossing
+        quantiles do not make the interpolation non-monotonic. Levels below
+        the lowest or above the highest stored level get the lowest or
+        highest stored quantile.
+
+        Args:
+            levels: A level, or an array of levels, between 0 and 1. NaN
+                levels are rejected.
+
+        Returns:
+            The quantiles, of shape `(n_samples,)` for a single level or
+            `(n_levels, n_samples)` for an array of levels.
+        """
+        levels = np.asarray(levels, dtype=np.float64)
+        if not np.all((levels >= 0) & (levels <= 1)):
+            raise ValueError("Quantile levels must be between 0 and 1")
+
+        values = self._sorted_quantile_values()
+        lower, upper, weights = self._grid_positions(levels.ravel())
+        weights = weights[:, np.newaxis]
+        result = values[lower] * (1 - weights) + values[upper] * weights
+        return result.reshape(levels.shape + values.shape[1:])
+
+    def cdf(self, y: ArrayLike) -> np.ndarray:
+        """Evaluate the cumulative distribution function of every sample.
+
+        This is the inverse of `quantile`: the level is interpolated linearly
+        between the sorted stored quantiles. Below the lowest stored quantile
+        it is 0, from the highest stored quantile on it is 1.
+
+        Args:
+            y: The values to evaluate at, a scalar or an array of one value
+                per sample.
+
+        Returns:
+            The probabilities of the samples being at most `y`, of shape
+            `(n_samples,)`, NaN where `y` is NaN.
+        """
+        values = self._sorted_quantile_values()
+        y = np.broadcast_to(np.asarray(y, dtype=np.float64), values.shape[1:])
+
+        # The first stored quantile above y, per sample
+        upper = np.count_nonzero(values <= y, axis=0)
+        inside = (upper > 0) & (upper < len(values))
+        lower = np.maximum(upper - 1, 0)
+        upper = np.minimum(upper, len(values) - 1)
+
+        columns = np.arange(values.shape[1])
+        lower_values = values[lower, columns]
+        upper_values = values[upper, columns]
+        # Inside the grid, lower_values <= y < upper_values
+        width = np.where(inside, upper_values - lower_values, 1)
+        weights = np.where(inside, (y - lower_values) / width, 0)
+
+        levels = self.quantile_levels
+        result = levels[lower] + (levels[upper] - levels[lower]) * weights
+        result = np.where(y < values[0], 0.0, result)
+        result = np.where(y >= values[-1], 1.0, result)
+        return np.where(np.isnan(y), np.nan, result)
+
+    def interval(self, confidence: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the central interval of every sample with the given coverage.
+
+        Args:
+            confidence: The probability mass inside the interval, e.g. 0.9
+                for the interval from the 0.05 to the 0.95 quantile.
+
+        Returns:
+            The lower and upper bounds, each of shape `(n_samples,)`.
+        """
+        if not 0 <= confidence <= 1:
+            raise ValueError(f"confidence must be between 0 and 1, got {confidence}")
+        lower, upper = self.quantile([(1 - confidence) / 2, (1 + confidence) / 2])
+        return lower, upper
+
+    def prob_between(self, a: ArrayLike, b: ArrayLike) -> np.ndarray:
+        """Get the probability of every sample being between `a` and `b`.
+
+        Args:
+            a: The lower bounds, a scalar or an array of one per sample.
+            b: The upper bounds, a scalar or an array of one per sample.
+
+        Returns:
+            The probabilities, of shape `(n_samples,)`. They are 0 where `b`
+            is below `a`.
+        """
+        return np.maximum(self.cdf(b) - self.cdf(a), 0.0)
+
+    def sample(
+        self,
+        n: int,
+        rng: Optional[Union[int, np.random.Generator]] = None,
+        max_bytes: int = DEFAULT_SAMPLE_BYTES,
+    ) -> np.ndarray:
+        """Draw samples from the predictive distribution of every sample.
+
+        Uses inverse transform sampling: uniform levels are drawn and mapped
+        to values by `quantile`, so the samples follow the distribution
+        described by `cdf`, including its point masses at the outermost
+        stored quantiles.
+
+        The draws are computed in chunks, so that the temporary arrays of a
+        chunk take at most about `max_bytes`. The chunking does not change the
+        result: the same generator gives the same samples for any budget.
+
+        Args:
+            n: The number of draws per sample.
+            rng: The random generator, or a seed for `np.random.default_rng`.
+            max_bytes: The approximate size of the temporary arrays.
+
+        Returns:
+            The draws, of shape `(n_samples, n)`.
+        """
+        if n < 0:
+            raise ValueError(f"n must not be negative, got {n}")
+
+        rng = np.random.default_rng(rng)
+        values = self._sorted_quantile_values()
+        n_samples = values.shape[1]
+        result = np.empty((n_samples, n))
+        # At most seven temporary 8-byte arrays of a chunk's shape are alive at
+        # once (levels, positions, lower and upper rows, weights and the two
+        # gathered values), so a chunk takes at most 56 bytes per cell
+        chunk = max(1, max_bytes // (56 * max(n_samples, 1)))
+        columns = np.arange(n_samples)
+
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            # Levels are drawn draw by draw, so chunks continue the same stream
+            levels = rng.random((stop - start, n_samples))
+            result[:, start:stop] = self._draw_chunk(values, levels, columns).T
+            # Free the levels before the next chunk allocates its own
+            del levels
+        return result
+
+    def _draw_chunk(
+        self, values: np.ndarray, levels: np.ndarray, columns: np.ndarray
+    ) -> np.ndarray:
+        # Interpolates in place, so that the temporaries of a chunk are freed
+        # when it returns
+        lower, upper, weights = self._grid_positions(levels)
+        draws = values[lower, columns]
+        draws *= 1 - weights
+        upper_values = values[upper, columns]
+        upper_values *= weights
+        draws += upper_values
+        return draws
+
+    def _grid_positions(
+        self, levels: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # The rows of the stored quantiles around each level, and the weight
+        # of the upper one, clamped to the outermost rows
+        positions = np.interp(
+            levels, self.quantile_levels, np.arange(len(self.quantile_levels))
+        )
+        lower = np.floor(positions).astype(np.intp)
+        upper = lower + 1
+        np.minimum(upper, len(self.quantile_levels) - 1, out=upper)
+        positions -= lower
+        return lower, upper, positions
+
+    def _sorted_quantile_values(self) -> np.ndarray:
+        if len(self.quantile_levels) == 0:
+            raise ValueError("The result has no quantiles")
+        return np.sort(self.quantile_values.astype(np.float64), axis=0)
+
     @staticmethod
     def to_basic_representation(res: "RegressionPredictResult") -> Dict[str, List]:
         if res.val_type is list:
@@ -45,16 +272,329 @@ class RegressionPredictResult:
         }
 
     @staticmethod
-    def from_basic_representation(basic_repr: Dict[str, List]) -> Dict[str, np.ndarray]:
-        deserialize_fn = np.array
+    def from_basic_representation(
+        basic_repr: Dict[str, List],
+    ) -> Mapping[str, np.ndarray]:
+        """Convert the output of `to_basic_representation` back to arrays.
 
-        return {
-            "mean": deserialize_fn(basic_repr["mean"]),
-            "median": deserialize_fn(basic_repr["median"]),
-            "mode": deserialize_fn(basic_repr["mode"]),
-            **{
-                k: deserialize_fn(v)
-                for k, v in basic_repr.items()
-                if k.startswith("quantile_")
-            },
+        The conversion is lazy: each value is converted to an array on first
+        access and then cached, so values that are never read are never
+        converted.
+
+        Args:
+            basic_repr: The basic representation of a result.
+
+        Returns:
+            A read-only mapping of "mean", "median", "mode" and the
+            "quantile_<level>" keys to arrays.
+        """
+        return _LazyArrays(basic_repr)
+
+    @staticmethod
+    def to_bytes(res: "RegressionPredictResult") -> bytes:
+        """Serialize a result to a compact binary representation.
+
+        The representation consists of a JSON header, with the quantile keys
+        and the dtype and offset of every array, followed by the raw
+        little-endian buffers of mean, median, mode and the quantile values.
+
+        Args:
+            res: The result to serialize.
+
+        Returns:
+            The serialized bytes, to be read by `from_bytes`.
+        """
+        arrays = {
+            "mean": res.mean,
+            "median": res.median,
+            "mode": res.mode,
+            "quantile_values": res.quantile_values,
         }
+
+        entries = []
+        buffers = []
+        offset = 0
+        for name, values in arrays.items():
+            values = np.asarray(values)
+            values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+            entries.append(
+                {
+                    "name": name,
+                    "dtype": values.dtype.str,
+                    "shape": list(values.shape),
+                    "offset": offset,
+                }
+            )
+            buffers.append(values)
+            offset += padded(values.nbytes)
+
+        header = {"quantile_keys": list(res.quantiles), "arrays": entries}
+        encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+        parts: List[Union[bytes, memoryview]] = [
+            PREAMBLE.pack(RESULT_MAGIC, RESULT_VERSION, len(encoded)),
+            encoded,
+            padding(PREAMBLE.size + len(encoded)),
+        ]
+        for values in buffers:
+            parts.append(values.view(np.uint8).data)
+            parts.append(padding(values.nbytes))
+
+        return b"".join(parts)
+
+    @staticmethod
+    def from_bytes(
+        buffer: Union[bytes, bytearray, memoryview, mmap.mmap],
+    ) -> "RegressionPredictResult":
+        """Deserialize a result from the output of `to_bytes`.
+
+        The arrays are views over `buffer`, no values are copied. They are
+        read-only if `buffer` is.
+
+        Args:
+            buffer: The serialized bytes.
+
+        Returns:
+            The deserialized result, holding numpy arrays.
+        """
+        view = memoryview(buffer)
+        if len(view) < PREAMBLE.size:
+            raise ValueError("Buffer is too short to be a serialized result")
+        magic, version, header_length = PREAMBLE.unpack_from(view)
+        if magic != RESULT_MAGIC:
+            raise ValueError("Buffer is not a serialized result")
+        if version > RESULT_VERSION:
+            raise ValueError(f"Unsupported result version: {version}")
+
+        header_end = PREAMBLE.size + header_length
+        header = json.loads(bytes(view[PREAMBLE.size : header_end]))
+        data_start = padded(header_end)
+
+        arrays = {}
+        for entry in header["arrays"]:
+            dtype = np.dtype(entry["dtype"])
+            shape = tuple(entry["shape"])
+            arrays[entry["name"]] = np.frombuffer(
+                buffer,
+                dtype=dtype,
+                count=int(np.prod(shape)),
+                offset=data_start + entry["offset"],
+            ).reshape(shape)
+
+        # Sorting the keys again gives the rows they were serialized with
+        levels, _, rows = _sort_quantile_keys(header["quantile_keys"])
+        return RegressionPredictResult._from_arrays(
+            arrays["mean"],
+            arrays["median"],
+            arrays["mode"],
+            levels,
+            arrays["quantile_values"],
+            rows,
+        )
+
+    @staticmethod
+    def concat(
+        results: Sequence["RegressionPredictResult"],
+    ) -> "RegressionPredictResult":
+        """Concatenate the samples of several results, e.g. of batches.
+
+        Every field is allocated once for all samples and filled with one
+        copy per result.
+
+        Args:
+            results: The results, all with the same quantile keys.
+
+        Returns:
+            A result holding numpy arrays, with the quantile keys in the
+            order of the first result.
+        """
+        if not results:
+            raise ValueError("No results to concatenate")
+
+        first = results[0].quantiles
+        keys = set(first)
+        for res in results[1:]:
+            if set(res.quantiles) != keys:
+                raise ValueError(
+                    "Cannot concatenate results with different quantile keys: "
+                    f"{sorted(keys)} and {sorted(res.quantiles)}"
+                )
+
+        # The keys by row of the first result
+        row_keys = sorted(first, key=first._rows.__getitem__)
+        n_samples = sum(len(res) for res in results)
+
+        fields = {}
+        for name in ("mean", "median", "mode"):
+            arrays = [np.asarray(getattr(res, name)) for res in results]
+            fields[name] = np.concatenate(arrays)
+        values = np.empty(
+            (len(row_keys), n_samples),
+            dtype=np.result_type(*(res.quantile_values for res in results)),
+        )
+
+        start = 0
+        for res in results:
+            stop = start + len(res)
+            rows = [res.quantiles._rows[k] for k in row_keys]
+            if rows == sorted(rows):
+                values[:, start:stop] = res.quantile_values
+            else:
+                values[:, start:stop] = res.quantile_values[rows]
+            start = stop
+
+        return RegressionPredictResult._from_arrays(
+            fields["mean"],
+            fields["median"],
+            fields["mode"],
+            results[0].quantile_levels,
+            values,
+            first._rows,
+        )
+
+    def __len__(self) -> int:
+        return len(self.mean)
+
+    def __getitem__(self, key: Union[int, slice]) -> "RegressionPredictResult":
+        """Select samples, as views of the arrays of this result.
+
+        Args:
+            key: A slice of samples, or the index of a single sample, which
+                gives a result of one sample.
+
+        Returns:
+            A result of the same value type holding the selected samples.
+            Arrays are views, lists are copies.
+        """
+        if isinstance(key, (int, np.integer)):
+            # Raises IndexError for indices out of range
+            index = range(len(self))[key]
+            key = slice(index, index + 1)
+        elif not isinstance(key, slice):
+            raise TypeError(f"Results are indexed by int or slice, not {type(key)}")
+
+        values = None
+        lists = None
+        if self._val_type is list:
+            lists = {k: v[key] for k, v in self.quantiles.items()}
+        else:
+            values = self.quantile_values[:, key]
+        return RegressionPredictResult._from_arrays(
+            self.mean[key],
+            self.median[key],
+            self.mode[key],
+            self.quantile_levels,
+            values,
+            self.quantiles._rows,
+            val_type=self._val_type,
+            lists=lists,
+        )
+
+    @staticmethod
+    def _from_arrays(
+        mean: Any,
+        median: Any,
+        mode: Any,
+        levels: np.ndarray,
+        values: Optional[np.ndarray],
+        rows: Dict[str, int],
+        val_type: type = np.ndarray,
+        lists: Optional[Dict[str, List]] = None,
+    ) -> "RegressionPredictResult":
+        # Create a result from fields already in the stored layout
+        res = RegressionPredictResult.__new__(RegressionPredictResult)
+        res.mean = mean
+        res.median = median
+        res.mode = mode
+        res._val_type = val_type
+        res._set_quantiles(levels, values, rows, lists=lists)
+        return res
+
+
+class _QuantileView(Mapping):
+    """The rows of the quantile values by their "quantile_<level>" keys.
+
+    Rows are returned as views of the values, or as the original lists if
+    the result was created from lists.
+    """
+
+    def __init__(
+        self,
+        rows: Dict[str, int],
+        values: Optional[np.ndarray],
+        lists: Optional[Dict[str, List]] = None,
+    ):
+        self._rows = rows
+        self._values = values
+        self._lists = lists
+
+    def __getitem__(self, key: str) -> Any:
+        if self._lists is not None:
+            return self._lists[key]
+        assert self._values is not None
+        return self._values[self._rows[key]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+class _LazyArrays(Mapping):
+    """Lists by key, converted to arrays on first access."""
+
+    def __init__(self, basic_repr: Dict[str, List]):
+        keys = ["mean", "median", "mode"]
+        missing = [k for k in keys if k not in basic_repr]
+        if missing:
+            raise KeyError(missing[0])
+
+        keys += [k for k in basic_repr if k.startswith(QUANTILE_PREFIX)]
+        self._lists = {k: basic_repr[k] for k in keys}
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        array = self._arrays.get(key)
+        if array is None:
+            array = self._arrays[key] = np.array(self._lists[key])
+        return array
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._lists)
+
+    def __len__(self) -> int:
+        return len(self._lists)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+def _stack_rows(quantiles: Mapping, rows: Dict[str, int], n_samples: int) -> np.ndarray:
+    # Stack the quantiles into one array, in the order of their rows
+    keys = sorted(rows, key=rows.__getitem__)
+    if not keys:
+        return np.empty((0, n_samples))
+    return np.stack([np.asarray(quantiles[k]) for k in keys])
+
+
+def _sort_quantile_keys(
+    keys: Sequence[str],
+) -> Tuple[np.ndarray, np.ndarray, Dict[str, int]]:
+    # The sorted levels, the order of the keys sorting them, and the row of
+    # the sorted quantile values of each key, in the original key order
+    levels = np.array([_parse_quantile_level(k) for k in keys], dtype=np.float64)
+    order = np.argsort(levels, kind="stable")
+    rows = np.empty(len(keys), dtype=np.intp)
+    rows[order] = np.arange(len(keys))
+    return levels[order], order, {k: int(row) for k, row in zip(keys, rows)}
+
+
+def _parse_quantile_level(key: str) -> float:
+    try:
+        return float(key[len(QUANTILE_PREFIX) :])
+    except ValueError:
+        raise ValueError(f"Invalid quantile key: {key!r}") from None
@@ -0,0 +1,172 @@
+"""Wire formats for sending tabular data between TabPFN components."""
+
+from __future__ import annotations
+
+from .adapters import (
+    InputConverter,
+    InputPredicate,
+    adapt_input,
+    register_input_adapter,
+    to_arrow_table,
+)
+from .arrow import decode_arrow_stream, encode_arrow_stream, read_arrow_schema
+from .binary import (
+    decode_binary_array,
+    decode_binary_frame,
+    decode_binary_sparse,
+    encode_binary_frame,
+    encode_binary_sparse,
+    read_binary_header,
+    read_binary_schema,
+)
+from .cache import (
+    CACHE_VERSION,
+    DEFAULT_CACHE_BYTES,
+    PayloadCache,
+    payload_cache_key,
+)
+from .chunks import (
+    DEFAULT_CHUNK_SIZE,
+    MANIFEST_VERSION,
+    ChunkInfo,
+    ChunkManifest,
+    upload_chunks,
+)
+from .columns import ColumnValues, encode_label, iter_columns
+from .compression import (
+    CONTENT_ENCODINGS,
+    DEFAULT_BLOCK_SIZE,
+    Compression,
+    compress_payload,
+    decompress_payload,
+)
+from .csv_format import (
+    MAX_FLOAT_PRECISION,
+    can_encode_csv_array,
+    can_encode_csv_dtype,
+    check_float_precision,
+    decode_csv_array,
+    decode_csv_frame,
+    encode_csv,
+    encode_csv_array,
+    encode_csv_dictionaries,
+    encode_csv_parallel,
+    encode_csv_schema,
+    format_csv_temporal_columns,
+    read_csv_schema,
+)
+from .delta import DeltaPayload, detect_append
+from .dictionary import (
+    CSV_DICTIONARY_PREAMBLE,
+    can_dictionary_encode,
+    code_dtype,
+    decode_dictionary,
+    encode_dictionary,
+)
+from .fingerprint import FINGERPRINT_VERSION, fingerprint_data, fingerprint_prefix
+from .formats import BufferReader, BytesLike, SerializationFormat, detect_format
+from .parallel import ParallelBackend, map_in_threads, resolve_n_jobs
+from .pool import MIN_BUFFER_SIZE, BufferPool, BufferWriter
+from .precision import FloatPrecision, PrecisionReport, reduce_precision
+from .schema import CSV_SCHEMA_PREAMBLE, SCHEMA_VERSION, FrameSchema
+from .sparse import (
+    DENSE_BLOCK_CELLS,
+    SparseMatrix,
+    as_row_sliceable,
+    is_sparse,
+    iter_dense_row_blocks,
+)
+from .streams import (
+    BinaryStream,
+    CompressingReader,
+    IterableReader,
+    PathReader,
+    UploadContent,
+    open_upload_content,
+)
+
+# Public exports
+__all__ = [
+    "BinaryStream",
+    "BufferPool",
+    "BufferReader",
+    "BufferWriter",
+    "BytesLike",
+    "CACHE_VERSION",
+    "CONTENT_ENCODINGS",
+    "CSV_DICTIONARY_PREAMBLE",
+    "CSV_SCHEMA_PREAMBLE",
+    "ChunkInfo",
+    "ChunkManifest",
+    "ColumnValues",
+    "CompressingReader",
+    "Compression",
+    "DEFAULT_BLOCK_SIZE",
+    "DEFAULT_CACHE_BYTES",
+    "DEFAULT_CHUNK_SIZE",
+    "DENSE_BLOCK_CELLS",
+    "DeltaPayload",
+    "FINGERPRINT_VERSION",
+    "FloatPrecision",
+    "FrameSchema",
+    "InputConverter",
+    "InputPredicate",
+    "IterableReader",
+    "MANIFEST_VERSION",
+    "MAX_FLOAT_PRECISION",
+    "MIN_BUFFER_SIZE",
+    "ParallelBackend",
+    "PathReader",
+    "PayloadCache",
+    "PrecisionReport",
+    "SCHEMA_VERSION",
+    "SerializationFormat",
+    "SparseMatrix",
+    "UploadContent",
+    "adapt_input",
+    "as_row_sliceable",
+    "can_dictionary_encode",
+    "can_encode_csv_array",
+    "can_encode_csv_dtype",
+    "check_float_precision",
+    "code_dtype",
+    "compress_payload",
+    "decode_arrow_stream",
+    "decode_binary_array",
+    "decode_binary_frame",
+    "decode_binary_sparse",
+    "decode_csv_array",
+    "decode_csv_frame",
+    "decode_dictionary",
+    "decompress_payload",
+    "detect_append",
+    "detect_format",
+    "encode_arrow_stream",
+    "encode_binary_frame",
+    "encode_binary_sparse",
+    "encode_csv",
+    "encode_csv_array",
+    "encode_csv_dictionaries",
+    "encode_csv_parallel",
+    "encode_csv_schema",
+    "encode_dictionary",
+    "encode_label",
+    "fingerprint_data",
+    "fingerprint_prefix",
+    "format_csv_temporal_columns",
+    "is_sparse",
+    "iter_columns",
+    "iter_dense_row_blocks",
+    "map_in_threads",
+    "open_upload_content",
+    "payload_cache_key",
+    "read_arrow_schema",
+    "read_binary_header",
+    "read_binary_schema",
+    "read_csv_schema",
+    "reduce_precision",
+    "register_input_adapter",
+    "resolve_n_jobs",
+    "to_arrow_table",
+    "upload_chunks",
+]
@@ -0,0 +1,111 @@
+"""Adapters turning other array and table libraries into serializable data.
+
+Inputs are converted to NumPy arrays or pandas DataFrames without copying
+their values wherever the source allows it:
+
+- Arrow tables and anything exporting the Arrow C stream interface, such
+  as polars frames, become DataFrames whose numeric columns are views over
+  the Arrow buffers (requires pyarrow).
+- Objects with `__dlpack__`, such as CPU torch tensors, become NumPy views.
+- Objects with `__array__` are converted by `np.asarray`.
+
+Further adapters can be added with `register_input_adapter`, they are
+tried before the built-in ones.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .arrow import _HAS_PYARROW
+from .sparse import is_sparse
+
+
+# Checks whether an adapter applies to an input, and converts the input
+InputPredicate = Callable[[Any], bool]
+InputConverter = Callable[[Any], Any]
+
+_INPUT_ADAPTERS: List[Tuple[InputPredicate, InputConverter]] = []
+
+
+def register_input_adapter(predicate: InputPredicate, convert: InputConverter) -> None:
+    """Register a conversion of a custom input type to serializable data.
+
+    Args:
+        predicate: Returns True for the inputs handled by the adapter.
+        convert: Converts such an input to a DataFrame, Series, NumPy array
+            or scipy.sparse matrix, ideally without copying its values.
+    """
+    _INPUT_ADAPTERS.insert(0, (predicate, convert))
+
+
+def adapt_input(data: Any) -> Any:
+    """Convert an input to data the serializers support.
+
+    Args:
+        data: The input to convert.
+
+    Returns:
+        `data` itself if it already is a DataFrame, Series, NumPy array or
+        scipy.sparse matrix or if no adapter applies, its conversion otherwise.
+    """
+    if isinstance(data, (pd.DataFrame, pd.Series, np.ndarray)) or is_sparse(data):
+        return data
+
+    for predicate, convert in _INPUT_ADAPTERS:
+        if predicate(data):
+            return convert(data)
+
+    table = to_arrow_table(data)
+    if table is not None:
+        # One block per column keeps numeric columns as views over Arrow
+        return table.to_pandas(split_blocks=True)
+
+    if hasattr(data, "__dlpack__"):
+        try:
+            return np.from_dlpack(data)
+        except (AttributeError, BufferError, RuntimeError, TypeError):
+            # E.g. tensors on a GPU or requiring grad, try `__array__` next
+            pass
+
+    if hasattr(data, "__array__"):
+        return np.asarray(data)
+
+    return data
+
+
+def to_arrow_table(data: Any) -> Optional[Any]:
+    """Get an input as an Arrow table, without copying it.
+
+    Args:
+        data: The input to convert.
+
+    Returns:
+        The `pyarrow.Table` if `data` is one, or exports the Arrow C stream
+        interface, or has a `to_arrow` method. None otherwise, or if pyarrow
+        is not installed.
+    """
+    if not _HAS_PYARROW or isinstance(data, (pd.DataFrame, pd.Series, np.ndarray)):
+        return None
+    import pyarrow as pa  # type: ignore[import-untyped]
+
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pa.RecordBatch):
+        return pa.Table.from_batches([data])
+
+    if hasattr(data, "__arrow_c_stream__"):
+        try:
+            return pa.table(data)
+        except pa.ArrowInvalid:
+            # A stream of a single column, like a polars Series
+            name = getattr(data, "name", None) or 0
+            return pa.table([pa.chunked_array(data)], names=[str(name)])
+
+    if hasattr(data, "to_arrow"):
+        return to_arrow_table(data.to_arrow())
+
+    return None
@@ -0,0 +1,123 @@
+"""Arrow IPC stream serialization, available when pyarrow is installed."""
+
+from __future__ import annotations
+
+import mmap
+from typing import Any, Union
+
+import numpy as np
+import pandas as pd
+
+from .schema import FrameSchema
+
+
+# Check if pyarrow is available
+# ruff: noqa: I001
+_HAS_PYARROW = False
+try:
+    import pyarrow  # type: ignore[import-untyped] # noqa: F401
+
+    _HAS_PYARROW = True
+except ImportError:
+    pass
+
+# Every Arrow IPC stream message starts with the continuation marker
+ARROW_STREAM_PREFIX = b"\xff\xff\xff\xff"
+
+
+def encode_arrow_stream(data: Union[pd.DataFrame, pd.Series, np.ndarray, Any]) -> bytes:
+    """Serialize data to an Arrow IPC stream.
+
+    Args:
+        data: The data to serialize, or a `pyarrow.Table` that is written as
+            it is.
+
+    Returns:
+        The Arrow IPC stream bytes.
+    """
+    _require_pyarrow()
+    import pyarrow as pa  # type: ignore[import-untyped]
+
+    table: Any
+    if isinstance(data, pa.Table):
+        table = data
+    else:
+        if isinstance(data, np.ndarray):
+            data = pd.DataFrame(data)
+        elif isinstance(data, pd.Series):
+            data = data.to_frame()
+        table = pa.Table.from_pandas(data, preserve_index=False)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    return sink.getvalue().to_pybytes()
+
+
+def decode_arrow_stream(
+    buffer: Union[bytes, bytearray, memoryview, mmap.mmap],
+) -> pd.DataFrame:
+    """Deserialize an Arrow IPC stream to a DataFrame.
+
+    Args:
+        buffer: The Arrow IPC stream bytes.
+
+    Returns:
+        The deserialized DataFrame.
+    """
+    _require_pyarrow()
+    import pyarrow as pa  # type: ignore[import-untyped]
+
+    with pa.ipc.open_stream(pa.py_buffer(buffer)) as reader:
+        table = reader.read_all()
+    return _restore_object_columns(table.to_pandas(), table.schema)
+
+
+def read_arrow_schema(
+    buffer: Union[bytes, bytearray, memoryview, mmap.mmap],
+) -> FrameSchema:
+    """Read the schema of an Arrow IPC stream, without reading its batches.
+
+    Args:
+        buffer: The Arrow IPC stream bytes.
+
+    Returns:
+        The schema of the DataFrame the stream is deserialized to.
+    """
+    _require_pyarrow()
+    import pyarrow as pa  # type: ignore[import-untyped]
+
+    with pa.ipc.open_stream(pa.py_buffer(buffer)) as reader:
+        schema = reader.schema
+    return FrameSchema.from_data(
+        _restore_object_columns(schema.empty_table().to_pandas(), schema)
+    )
+
+
+def _restore_object_columns(frame: pd.DataFrame, schema: Any) -> pd.DataFrame:
+    # pandas 3 reads Arrow strings as its string dtype, columns written from
+    # object columns are converted back using the pandas metadata
+    metadata = schema.pandas_metadata
+    if not metadata:
+        return frame
+    index_fields = {
+        column for column in metadata["index_columns"] if isinstance(column, str)
+    }
+    numpy_types = {
+        column["field_name"]: column["numpy_type"] for column in metadata["columns"]
+    }
+    fields = [name for name in schema.names if name not in index_fields]
+    for position, field in enumerate(fields):
+        values = frame.iloc[:, position]
+        if numpy_types.get(field) == "object" and values.dtype != np.dtype(object):
+            frame.isetitem(position, values.astype(object))
+    return frame
+
+
+def _require_pyarrow() -> None:
+    if not _HAS_PYARROW:
+        raise ImportError(
+            "The 'arrow' serialization format requires pyarrow. "
+            "Install it with `pip install pyarrow`."
+        )
@@ -0,0 +1,393 @@
+"""Self-describing binary columnar serialization.
+
+A payload consists of a fixed-size preamble, a JSON header describing the
+columns, and one raw little-endian buffer per column:
+
+    | magic (4) | version (2) | padding (2) | header length (4) |
+    | JSON header, padded to 8 bytes |
+    | column 0 buffer, padded to 8 bytes | column 1 buffer | ...
+
+Column offsets in the header are relative to the start of the first column
+buffer. Decoding wraps the column buffers with `np.frombuffer`, so no
+column data is copied.
+
+Sparse matrices (version 2) are stored in CSR or CSC form, with the
+`indptr`, `indices` and `data` arrays as the three buffers.
+
+Categorical, string and object columns (version 3) are dictionary-encoded:
+their buffer holds integer codes and their header entry the dictionary.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+from typing import Any, Dict, List, Optional, Tuple, Union, overload
+
+import numpy as np
+import pandas as pd
+import scipy.sparse
+
+from ..framing import PREAMBLE, padded, padding
+from .columns import ColumnValues, encode_label, iter_columns
+from .dictionary import can_dictionary_encode, decode_dictionary, encode_dictionary
+from .pool import BufferPool
+from .schema import FrameSchema
+from .sparse import SparseMatrix
+
+
+BINARY_MAGIC = b"TPFB"
+
+# Newest version that can be decoded, payloads are written with the oldest
+# version that supports their content
+BINARY_VERSION = 3
+_FRAME_VERSION = 1
+_SPARSE_VERSION = 2
+_DICTIONARY_VERSION = 3
+
+# Numpy dtype kinds that are stored as raw buffers
+_RAW_KINDS = "biufcmM"
+
+
+@overload
+def encode_binary_frame(
+    data: Union[pd.DataFrame, pd.Series, np.ndarray], pool: None = None
+) -> bytes: ...
+
+
+@overload
+def encode_binary_frame(
+    data: Union[pd.DataFrame, pd.Series, np.ndarray], pool: BufferPool
+) -> memoryview: ...
+
+
+def encode_binary_frame(
+    data: Union[pd.DataFrame, pd.Series, np.ndarray],
+    pool: Optional[BufferPool] = None,
+) -> Union[bytes, memoryview]:
+    """Serialize data to the binary columnar format.
+
+    Args:
+        data: The data to serialize. Arrays must have one or two dimensions.
+        pool: If given, the payload is written into a buffer of the pool
+            instead of a new bytes object.
+
+    Returns:
+        The serialized payload, or a view of it in a buffer of `pool`, to
+        be released with `BufferPool.release`.
+    """
+    n_rows = len(data)
+    columns: List[Dict[str, Any]] = []
+    buffers: List[np.ndarray] = []
+    offset = 0
+    version = _FRAME_VERSION
+
+    for name, values in iter_columns(data):
+        dictionary = None
+        if can_dictionary_encode(values):
+            values, dictionary = encode_dictionary(values)
+            version = max(version, _DICTIONARY_VERSION)
+        elif not isinstance(values, np.ndarray) or values.dtype.kind not in _RAW_KINDS:
+            raise TypeError(
+                f"Column {name!r} of dtype {values.dtype} is not supported "
+                "by the binary format"
+            )
+
+        # Columns of C ordered arrays stay strided, `_pack` copies them once
+        values = values.astype(values.dtype.newbyteorder("<"), copy=False)
+        column: Dict[str, Any] = {
+            "name": encode_label(name),
+            "dtype": values.dtype.str,
+            "offset": offset,
+            "nbytes": values.nbytes,
+        }
+        if dictionary is not None:
+            column["dictionary"] = dictionary
+        columns.append(column)
+        buffers.append(values)
+        offset += padded(values.nbytes)
+
+    return _pack(
+        {"n_rows": n_rows, "columns": columns}, buffers, version=version, pool=pool
+    )
+
+
+@overload
+def encode_binary_sparse(matrix: SparseMatrix, pool: None = None) -> bytes: ...
+
+
+@overload
+def encode_binary_sparse(matrix: SparseMatrix, pool: BufferPool) -> memoryview: ...
+
+
+def encode_binary_sparse(
+    matrix: SparseMatrix, pool: Optional[BufferPool] = None
+) -> Union[bytes, memoryview]:
+    """Serialize a sparse matrix to the binary format, without densifying it.
+
+    CSC matrices are stored as they are, every other format as CSR.
+
+    Args:
+        matrix: The scipy.sparse matrix or array to serialize.
+        pool: If given, the payload is written into a buffer of the pool,
+            see `encode_binary_frame`.
+
+    Returns:
+        The serialized payload, or a view of it in a buffer of `pool`.
+    """
+    if matrix.format not in ("csr", "csc"):
+        matrix = matrix.tocsr()
+    if matrix.data.dtype.kind not in _RAW_KINDS:
+        raise TypeError(
+            f"Sparse values of dtype {matrix.data.dtype} are not supported "
+            "by the binary format"
+        )
+
+    buffers = []
+    arrays = []
+    offset = 0
+    for name in ("indptr", "indices", "data"):
+        values = getattr(matrix, name)
+        values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+        arrays.append(
+            {
+                "name": name,
+                "dtype": values.dtype.str,
+                "offset": offset,
+                "nbytes": values.nbytes,
+            }
+        )
+        buffers.append(values)
+        offset += padded(values.nbytes)
+
+    header = {"sparse": matrix.format, "shape": list(matrix.shape), "arrays": arrays}
+    return _pack(header, buffers, version=_SPARSE_VERSION, pool=pool)
+
+
+def decode_binary_frame(
+    buffer: Union[bytes, bytearray, memoryview, mmap.mmap],
+) -> pd.DataFrame:
+    """Deserialize a binary columnar payload to a DataFrame.
+
+    Columns that are not dictionary-encoded are views over `buffer`. Sparse
+    matrices are returned as a DataFrame of sparse columns.
+
+    Args:
+        buffer: The serialized payload.
+
+    Returns:
+        The deserialized DataFrame.
+    """
+    header, data_start = read_binary_header(buffer)
+    if "sparse" in header:
+        return _to_sparse_frame(_decode_sparse(buffer, header, data_start))
+    n_rows = header["n_rows"]
+
+    arrays: Dict[int, Union[ColumnValues, pd.Series]] = {}
+    for position, column in enumerate(header["columns"]):
+        values = np.frombuffer(
+            buffer,
+            dtype=np.dtype(column["dtype"]),
+            count=n_rows,
+            offset=data_start + column["offset"],
+        )
+        if "dictionary" in column:
+            arrays[position] = decode_dictionary(values, column["dictionary"])
+        else:
+            arrays[position] = values
+
+    frame = pd.DataFrame(arrays, index=pd.RangeIndex(n_rows), copy=False)
+    frame.columns = pd.Index([column["name"] for column in header["columns"]])
+
+    return frame
+
+
+def decode_binary_array(
+    buffer: Union[bytes, bytearray, memoryview, mmap.mmap], schema: FrameSchema
+) -> np.ndarray:
+    """Deserialize a binary columnar payload of numeric columns to an array.
+
+    Args:
+        buffer: The serialized payload.
+        schema: The schema of the serialized data, all of its dtypes must be
+            numeric.
+
+    Returns:
+        A Fortran ordered array with the common dtype of the schema.
+    """
+    header, data_start = read_binary_header(buffer)
+    if "sparse" in header:
+        matrix = _decode_sparse(buffer, header, data_start)
+        schema.check_columns(range(matrix.shape[1]))
+        return matrix.toarray(order="F").astype(schema.common_dtype(), copy=False)
+
+    columns = header["columns"]
+    schema.check_columns([column["name"] for column in columns])
+
+    out = np.empty(
+        (header["n_rows"], len(columns)), dtype=schema.common_dtype(), order="F"
+    )
+    for position, column in enumerate(columns):
+        out[:, position] = np.frombuffer(
+            buffer,
+            dtype=np.dtype(column["dtype"]),
+            count=header["n_rows"],
+            offset=data_start + column["offset"],
+        )
+
+    return out
+
+
+def decode_binary_sparse(
+    buffer: Union[bytes, bytearray, memoryview, mmap.mmap],
+) -> SparseMatrix:
+    """Deserialize a binary payload of a sparse matrix.
+
+    The arrays of the returned matrix are views over `buffer`.
+
+    Args:
+        buffer: The serialized payload.
+
+    Returns:
+        The deserialized CSR or CSC matrix.
+    """
+    header, data_start = read_binary_header(buffer)
+    if "sparse" not in header:
+        raise ValueError("Buffer is not a binary payload of a sparse matrix")
+
+    return _decode_sparse(buffer, header, data_start)
+
+
+def read_binary_schema(
+    buffer: Union[bytes, bytearray, memoryview, mmap.mmap],
+) -> FrameSchema:
+    """Read the schema of a binary payload from its header.
+
+    Args:
+        buffer: The serialized payload.
+
+    Returns:
+        The schema of the serialized data, with the dtypes it is decoded to.
+    """
+    header, _ = read_binary_header(buffer)
+    if "sparse" in header:
+        data = next(array for array in header["arrays"] if array["name"] == "data")
+        n_columns = header["shape"][1]
+        return FrameSchema(
+            columns=tuple(range(n_columns)),
+            dtypes=(str(np.dtype(data["dtype"])),) * n_columns,
+        )
+
+    return FrameSchema(
+        columns=tuple(column["name"] for column in header["columns"]),
+        dtypes=tuple(
+            column["dictionary"]["dtype"]
+            if "dictionary" in column
+            else str(np.dtype(column["dtype"]))
+            for column in header["columns"]
+        ),
+    )
+
+
+def read_binary_header(
+    buffer: Union[bytes, bytearray, memoryview, mmap.mmap],
+) -> Tuple[Dict[str, Any], int]:
+    """Read the header of a binary columnar payload.
+
+    Args:
+        buffer: The serialized payload.
+
+    Returns:
+        A tuple of (the parsed JSON header, the offset of the first column
+        buffer within the payload).
+    """
+    view = memoryview(buffer)
+    if len(view) < PREAMBLE.size:
+        raise ValueError("Buffer is too short to be a binary payload")
+
+    magic, version, header_length = PREAMBLE.unpack_from(view)
+    if magic != BINARY_MAGIC:
+        raise ValueError("Buffer is not a binary payload")
+    if version > BINARY_VERSION:
+        raise ValueError(f"Unsupported binary payload version: {version}")
+
+    header_end = PREAMBLE.size + header_length
+    header = json.loads(bytes(view[PREAMBLE.size : header_end]))
+
+    return header, padded(header_end)
+
+
+def _pack(
+    header: Dict[str, Any],
+    buffers: List[np.ndarray],
+    version: int,
+    pool: Optional[BufferPool] = None,
+) -> Union[bytes, memoryview]:
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    head = [
+        PREAMBLE.pack(BINARY_MAGIC, version, len(encoded)),
+        encoded,
+        padding(PREAMBLE.size + len(encoded)),
+    ]
+
+    if pool is None:
+        parts: List[Union[bytes, memoryview]] = list(head)
+        for values in buffers:
+            parts.append(np.ascontiguousarray(values).view(np.uint8).data)
+            parts.append(padding(values.nbytes))
+        return b"".join(parts)
+
+    size = sum(len(part) for part in head)
+    size += sum(padded(values.nbytes) for values in buffers)
+    out = pool.acquire(size)
+    offset = 0
+    for part in head:
+        out[offset : offset + len(part)] = part
+        offset += len(part)
+    for values in buffers:
+        # Copy strided values straight into the buffer, without a contiguous
+        # intermediate
+        target = np.frombuffer(
+            out, dtype=values.dtype, count=values.size, offset=offset
+        )
+        target[:] = values
+        zeros = padding(values.nbytes)
+        out[offset + values.nbytes : offset + values.nbytes + len(zeros)] = zeros
+        offset += values.nbytes + len(zeros)
+    return out
+
+
+def _decode_sparse(
+    buffer: Union[bytes, bytearray, memoryview, mmap.mmap],
+    header: Dict[str, Any],
+    data_start: int,
+) -> SparseMatrix:
+    indptr, indices, data = (
+        np.frombuffer(
+            buffer,
+            dtype=np.dtype(array["dtype"]),
+            count=array["nbytes"] // np.dtype(array["dtype"]).itemsize,
+            offset=data_start + array["offset"],
+        )
+        for array in header["arrays"]
+    )
+    matrix_class = (
+        scipy.sparse.csc_matrix
+        if header["sparse"] == "csc"
+        else scipy.sparse.csr_matrix
+    )
+    return matrix_class((data, indices, indptr), shape=tuple(header["shape"]))
+
+
+def _to_sparse_frame(matrix: SparseMatrix) -> pd.DataFrame:
+    # Build the columns one by one, as some pandas versions make the
+    # implicit values of `DataFrame.sparse.from_spmatrix` NaN instead of 0
+    matrix = matrix.tocsc()
+    n_rows, n_columns = matrix.shape
+    return pd.DataFrame(
+        {
+            position: pd.arrays.SparseArray.from_spmatrix(matrix[:, [position]])
+            for position in range(n_columns)
+        },
+        index=pd.RangeIndex(n_rows),
+    )
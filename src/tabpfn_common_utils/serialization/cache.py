@@ -0,0 +1,226 @@
+"""Memory-budgeted cache of serialized payloads.
+
+Serializing the same training data for every request is wasted work: a
+`PayloadCache` keeps payloads by a key derived from the fingerprint of the
+data and the serialization options, see `payload_cache_key`, so serializing
+unchanged data only costs computing its fingerprint.
+
+Payloads are kept in memory up to a byte budget, evicting the least
+recently used ones first. If a directory is given, payloads are also
+written there, so they survive eviction and restarts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+
+CACHE_VERSION = 1
+
+# Number of payload bytes kept in memory by default
+DEFAULT_CACHE_BYTES = 1 << 28
+
+_SUFFIX = ".payload"
+
+
+def payload_cache_key(fingerprint: str, options: Dict[str, Any]) -> str:
+    """Derive the cache key of a payload.
+
+    Args:
+        fingerprint: The fingerprint of the serialized data, see
+            `fingerprint_data`.
+        options: Everything else the payload depends on, e.g. the format and
+            compression. The values must be JSON-serializable.
+
+    Returns:
+        The hex key, which is also a valid file name.
+    """
+    description = json.dumps(
+        {"version": CACHE_VERSION, "fingerprint": fingerprint, "options": options},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.blake2b(description.encode("utf-8"), digest_size=32).hexdigest()
+
+
+class PayloadCache:
+    """A thread-safe LRU cache of payloads, with an optional on-disk tier.
+
+    Args:
+        max_bytes: The total size of the payloads kept in memory. Larger
+            payloads are only kept on disk.
+        directory: If given, payloads are also written to files in this
+            directory and read back when they are not in memory.
+        max_disk_bytes: The total size of the payload files. The least
+            recently used files are removed beyond it. Defaults to no limit.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+        directory: Optional[Union[str, "os.PathLike[str]"]] = None,
+        max_disk_bytes: Optional[int] = None,
+    ):
+        if max_bytes < 0:
+            raise ValueError(f"max_bytes must not be negative, got {max_bytes}")
+        if max_disk_bytes is not None and max_disk_bytes < 0:
+            raise ValueError(
+                f"max_disk_bytes must not be negative, got {max_disk_bytes}"
+            )
+
+        self.max_bytes = max_bytes
+        self.directory = None if directory is None else Path(directory)
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._payloads: "OrderedDict[str, bytes]" = OrderedDict()
+        self._n_bytes = 0
+        self._lock = threading.Lock()
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def n_bytes(self) -> int:
+        """The total size of the payloads in memory."""
+        return self._n_bytes
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._payloads or (
+            self.directory is not None and self._path(key).exists()
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a payload, from memory or else from disk.
+
+        Args:
+            key: The key of the payload, see `payload_cache_key`.
+
+        Returns:
+            The payload, or None if it is not cached.
+        """
+        with self._lock:
+            payload = self._payloads.get(key)
+            if payload is not None:
+                self._payloads.move_to_end(key)
+                self.hits += 1
+                return payload
+
+        payload = self._read(key)
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, payload)
+        return payload
+
+    def put(self, key: str, payload: bytes) -> None:
+        """Cache a payload.
+
+        Args:
+            key: The key of the payload, see `payload_cache_key`.
+            payload: The payload.
+        """
+        with self._lock:
+            self._remember(key, payload)
+        if self.directory is not None:
+            self._write(key, payload)
+
+    def get_or_create(self, key: str, create: Callable[[], bytes]) -> bytes:
+        """Get a payload, creating and caching it if it is not cached.
+
+        Args:
+            key: The key of the payload, see `payload_cache_key`.
+            create: Creates the payload, e.g. by serializing data.
+
+        Returns:
+            The payload.
+        """
+        payload = self.get(key)
+        if payload is None:
+            payload = create()
+            self.put(key, payload)
+        return payload
+
+    def clear(self) -> None:
+        """Remove all payloads, from memory and from disk."""
+        with self._lock:
+            self._payloads.clear()
+            self._n_bytes = 0
+        if self.directory is not None:
+            for path in self.directory.glob(f"*{_SUFFIX}"):
+                path.unlink(missing_ok=True)
+
+    def _remember(self, key: str, payload: bytes) -> None:
+        # Must be called with the lock held
+        previous = self._payloads.pop(key, None)
+        if previous is not None:
+            self._n_bytes -= len(previous)
+        if len(payload) > self.max_bytes:
+            return
+
+        self._payloads[key] = payload
+        self._n_bytes += len(payload)
+        while self._n_bytes > self.max_bytes:
+            _, evicted = self._payloads.popitem(last=False)
+            self._n_bytes -= len(evicted)
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}{_SUFFIX}"
+
+    def _read(self, key: str) -> Optional[bytes]:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            payload = path.read_bytes()
+            # Mark the file as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return payload
+
+    def _write(self, key: str, payload: bytes) -> None:
+        assert self.directory is not None
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(payload)
+            Path(tmp).replace(path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+        if self.max_disk_bytes is not None:
+            self._evict_files(keep=path)
+
+    def _evict_files(self, keep: Path) -> None:
+        assert self.directory is not None and self.max_disk_bytes is not None
+        files = []
+        for path in self.directory.glob(f"*{_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda file: file[0]):
+            if total <= self.max_disk_bytes:
+                break
+            if path != keep:
+                path.unlink(missing_ok=True)
+                total -= size
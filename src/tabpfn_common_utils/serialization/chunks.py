@@ -0,0 +1,240 @@
+"""Resumable uploads of large payloads in content-hashed chunks.
+
+A payload is split into fixed-size chunks, each identified by the BLAKE2b
+digest of its bytes. The `ChunkManifest` records the chunks and which of
+them the receiver has acknowledged, and can be saved to disk after every
+chunk. An interrupted upload is resumed by loading the manifest and
+sending the chunks that are still missing, starting from the first one.
+
+The transport is left to the caller: `upload_chunks` hands every chunk to a
+`send` function, which can e.g. post it with the file specification from
+`to_httpx_post_file_format`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+
+from .formats import BytesLike
+from .parallel import map_in_threads
+
+
+MANIFEST_VERSION = 1
+
+# Size of the chunks a payload is split into
+DEFAULT_CHUNK_SIZE = 1 << 23
+
+_DIGEST_SIZE = 32
+
+
+@dataclass(frozen=True)
+class ChunkInfo:
+    """A chunk of a payload."""
+
+    index: int
+    """The position of the chunk in the payload."""
+
+    offset: int
+    """The offset of the first byte of the chunk in the payload."""
+
+    size: int
+    """The number of bytes in the chunk."""
+
+    digest: str
+    """The hex BLAKE2b digest of the bytes of the chunk."""
+
+
+@dataclass
+class ChunkManifest:
+    """The chunks of a payload and the ones acknowledged by the receiver."""
+
+    digest: str
+    """The hex digest of the payload, computed from the chunk digests."""
+
+    size: int
+    """The number of bytes in the payload."""
+
+    chunk_size: int
+    """The size of every chunk but the last one."""
+
+    chunks: List[ChunkInfo]
+    """The chunks, in payload order."""
+
+    acknowledged: Set[int] = field(default_factory=set)
+    """The indices of the chunks that were acknowledged by the receiver."""
+
+    @classmethod
+    def from_payload(
+        cls,
+        payload: BytesLike,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        n_jobs: Optional[int] = None,
+    ) -> "ChunkManifest":
+        """Split a payload into chunks and hash them.
+
+        Args:
+            payload: The payload to upload, e.g. a memory-mapped file.
+            chunk_size: The size of the chunks.
+            n_jobs: The number of threads hashing chunks, see
+                `resolve_n_jobs`.
+
+        Returns:
+            A manifest without acknowledged chunks.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+        view = memoryview(payload).cast("B")
+        offsets = range(0, len(view), chunk_size)
+        digests = map_in_threads(
+            lambda offset: _hash(view[offset : offset + chunk_size]), offsets, n_jobs
+        )
+        chunks = [
+            ChunkInfo(
+                index=index,
+                offset=offset,
+                size=min(chunk_size, len(view) - offset),
+                digest=digest,
+            )
+            for index, (offset, digest) in enumerate(zip(offsets, digests))
+        ]
+
+        hasher = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+        for chunk in chunks:
+            hasher.update(bytes.fromhex(chunk.digest))
+
+        return cls(
+            digest=hasher.hexdigest(),
+            size=len(view),
+            chunk_size=chunk_size,
+            chunks=chunks,
+        )
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether all chunks were acknowledged."""
+        return len(self.acknowledged) == len(self.chunks)
+
+    def missing(self) -> List[ChunkInfo]:
+        """Get the chunks that were not acknowledged yet.
+
+        Returns:
+            The missing chunks, in payload order.
+        """
+        return [chunk for chunk in self.chunks if chunk.index not in self.acknowledged]
+
+    def acknowledge(self, index: int) -> None:
+        """Record that the receiver acknowledged a chunk.
+
+        Args:
+            index: The index of the chunk.
+        """
+        if not 0 <= index < len(self.chunks):
+            raise IndexError(f"Chunk index {index} out of range")
+        self.acknowledged.add(index)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the manifest to a JSON-compatible dictionary."""
+        return {
+            "version": MANIFEST_VERSION,
+            "digest": self.digest,
+            "size": self.size,
+            "chunk_size": self.chunk_size,
+            "chunks": [asdict(chunk) for chunk in self.chunks],
+            "acknowledged": sorted(self.acknowledged),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChunkManifest":
+        """Create a manifest from the output of `to_dict`."""
+        if data.get("version", MANIFEST_VERSION) > MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version: {data['version']}")
+
+        return cls(
+            digest=data["digest"],
+            size=data["size"],
+            chunk_size=data["chunk_size"],
+            chunks=[ChunkInfo(**chunk) for chunk in data["chunks"]],
+            acknowledged=set(data["acknowledged"]),
+        )
+
+    def save(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        """Write the manifest to a JSON file, replacing it atomically.
+
+        Args:
+            path: The path of the manifest file.
+        """
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(self.to_dict(), file)
+            Path(tmp).replace(path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path: Union[str, "os.PathLike[str]"]) -> "ChunkManifest":
+        """Read a manifest written by `save`.
+
+        Args:
+            path: The path of the manifest file.
+
+        Returns:
+            The manifest.
+        """
+        with open(path, encoding="utf-8") as file:
+            return cls.from_dict(json.load(file))
+
+
+def upload_chunks(
+    payload: BytesLike,
+    manifest: ChunkManifest,
+    send: Callable[[ChunkInfo, memoryview], None],
+    manifest_path: Optional[Union[str, "os.PathLike[str]"]] = None,
+) -> ChunkManifest:
+    """Send the chunks of a payload that were not acknowledged yet.
+
+    Chunks are sent one after the other, from the first missing one. A chunk
+    counts as acknowledged once `send` returns, so `send` must raise if the
+    receiver did not accept it. The upload then stops and can be resumed
+    with the same manifest.
+
+    Args:
+        payload: The payload the manifest was built from.
+        manifest: The manifest, updated in place.
+        send: Sends a chunk, given its description and its bytes.
+        manifest_path: If given, the manifest is saved there after every
+            acknowledged chunk.
+
+    Returns:
+        The updated manifest.
+    """
+    view = memoryview(payload).cast("B")
+    if len(view) != manifest.size:
+        raise ValueError(
+            f"Payload has {len(view)} bytes, the manifest describes {manifest.size}"
+        )
+
+    for chunk in manifest.missing():
+        data = view[chunk.offset : chunk.offset + chunk.size]
+        if _hash(data) != chunk.digest:
+            raise ValueError(f"Chunk {chunk.index} does not match the manifest")
+
+        send(chunk, data)
+        manifest.acknowledge(chunk.index)
+        if manifest_path is not None:
+            manifest.save(manifest_path)
+
+    return manifest
+
+
+def _hash(data: memoryview) -> str:
+    return hashlib.blake2b(data, digest_size=_DIGEST_SIZE).hexdigest()
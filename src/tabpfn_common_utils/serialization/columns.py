@@ -0,0 +1,65 @@
+"""Column access shared by the serializers."""
+
+from __future__ import annotations
+
+from typing import Any, Iterator, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import ExtensionArray
+
+
+# The values of a single column
+ColumnValues = Union[np.ndarray, ExtensionArray]
+
+
+def iter_columns(
+    data: Union[pd.DataFrame, pd.Series, np.ndarray],
+) -> Iterator[Tuple[Any, ColumnValues]]:
+    """Iterate over the labels and values of the columns of `data`.
+
+    Arrays get integer labels like a DataFrame wrapping them, and a Series is
+    a single column labeled by its name, or 0 if it has none.
+
+    Args:
+        data: The data to iterate over. Arrays must have one or two dimensions.
+
+    Returns:
+        An iterator over (label, values) pairs. Values are NumPy arrays for
+        NumPy dtypes and pandas extension arrays otherwise.
+    """
+    if isinstance(data, np.ndarray):
+        if data.ndim == 1:
+            yield 0, data
+        elif data.ndim == 2:
+            yield from enumerate(data.T)
+        else:
+            raise ValueError(f"Expected a 1D or 2D array, got {data.ndim} dimensions")
+        return
+
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+
+    for position, label in enumerate(data.columns):
+        column = data.iloc[:, position]
+        if isinstance(column.dtype, np.dtype):
+            yield label, column.to_numpy()
+        else:
+            yield label, column.array
+
+
+def encode_label(label: Any) -> Union[str, int]:
+    """Encode a column label as a JSON-compatible value.
+
+    Integer labels, like the ones of a RangeIndex, are kept and every other
+    label is converted to a string.
+
+    Args:
+        label: The column label.
+
+    Returns:
+        The encoded label.
+    """
+    if isinstance(label, (int, np.integer)) and not isinstance(label, bool):
+        return int(label)
+    return str(label)
@@ -0,0 +1,627 @@
+"""CSV serialization, with a fast path for float arrays and frames."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+import pandas as pd
+
+from .columns import ColumnValues, iter_columns
+from .dictionary import (
+    CSV_DICTIONARY_PREAMBLE,
+    can_dictionary_encode,
+    code_dtype,
+    decode_dictionary,
+    encode_dictionary,
+)
+from .formats import BufferReader, BytesLike
+from .parallel import ParallelBackend, resolve_n_jobs
+from .schema import CSV_SCHEMA_PREAMBLE, FrameSchema
+from .sparse import SparseMatrix, as_row_sliceable, is_sparse, iter_dense_row_blocks
+
+
+# Number of cells formatted per row block, bounds the intermediate Python objects
+_CELLS_PER_BLOCK = 1 << 16
+
+# Number of row blocks per worker when serializing in parallel
+_BLOCKS_PER_WORKER = 4
+
+# Number of bytes scanned at once when looking for line breaks
+_SCAN_BYTES = 1 << 24
+_NEWLINE = ord("\n")
+
+# Largest number of significant digits that changes the output of "%g"
+MAX_FLOAT_PRECISION = 17
+
+# Datetimes are written with or without time of day and fractional seconds,
+# pandas 2 only parses such mixed ISO 8601 strings with format="ISO8601",
+# which older versions do not know but do not need
+_ISO8601_FORMAT: Optional[str] = (
+    "ISO8601" if int(pd.__version__.split(".")[0]) >= 2 else None
+)
+
+
+def encode_csv(
+    data: Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix],
+    header: bool = True,
+    float_precision: Optional[int] = None,
+) -> bytes:
+    """Serialize data to CSV formatted bytes.
+
+    Float arrays and frames made up of float columns are formatted by
+    `encode_csv_array`, everything else by pandas. Sparse matrices are
+    formatted one dense block of rows at a time.
+
+    Args:
+        data: The data to serialize.
+        header: Whether to start with a header line.
+        float_precision: The number of significant digits to write. Defaults
+            to the shortest representation that round-trips exactly.
+
+    Returns:
+        The CSV formatted bytes.
+    """
+    if is_sparse(data):
+        return _encode_csv_sparse(data, header, float_precision)
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+
+    if isinstance(data, np.ndarray):
+        if can_encode_csv_array(data, float_precision):
+            return encode_csv_array(
+                data, header=header, float_precision=float_precision
+            )
+        data = pd.DataFrame(data)
+    elif data.columns.nlevels == 1 and all(
+        can_encode_csv_dtype(dtype, float_precision) for dtype in data.dtypes
+    ):
+        # Frames of float columns are formatted as a single float block
+        values = data.to_numpy()
+        if can_encode_csv_array(values, float_precision):
+            return encode_csv_array(
+                values,
+                header=header,
+                columns=data.columns,
+                float_precision=float_precision,
+            )
+
+    float_format = None if float_precision is None else f"%.{float_precision}g"
+    return data.to_csv(index=False, header=header, float_format=float_format).encode(
+        "utf-8"
+    )
+
+
+def encode_csv_parallel(
+    data: Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix],
+    float_precision: Optional[int] = None,
+    n_jobs: Optional[int] = -1,
+    backend: ParallelBackend = "process",
+) -> bytes:
+    """Serialize data to CSV formatted bytes, blocks of rows in parallel.
+
+    Datetime and timedelta columns are formatted once for all rows, see
+    `format_csv_temporal_columns`, every other value independently of its
+    neighbours, so the concatenated blocks are byte-identical to the output
+    of `encode_csv`, whatever the number of workers.
+
+    Args:
+        data: The data to serialize.
+        float_precision: The number of significant digits to write.
+        n_jobs: The number of workers, see `resolve_n_jobs`.
+        backend: Whether the workers are processes or threads.
+
+    Returns:
+        The CSV formatted bytes.
+    """
+    n_workers = resolve_n_jobs(n_jobs)
+    n_rows = data.shape[0]
+    if n_workers == 1 or n_rows < 2:
+        return encode_csv(data, header=True, float_precision=float_precision)
+
+    data = format_csv_temporal_columns(data)
+
+    # A few blocks per worker to balance uneven blocks
+    block_rows = -(-n_rows // (n_workers * _BLOCKS_PER_WORKER))
+    starts = range(0, n_rows, block_rows)
+    if is_sparse(data):
+        data = as_row_sliceable(data)
+    if isinstance(data, np.ndarray) or is_sparse(data):
+        blocks = [data[start : start + block_rows] for start in starts]
+    else:
+        blocks = [data.iloc[start : start + block_rows] for start in starts]
+
+    executor: Executor
+    if backend == "process":
+        executor = ProcessPoolExecutor(max_workers=n_workers)
+    elif backend == "thread":
+        executor = ThreadPoolExecutor(max_workers=n_workers)
+    else:
+        raise ValueError(f"Unsupported parallel backend: {backend}")
+
+    with executor:
+        parts = executor.map(
+            encode_csv,
+            blocks,
+            [start == 0 for start in starts],
+            repeat(float_precision),
+        )
+        return b"".join(parts)
+
+
+def format_csv_temporal_columns(
+    data: Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix],
+) -> Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix]:
+    """Format the datetime and timedelta columns of data as CSV text.
+
+    pandas picks the format of these columns from all their values, e.g. it
+    leaves out the time of day if every value is at midnight. Formatting
+    blocks of rows separately could therefore give the blocks different
+    formats. This formats such columns once, as `encode_csv` would, so that
+    blocks of the result can be formatted separately.
+
+    Args:
+        data: The data to format.
+
+    Returns:
+        The data with temporal columns replaced by object columns of their
+        text, missing values as None. Data without such columns is returned
+        as it is.
+    """
+    if isinstance(data, np.ndarray):
+        if data.dtype.kind not in "mM":
+            return data
+        data = pd.DataFrame(data)
+    elif not isinstance(data, (pd.DataFrame, pd.Series)):
+        return data
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+
+    positions = [
+        position
+        for position, dtype in enumerate(data.dtypes)
+        if pd.api.types.is_datetime64_any_dtype(dtype)
+        or pd.api.types.is_timedelta64_dtype(dtype)
+    ]
+    if not positions:
+        return data
+
+    columns = {position: data.iloc[:, position] for position in range(data.shape[1])}
+    for position in positions:
+        columns[position] = _format_temporal_column(columns[position])
+    frame = pd.DataFrame(columns, index=data.index)
+    frame.columns = data.columns
+    return frame
+
+
+def _format_temporal_column(column: pd.Series) -> pd.Series:
+    # Let pandas format the column exactly as it does within a frame. Missing
+    # values are written as "" in single-column CSV
+    text = column.to_frame().to_csv(index=False, header=False)
+    values = [None if line == '""' else line for line in text.splitlines()]
+    return pd.Series(np.array(values, dtype=object), index=column.index)
+
+
+def encode_csv_dictionaries(
+    data: Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix],
+) -> Tuple[Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix], bytes]:
+    """Dictionary-encode the categorical and string columns of data for CSV.
+
+    The encoded columns are replaced by their integer codes, and their
+    dictionaries are written to a preamble line, which has to precede the
+    CSV formatted bytes of the returned data. `decode_csv_frame` restores
+    the original columns.
+
+    Args:
+        data: The data to encode.
+
+    Returns:
+        A tuple of (the data with codes instead of the encoded columns, the
+        preamble line). Data without such columns is returned as it is,
+        with an empty preamble.
+    """
+    if is_sparse(data) or (
+        isinstance(data, np.ndarray) and data.dtype != np.dtype(object)
+    ):
+        return data, b""
+
+    frame = pd.DataFrame(data) if isinstance(data, np.ndarray) else data
+    if isinstance(frame, pd.Series):
+        frame = frame.to_frame()
+
+    dictionaries: Dict[str, Any] = {}
+    codes: Dict[int, ColumnValues] = {}
+    for position, (_, values) in enumerate(iter_columns(frame)):
+        if can_dictionary_encode(values):
+            column_codes, dictionaries[str(position)] = encode_dictionary(values)
+            # Missing values are written as empty fields
+            codes[position] = pd.arrays.IntegerArray(column_codes, column_codes < 0)
+
+    if not dictionaries:
+        return data, b""
+
+    metadata = json.dumps({"columns": dictionaries}, separators=(",", ":"))
+    preamble = CSV_DICTIONARY_PREAMBLE + (metadata + os.linesep).encode("utf-8")
+    return _replace_columns(frame, codes), preamble
+
+
+def encode_csv_schema(
+    data: Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix],
+) -> bytes:
+    """Describe the column labels and dtypes of data in a CSV preamble line.
+
+    The line has to precede the CSV formatted bytes of `data`, and the
+    dictionary preamble from `encode_csv_dictionaries` if there is one.
+    `decode_csv_frame` then parses every column with its dtype instead of
+    inferring it.
+
+    Args:
+        data: The data to describe, before dictionary encoding.
+
+    Returns:
+        The preamble line.
+    """
+    metadata = json.dumps(FrameSchema.from_data(data).to_dict(), separators=(",", ":"))
+    return CSV_SCHEMA_PREAMBLE + (metadata + os.linesep).encode("utf-8")
+
+
+def read_csv_schema(buffer: BytesLike) -> Optional[FrameSchema]:
+    """Read the schema from the preamble of CSV formatted bytes.
+
+    Only the preamble lines are read, not the rows.
+
+    Args:
+        buffer: The CSV formatted bytes.
+
+    Returns:
+        The schema written by `encode_csv_schema`, or None if there is none.
+    """
+    preamble, _ = _split_preamble(memoryview(buffer).cast("B"))
+    schema = preamble.get(CSV_SCHEMA_PREAMBLE)
+    return None if schema is None else FrameSchema.from_dict(schema)
+
+
+def decode_csv_frame(buffer: BytesLike) -> pd.DataFrame:
+    """Deserialize CSV formatted bytes to a DataFrame.
+
+    Dictionary-encoded columns, see `encode_csv_dictionaries`, are restored to
+    their original values and dtype. If the bytes start with a schema, see
+    `encode_csv_schema`, every column is parsed with its dtype and labeled
+    with its original label, otherwise dtypes are inferred.
+
+    Args:
+        buffer: The CSV formatted bytes, read without copying them.
+
+    Returns:
+        The deserialized DataFrame.
+    """
+    preamble, view = _split_preamble(memoryview(buffer).cast("B"))
+    dictionaries: Dict[str, Any] = preamble.get(CSV_DICTIONARY_PREAMBLE, {}).get(
+        "columns", {}
+    )
+    if CSV_SCHEMA_PREAMBLE in preamble:
+        schema = FrameSchema.from_dict(preamble[CSV_SCHEMA_PREAMBLE])
+        frame = _read_csv_with_schema(view, schema, dictionaries)
+    else:
+        frame = pd.read_csv(
+            io.BufferedReader(BufferReader(view)), float_precision="round_trip"
+        )
+    if not dictionaries:
+        return frame
+
+    columns: Dict[int, Union[ColumnValues, pd.Series]] = {}
+    for key, dictionary in dictionaries.items():
+        position = int(key)
+        codes = frame.iloc[:, position].to_numpy(dtype=np.float64, na_value=np.nan)
+        codes = np.where(np.isnan(codes), -1, codes)
+        columns[position] = decode_dictionary(
+            codes.astype(code_dtype(len(dictionary["values"]))), dictionary
+        )
+    return _replace_columns(frame, columns)
+
+
+def decode_csv_array(buffer: BytesLike, schema: FrameSchema) -> np.ndarray:
+    """Deserialize CSV formatted bytes of numeric columns to an array.
+
+    The array is allocated once, with the common dtype of the schema, and
+    filled block by block. Columns are parsed with their schema dtype, so no
+    type inference takes place.
+
+    Args:
+        buffer: The CSV formatted bytes, read without copying them.
+        schema: The schema of the serialized data, all of its dtypes must be
+            numeric.
+
+    Returns:
+        The deserialized array.
+    """
+    _, view = _split_preamble(memoryview(buffer).cast("B"))
+    dtype = schema.common_dtype()
+    n_columns = len(schema.columns)
+
+    header_end = _check_header(view, schema)
+
+    out = np.empty((_count_lines(view, header_end + 1), n_columns), dtype=dtype)
+    if out.size == 0:
+        return out
+
+    reader = pd.read_csv(
+        io.BufferedReader(BufferReader(view[header_end + 1 :])),
+        header=None,
+        names=list(range(n_columns)),
+        dtype=dict(enumerate(schema.dtypes)),
+        chunksize=max(1, _CELLS_PER_BLOCK * 16 // n_columns),
+        float_precision="round_trip",
+    )
+    n_rows = 0
+    with reader:
+        for chunk in reader:
+            out[n_rows : n_rows + len(chunk)] = chunk.to_numpy()
+            n_rows += len(chunk)
+
+    return out[:n_rows]
+
+
+def can_encode_csv_array(
+    array: np.ndarray, float_precision: Optional[int] = None
+) -> bool:
+    """Check whether `encode_csv_array` supports the given array.
+
+    Args:
+        array: The array to check.
+        float_precision: The number of significant digits that will be written.
+
+    Returns:
+        True if the array can be encoded without building a DataFrame.
+    """
+    return (
+        can_encode_csv_dtype(array.dtype, float_precision)
+        and array.ndim in (1, 2)
+        and array.size > 0
+    )
+
+
+def can_encode_csv_dtype(dtype: Any, float_precision: Optional[int] = None) -> bool:
+    """Check whether `encode_csv_array` supports values of the given dtype.
+
+    Without a fixed precision only float64 takes the fast path, as the
+    shortest repr of a float32 value differs from the one of the same value
+    as a Python float. For the other dtypes pandas' own writer is already at
+    least as fast.
+
+    Args:
+        dtype: The dtype to check.
+        float_precision: The number of significant digits that will be written.
+
+    Returns:
+        True if values of the dtype can be encoded without a DataFrame.
+    """
+    if not isinstance(dtype, np.dtype):
+        return False
+    if float_precision is None:
+        return dtype == np.float64
+    return dtype.kind == "f"
+
+
+def encode_csv_array(
+    array: np.ndarray,
+    header: bool = True,
+    columns: Optional[Iterable[Any]] = None,
+    float_precision: Optional[int] = None,
+) -> bytes:
+    """Serialize a float array to CSV formatted bytes.
+
+    Without `float_precision` this produces the same bytes as
+    `pd.DataFrame(array, columns=columns).to_csv(index=False)`, and with it
+    the same bytes as passing `float_format=f"%.{float_precision}g"`. The
+    values are formatted straight from the array buffer, in either C or
+    Fortran order, a block of rows per string formatting call instead of
+    cell by cell.
+
+    Args:
+        array: The array to serialize, see `can_encode_csv_array`.
+        header: Whether to start with a header line.
+        columns: The column labels of the header, defaults to integer labels.
+        float_precision: The number of significant digits to write. Defaults
+            to the shortest representation that round-trips exactly.
+
+    Returns:
+        The CSV formatted bytes.
+    """
+    if array.ndim == 1:
+        array = array[:, np.newaxis]
+
+    n_rows, n_columns = array.shape
+    lineterminator = os.linesep
+    has_nan = bool(np.isnan(array).any())
+    # Like pandas, quote missing values that would otherwise leave a blank line
+    na_rep = '""' if n_columns == 1 else ""
+
+    spec = "%r" if float_precision is None else f"%.{float_precision}g"
+
+    lines: List[str] = []
+    if header:
+        labels = range(n_columns) if columns is None else columns
+        lines.append(_format_header(labels, None if float_precision is None else spec))
+
+    row_template = ",".join([spec] * n_columns)
+
+    block_rows = max(1, _CELLS_PER_BLOCK // n_columns)
+    for start in range(0, n_rows, block_rows):
+        block = array[start : start + block_rows]
+        template = lineterminator.join([row_template] * len(block))
+        text = template % tuple(block.ravel().tolist())
+        # NaN is the only value formatted as "nan"
+        lines.append(text.replace("nan", na_rep) if has_nan else text)
+
+    return (lineterminator.join(lines) + lineterminator).encode("utf-8")
+
+
+def check_float_precision(float_precision: Optional[int]) -> None:
+    """Validate a number of significant digits for float formatting.
+
+    Args:
+        float_precision: The number of significant digits, or None.
+    """
+    if float_precision is not None and not 1 <= float_precision <= MAX_FLOAT_PRECISION:
+        raise ValueError(
+            f"float_precision must be between 1 and {MAX_FLOAT_PRECISION}, "
+            f"got {float_precision}"
+        )
+
+
+def _encode_csv_sparse(
+    matrix: SparseMatrix, header: bool, float_precision: Optional[int]
+) -> bytes:
+    parts = [
+        encode_csv(block, header=header and start == 0, float_precision=float_precision)
+        for start, block in iter_dense_row_blocks(matrix)
+    ]
+    if not parts:
+        # No rows, only the header
+        empty = np.empty((0, matrix.shape[1]), dtype=matrix.dtype)
+        return encode_csv(empty, header=header, float_precision=float_precision)
+    return b"".join(parts)
+
+
+def _split_preamble(view: memoryview) -> Tuple[Dict[bytes, Any], memoryview]:
+    # Parse the leading schema and dictionary lines, and skip them
+    preamble: Dict[bytes, Any] = {}
+    while True:
+        marker = next(
+            (
+                marker
+                for marker in (CSV_SCHEMA_PREAMBLE, CSV_DICTIONARY_PREAMBLE)
+                if view[: len(marker)] == marker
+            ),
+            None,
+        )
+        if marker is None:
+            return preamble, view
+        line_end = _find_newline(view, 0)
+        preamble[marker] = json.loads(bytes(view[len(marker) : line_end]))
+        view = view[line_end + 1 :]
+
+
+def _check_header(view: memoryview, schema: FrameSchema) -> int:
+    # Check the labels of the header line, and return where it ends
+    header_end = _find_newline(view, 0)
+    header_line = bytes(view[:header_end]).decode("utf-8").rstrip("\r")
+    schema.check_columns(next(csv.reader([header_line]), []))
+    return header_end
+
+
+def _read_csv_with_schema(
+    view: memoryview, schema: FrameSchema, dictionaries: Dict[str, Any]
+) -> pd.DataFrame:
+    _check_header(view, schema)
+
+    dtypes: Dict[Hashable, Any] = {}
+    temporal: Dict[int, Any] = {}
+    for position, name in enumerate(schema.dtypes):
+        if str(position) in dictionaries:
+            # Integer codes, with empty fields for missing values
+            dtypes[position] = np.float64
+            continue
+        dtype = pd.api.types.pandas_dtype(name)
+        if dtype.kind in "mM":
+            # Parsed after reading, from the ISO 8601 strings pandas writes
+            temporal[position] = dtype
+            dtypes[position] = object
+        else:
+            dtypes[position] = dtype
+
+    frame = pd.read_csv(
+        io.BufferedReader(BufferReader(view)),
+        header=0,
+        names=list(range(len(schema.columns))),
+        dtype=dtypes,
+        float_precision="round_trip",
+    )
+    for position, dtype in temporal.items():
+        frame[position] = _parse_temporal(frame.iloc[:, position], dtype)
+
+    frame.columns = pd.Index(list(schema.columns))
+    return frame
+
+
+def _parse_temporal(values: pd.Series, dtype: Any) -> pd.Series:
+    if dtype.kind == "m":
+        return pd.to_timedelta(values).astype(dtype)
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        # Offsets can differ between rows, e.g. across daylight saving time
+        parsed = pd.to_datetime(values, utc=True, format=_ISO8601_FORMAT)
+        return parsed.dt.tz_convert(dtype.tz).astype(dtype)
+    return pd.to_datetime(values, format=_ISO8601_FORMAT).astype(dtype)
+
+
+def _replace_columns(
+    frame: pd.DataFrame, columns: Mapping[int, Union[ColumnValues, pd.Series]]
+) -> pd.DataFrame:
+    # Rebuild the frame by position, which also works for duplicate labels
+    replaced = pd.DataFrame(
+        {
+            position: columns.get(position, values)
+            for position, (_, values) in enumerate(iter_columns(frame))
+        },
+        index=frame.index,
+    )
+    replaced.columns = frame.columns
+    return replaced
+
+
+def _format_header(columns: Iterable[Any], float_format: Optional[str]) -> str:
+    labels = list(columns)
+    if not all(isinstance(c, (str, int, np.integer)) for c in labels):
+        # pandas formats missing, float and datetime labels depending on the
+        # index dtype, let it write the header of an empty frame
+        index = columns if isinstance(columns, pd.Index) else pd.Index(labels)
+        text = pd.DataFrame(columns=index).to_csv(
+            index=False, float_format=float_format
+        )
+        return text.rstrip("\r\n")
+
+    # Use the csv module for the labels, so they are quoted the way pandas does
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="").writerow([str(c) for c in labels])
+    return buffer.getvalue()
+
+
+def _find_newline(view: memoryview, start: int) -> int:
+    position = start
+    while position < len(view):
+        chunk = np.frombuffer(view[position : position + _SCAN_BYTES], dtype=np.uint8)
+        hits = np.flatnonzero(chunk == _NEWLINE)
+        if len(hits):
+            return position + int(hits[0])
+        position += len(chunk)
+    return len(view)
+
+
+def _count_lines(view: memoryview, start: int) -> int:
+    # Count newline characters in slices to bound the temporary masks
+    count = 0
+    for position in range(start, len(view), _SCAN_BYTES):
+        chunk = np.frombuffer(view[position : position + _SCAN_BYTES], dtype=np.uint8)
+        count += int(np.count_nonzero(chunk == _NEWLINE))
+
+    # The last line may not be terminated
+    if len(view) > start and view[-1] != _NEWLINE:
+        count += 1
+    return count
@@ -0,0 +1,66 @@
+"""Append-only deltas of growing data."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .fingerprint import fingerprint_data, fingerprint_prefix
+
+
+@dataclass(frozen=True)
+class DeltaPayload:
+    """A serialized payload that may only contain rows appended to a base."""
+
+    payload: bytes
+    """The serialized rows from `start_row` on."""
+
+    start_row: int
+    """The first serialized row, 0 for a full payload."""
+
+    base_fingerprint: Optional[str]
+    """The fingerprint of the base the rows are appended to, None for a full
+    payload."""
+
+    fingerprint: str
+    """The fingerprint of all rows, to use as the base of the next delta."""
+
+    n_rows: int
+    """The number of rows of all data, to use as the base of the next delta."""
+
+    @property
+    def is_delta(self) -> bool:
+        """Whether the payload only contains the rows appended to the base."""
+        return self.base_fingerprint is not None
+
+
+def detect_append(
+    data: Union[pd.DataFrame, pd.Series, np.ndarray],
+    base_fingerprint: Optional[str],
+    base_n_rows: Optional[int],
+    n_jobs: Optional[int] = None,
+) -> Tuple[bool, str]:
+    """Check whether data consists of a base followed by appended rows.
+
+    Args:
+        data: The data to check.
+        base_fingerprint: The fingerprint of the base, as computed by
+            `fingerprint_data`.
+        base_n_rows: The number of rows of the base.
+        n_jobs: The number of threads hashing columns, see `resolve_n_jobs`.
+
+    Returns:
+        A tuple of (whether the first `base_n_rows` rows of `data` have the
+        base fingerprint, the fingerprint of all of `data`).
+    """
+    if base_fingerprint is None or base_n_rows is None:
+        return False, fingerprint_data(data, n_jobs=n_jobs)
+    if not 0 <= base_n_rows <= len(data):
+        # Rows were removed, the base cannot be a prefix
+        return False, fingerprint_data(data, n_jobs=n_jobs)
+
+    prefix, full = fingerprint_prefix(data, base_n_rows, n_jobs=n_jobs)
+    return prefix == base_fingerprint, full
@@ -0,0 +1,114 @@
+"""Dictionary encoding of categorical and string columns.
+
+A dictionary-encoded column is stored as its distinct values, the
+dictionary, and one integer code per row pointing into it, -1 for missing
+values. Codes use the smallest of int8, int16, int32 and int64 that fits
+the dictionary, so a low-cardinality column costs one byte per row.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .columns import ColumnValues
+
+
+# Marks the first line of a CSV payload holding the column dictionaries
+CSV_DICTIONARY_PREAMBLE = b"#dictionaries:"
+
+_CODE_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def can_dictionary_encode(values: ColumnValues) -> bool:
+    """Check whether a column is categorical or holds strings or objects.
+
+    Args:
+        values: The values of the column.
+
+    Returns:
+        True if the column can be dictionary-encoded.
+    """
+    dtype = values.dtype
+    return isinstance(
+        dtype, (pd.CategoricalDtype, pd.StringDtype)
+    ) or dtype == np.dtype(object)
+
+
+def code_dtype(n_values: int) -> np.dtype:
+    """Get the smallest integer dtype for codes into a dictionary.
+
+    Args:
+        n_values: The number of values in the dictionary.
+
+    Returns:
+        The dtype of the codes, which also fits the missing value code -1.
+    """
+    for dtype in _CODE_DTYPES:
+        if n_values - 1 <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    raise ValueError(f"Dictionary of {n_values} values is too large")
+
+
+def encode_dictionary(values: ColumnValues) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Dictionary-encode a column.
+
+    Args:
+        values: The values of the column, see `can_dictionary_encode`.
+
+    Returns:
+        A tuple of (the codes, a JSON-compatible description of the
+        dictionary to pass to `decode_dictionary`).
+    """
+    meta: Dict[str, Any] = {"dtype": str(values.dtype)}
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categorical = pd.Categorical(values)
+        codes = categorical.codes
+        dictionary = categorical.categories
+        meta["categories_dtype"] = str(dictionary.dtype)
+        meta["ordered"] = bool(categorical.ordered)
+    else:
+        codes, dictionary = pd.factorize(values)
+    meta["values"] = dictionary.tolist()
+
+    try:
+        json.dumps(meta["values"])
+    except (TypeError, ValueError) as error:
+        raise TypeError(
+            f"Values of a column of dtype {values.dtype} cannot be dictionary-encoded"
+        ) from error
+
+    return codes.astype(code_dtype(len(dictionary)), copy=False), meta
+
+
+def decode_dictionary(
+    codes: np.ndarray, meta: Dict[str, Any]
+) -> Union[ColumnValues, pd.Series]:
+    """Decode a dictionary-encoded column.
+
+    Args:
+        codes: The codes, -1 for missing values.
+        meta: The description of the dictionary from `encode_dictionary`.
+
+    Returns:
+        The values of the column, with their original dtype. Object columns
+        are returned as a Series with a default index, since pandas would
+        infer a string dtype for a bare object array of strings.
+    """
+    if "categories_dtype" in meta:
+        categories = pd.Index(meta["values"], dtype=meta["categories_dtype"])
+        return pd.Categorical.from_codes(
+            codes, categories=categories, ordered=meta["ordered"]
+        )
+
+    dictionary = np.empty(len(meta["values"]) + 1, dtype=object)
+    dictionary[:-1] = meta["values"]
+    dictionary[-1] = np.nan
+    # Code -1 picks the missing value at the end of the dictionary
+    values = dictionary[codes]
+    if meta["dtype"] == "object":
+        return pd.Series(values, dtype=object, copy=False)
+    return pd.array(values, dtype=meta["dtype"])
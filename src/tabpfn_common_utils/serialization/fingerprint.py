@@ -0,0 +1,220 @@
+"""Content fingerprints of tabular data.
+
+The fingerprint hashes every column separately with BLAKE2b, feeding it the
+column dtype followed by the raw little-endian values in row order, and
+then combines the shape, column labels and column digests. Because only
+the sequence of values per column is hashed, the fingerprint does not
+depend on the memory layout of the data: C and Fortran ordered arrays, an
+array and a DataFrame wrapping it, and any chunk size give the same result.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.util import hash_pandas_object
+
+from .columns import ColumnValues, encode_label, iter_columns
+from .parallel import map_in_threads, resolve_n_jobs
+
+
+FINGERPRINT_VERSION = 2
+
+# Number of bytes of a column hashed per update
+DEFAULT_CHUNK_BYTES = 1 << 24
+
+_DIGEST_SIZE = 32
+
+# Numpy dtype kinds whose raw buffers are hashed
+_RAW_KINDS = "biufcmM"
+
+
+def fingerprint_data(
+    data: Union[pd.DataFrame, pd.Series, np.ndarray],
+    n_jobs: Optional[int] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> str:
+    """Compute a content fingerprint of tabular data.
+
+    Data with the same shape, column labels, dtypes and values has the same
+    fingerprint, regardless of its memory layout.
+
+    Args:
+        data: The data to fingerprint.
+        n_jobs: The number of threads hashing columns, see `resolve_n_jobs`.
+        chunk_bytes: The number of bytes of a column hashed per update.
+
+    Returns:
+        The hex digest of the fingerprint.
+    """
+    return _fingerprint_prefixes(data, [len(data)], n_jobs, chunk_bytes)[0]
+
+
+def fingerprint_prefix(
+    data: Union[pd.DataFrame, pd.Series, np.ndarray],
+    prefix_rows: int,
+    n_jobs: Optional[int] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> Tuple[str, str]:
+    """Compute the fingerprints of the first rows of data and of all of it.
+
+    Both are computed in a single pass over the data, as the column hashes
+    of the first rows are intermediate states of the full column hashes.
+
+    Args:
+        data: The data to fingerprint.
+        prefix_rows: The number of leading rows of the first fingerprint, at
+            most the number of rows of `data`.
+        n_jobs: The number of threads hashing columns, see `resolve_n_jobs`.
+        chunk_bytes: The number of bytes of a column hashed per update.
+
+    Returns:
+        A tuple of (the fingerprint of the first `prefix_rows` rows, the
+        fingerprint of all rows), equal to calling `fingerprint_data` on both.
+    """
+    if not 0 <= prefix_rows <= len(data):
+        raise ValueError(
+            f"prefix_rows must be between 0 and {len(data)}, got {prefix_rows}"
+        )
+
+    prefix, full = _fingerprint_prefixes(
+        data, [prefix_rows, len(data)], n_jobs, chunk_bytes
+    )
+    return prefix, full
+
+
+def _fingerprint_prefixes(
+    data: Union[pd.DataFrame, pd.Series, np.ndarray],
+    stops: List[int],
+    n_jobs: Optional[int],
+    chunk_bytes: int,
+) -> List[str]:
+    # Fingerprints of the rows up to each of the increasing `stops`
+    if chunk_bytes < 1:
+        raise ValueError(f"chunk_bytes must be positive, got {chunk_bytes}")
+
+    if (
+        isinstance(data, np.ndarray)
+        and data.ndim == 2
+        and not data.flags.f_contiguous
+        and data.dtype.kind in _RAW_KINDS
+    ):
+        # Columns of C ordered arrays are strided, transpose them block-wise
+        labels: List[Union[str, int]] = list(range(data.shape[1]))
+        digests = _hash_array_columns(data, stops, n_jobs, chunk_bytes)
+    else:
+        columns = list(iter_columns(data))
+        labels = [encode_label(label) for label, _ in columns]
+        digests = map_in_threads(
+            lambda column: _hash_column(column[1], stops, chunk_bytes),
+            columns,
+            n_jobs,
+        )
+
+    fingerprints = []
+    for position, n_rows in enumerate(stops):
+        hasher = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+        hasher.update(
+            json.dumps(
+                {"version": FINGERPRINT_VERSION, "n_rows": n_rows, "columns": labels},
+                separators=(",", ":"),
+            ).encode("utf-8")
+        )
+        for column_digests in digests:
+            hasher.update(column_digests[position])
+        fingerprints.append(hasher.hexdigest())
+
+    return fingerprints
+
+
+def _hash_column(
+    column: ColumnValues, stops: List[int], chunk_bytes: int
+) -> List[bytes]:
+    if isinstance(column, np.ndarray) and column.dtype.kind in _RAW_KINDS:
+        values = column.astype(column.dtype.newbyteorder("<"), copy=False)
+        hasher = _column_hasher(values.dtype.str)
+    else:
+        # Hash values rather than memory for objects and extension arrays
+        hashes = hash_pandas_object(pd.Series(column), index=False)  # type: ignore
+        values = np.asarray(hashes, dtype=np.uint64)
+        hasher = _column_hasher(str(column.dtype))
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # Values are hashed without their categories, which are part of
+            # the dtype
+            hasher.update(_categories_descriptor(column.dtype))
+
+    rows_per_chunk = max(1, chunk_bytes // max(values.itemsize, 1))
+    digests = []
+    start = 0
+    for stop in stops:
+        for chunk_start in range(start, stop, rows_per_chunk):
+            chunk_stop = min(chunk_start + rows_per_chunk, stop)
+            chunk = np.ascontiguousarray(values[chunk_start:chunk_stop])
+            hasher.update(chunk.view(np.uint8).data)
+        # Taking a digest does not end the hash, it keeps accepting updates
+        digests.append(hasher.digest())
+        start = stop
+
+    return digests
+
+
+def _hash_array_columns(
+    array: np.ndarray, stops: List[int], n_jobs: Optional[int], chunk_bytes: int
+) -> List[List[bytes]]:
+    array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+    n_columns = array.shape[1]
+
+    # Every thread hashes a contiguous group of columns from start to end,
+    # so that the updates of a column are as large as possible
+    n_groups = max(1, min(resolve_n_jobs(n_jobs), n_columns))
+    bounds = np.linspace(0, n_columns, n_groups + 1).astype(int)
+    groups = map_in_threads(
+        lambda group: _hash_column_group(
+            array[:, group[0] : group[1]], stops, chunk_bytes
+        ),
+        list(zip(bounds[:-1], bounds[1:])),
+        n_jobs,
+    )
+    return [column_digests for group in groups for column_digests in group]
+
+
+def _hash_column_group(
+    array: np.ndarray, stops: List[int], chunk_bytes: int
+) -> List[List[bytes]]:
+    n_columns = array.shape[1]
+    hashers = [_column_hasher(array.dtype.str) for _ in range(n_columns)]
+    digests: List[List[bytes]] = [[] for _ in range(n_columns)]
+
+    rows_per_chunk = max(1, chunk_bytes // max(array.itemsize * n_columns, 1))
+    start = 0
+    for stop in stops:
+        for chunk_start in range(start, stop, rows_per_chunk):
+            chunk_stop = min(chunk_start + rows_per_chunk, stop)
+            block = np.ascontiguousarray(array[chunk_start:chunk_stop].T)
+            for hasher, column in zip(hashers, block):
+                hasher.update(column.view(np.uint8).data)
+        for column_digests, hasher in zip(digests, hashers):
+            column_digests.append(hasher.digest())
+        start = stop
+
+    return digests
+
+
+def _categories_descriptor(dtype: pd.CategoricalDtype) -> bytes:
+    categories = pd.Series(dtype.categories)
+    hashes = np.asarray(
+        hash_pandas_object(categories, index=False),  # type: ignore
+        dtype=np.uint64,
+    )
+    header = f"{categories.dtype},ordered={bool(dtype.ordered)},{len(hashes)}"
+    return header.encode("utf-8") + b"\x00" + hashes.astype("<u8").tobytes()
+
+
+def _column_hasher(dtype: str) -> Any:
+    hasher = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+    hasher.update(dtype.encode("utf-8") + b"\x00")
+    return hasher
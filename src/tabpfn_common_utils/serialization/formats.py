@@ -0,0 +1,75 @@
+"""Wire formats supported by the serializers."""
+
+from __future__ import annotations
+
+import io
+import mmap
+from typing import Literal, Union
+
+from .arrow import ARROW_STREAM_PREFIX
+from .binary import BINARY_MAGIC
+
+
+# The wire format of a serialized payload
+SerializationFormat = Literal["csv", "binary", "arrow"]
+
+# Any buffer that can be deserialized without copying it first
+BytesLike = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+def detect_format(buffer: BytesLike) -> SerializationFormat:
+    """Detect the wire format of a serialized payload from its leading bytes.
+
+    Args:
+        buffer: The serialized payload.
+
+    Returns:
+        The detected format, falling back to CSV for anything unrecognized.
+    """
+    prefix = bytes(memoryview(buffer)[:8])
+    if prefix.startswith(BINARY_MAGIC):
+        return "binary"
+    if prefix.startswith(ARROW_STREAM_PREFIX):
+        return "arrow"
+    return "csv"
+
+
+class BufferReader(io.RawIOBase):
+    """A read-only file object over a buffer, reading without copying it.
+
+    Unlike `io.BytesIO`, which copies anything but `bytes`, this wraps
+    memoryviews and memory-mapped files as they are.
+    """
+
+    def __init__(self, buffer: BytesLike) -> None:
+        self._view = memoryview(buffer).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        size = max(0, min(len(buffer), len(self._view) - self._position))
+        buffer[:size] = self._view[self._position : self._position + size]
+        self._position += size
+        return size
+
+    def close(self) -> None:
+        # Release the view, so that memory-mapped files can be closed
+        if not self.closed:
+            self._view.release()
+        super().close()
@@ -0,0 +1,60 @@
+"""Helpers to run serialization work on a thread pool."""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Literal, Optional, TypeVar
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# The kind of workers running parallel serialization
+ParallelBackend = Literal["process", "thread"]
+
+
+def resolve_n_jobs(n_jobs: Optional[int]) -> int:
+    """Resolve an `n_jobs` argument to a number of workers.
+
+    Follows the scikit-learn convention: None means a single worker and
+    negative values count back from the number of CPUs, so -1 uses all.
+
+    Args:
+        n_jobs: The requested number of jobs.
+
+    Returns:
+        The number of workers, at least one.
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs == 0:
+        raise ValueError("n_jobs must not be 0")
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return n_jobs
+
+
+def map_in_threads(
+    fn: Callable[[T], R], items: Iterable[T], n_jobs: Optional[int] = None
+) -> List[R]:
+    """Apply `fn` to every item on a thread pool, preserving the order.
+
+    Only worthwhile for functions that release the GIL, like compression,
+    hashing and most NumPy operations.
+
+    Args:
+        fn: The function to apply.
+        items: The items to apply the function to.
+        n_jobs: The number of threads, see `resolve_n_jobs`.
+
+    Returns:
+        The results in the order of `items`.
+    """
+    items = list(items)
+    n_workers = min(resolve_n_jobs(n_jobs), len(items))
+    if n_workers <= 1:
+        return [fn(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(fn, items))
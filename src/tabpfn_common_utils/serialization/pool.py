@@ -0,0 +1,156 @@
+"""Reusable buffers for serializing many payloads of similar sizes.
+
+Allocating a new multi-megabyte `bytes` object per payload fragments the
+heap of long-running services. A `BufferPool` instead hands out views of
+`bytearray` buffers, rounded up to power-of-two size classes, and takes
+them back once the payload was sent, so serializing payloads of similar
+sizes reuses the same few buffers.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Optional, Union
+
+
+# Smallest buffer handed out by a pool
+MIN_BUFFER_SIZE = 1 << 16
+
+
+class BufferPool:
+    """A thread-safe pool of buffers in power-of-two size classes.
+
+    Args:
+        max_buffers_per_size: The number of released buffers kept per size
+            class. Further released buffers are left to the garbage
+            collector.
+        min_size: The smallest size class.
+    """
+
+    def __init__(self, max_buffers_per_size: int = 4, min_size: int = MIN_BUFFER_SIZE):
+        if min_size < 1:
+            raise ValueError(f"min_size must be positive, got {min_size}")
+
+        self.max_buffers_per_size = max_buffers_per_size
+        self.min_size = min_size
+        self.allocations = 0
+        self.last_written = 0
+        self._free: Dict[int, List[bytearray]] = {}
+        self._leased: Dict[int, bytearray] = {}
+        self._lock = threading.Lock()
+
+    def size_class(self, size: int) -> int:
+        """Get the size of the buffers holding `size` bytes."""
+        return max(self.min_size, 1 << max(size - 1, 0).bit_length())
+
+    @property
+    def n_bytes(self) -> int:
+        """The total size of the released buffers kept for reuse."""
+        with self._lock:
+            return sum(size * len(free) for size, free in self._free.items())
+
+    def acquire(self, size: int) -> memoryview:
+        """Get a buffer of at least `size` bytes.
+
+        Args:
+            size: The number of bytes needed.
+
+        Returns:
+            A writable view of exactly `size` bytes, at the start of a buffer
+            of the pool. Its contents are undefined. Pass it, or any view
+            into the same buffer, to `release` once it is no longer needed.
+        """
+        if size < 0:
+            raise ValueError(f"size must not be negative, got {size}")
+
+        size_class = self.size_class(size)
+        with self._lock:
+            free = self._free.get(size_class)
+            if free:
+                buffer = free.pop()
+            else:
+                buffer = bytearray(size_class)
+                self.allocations += 1
+            self._leased[id(buffer)] = buffer
+
+        return memoryview(buffer)[:size]
+
+    def release(self, view: memoryview) -> None:
+        """Return a buffer to the pool, to be reused by `acquire`.
+
+        The view is released, and must not be used afterwards, nor may any
+        other view or array still referring to the buffer.
+
+        Args:
+            view: A view from `acquire`, or from `BufferWriter.getvalue`.
+        """
+        with self._lock:
+            buffer = self._leased.get(id(view.obj))
+            if buffer is None or buffer is not view.obj:
+                raise ValueError("The view is not of a buffer leased from this pool")
+            del self._leased[id(buffer)]
+            view.release()
+
+            free = self._free.setdefault(len(buffer), [])
+            if len(free) < self.max_buffers_per_size:
+                free.append(buffer)
+
+    def clear(self) -> None:
+        """Drop the released buffers kept for reuse."""
+        with self._lock:
+            self._free.clear()
+
+
+class BufferWriter:
+    """Write bytes of an unknown total size into buffers of a pool.
+
+    The buffer is swapped for one of the next size class whenever it is
+    full, the smaller one returning to the pool.
+
+    Args:
+        pool: The pool of the buffers.
+        size_hint: The expected total size, avoids growing the buffer.
+            Defaults to the size of the last payload written into the pool
+            by a writer, `BufferPool.last_written`, so that a stream of
+            similar-sized payloads starts with a buffer of the right size.
+    """
+
+    def __init__(self, pool: BufferPool, size_hint: Optional[int] = None):
+        if size_hint is None:
+            size_hint = pool.last_written
+        self.pool = pool
+        self._view = pool.acquire(pool.size_class(size_hint))
+        self._length = 0
+
+    def write(self, data: Union[bytes, bytearray, memoryview]) -> int:
+        """Append bytes to the buffer.
+
+        Args:
+            data: The bytes to append.
+
+        Returns:
+            The number of bytes written.
+        """
+        chunk = memoryview(data).cast("B")
+        end = self._length + len(chunk)
+        if end > len(self._view):
+            grown = self.pool.acquire(self.pool.size_class(end))
+            grown[: self._length] = self._view[: self._length]
+            self.pool.release(self._view)
+            self._view = grown
+
+        self._view[self._length : end] = chunk
+        self._length = end
+        return len(chunk)
+
+    def getvalue(self) -> memoryview:
+        """Get the written bytes, handing over the buffer to the caller.
+
+        Returns:
+            A view of the written bytes. Pass it to `BufferPool.release` once
+            it is no longer needed. The writer must not be used afterwards.
+        """
+        value = self._view[: self._length]
+        self._view.release()
+        self.pool.last_written = self._length
+        return value
@@ -0,0 +1,180 @@
+"""Reduced-precision serialization of float columns.
+
+TabPFN computes in float32 or float16, so float64 values can be sent at a
+lower precision without changing predictions noticeably, halving or
+quartering their payload. Columns are downcast one at a time, and only if
+all of their finite non-zero values are within the normal range of the
+narrower dtype, so no value overflows to infinity or underflows to zero.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Literal, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .columns import ColumnValues, encode_label, iter_columns
+from .sparse import SparseMatrix, is_sparse
+
+
+# The narrowest float dtype values are downcast to. "float16" falls back to
+# float32 for columns outside of the float16 range.
+FloatPrecision = Literal["float32", "float16"]
+
+_CANDIDATES: Dict[str, Tuple[np.dtype, ...]] = {
+    "float32": (np.dtype(np.float32),),
+    "float16": (np.dtype(np.float16), np.dtype(np.float32)),
+}
+
+
+@dataclass(frozen=True)
+class PrecisionReport:
+    """The float columns that were downcast, and the error introduced."""
+
+    dtypes: Dict[Union[str, int], str] = field(default_factory=dict)
+    """The new dtype of every downcast column, by label as encoded by
+    `encode_label`, or by position for arrays and sparse matrices."""
+
+    max_abs_error: float = 0.0
+    """The largest absolute difference between an original and a downcast
+    value."""
+
+    max_rel_error: float = 0.0
+    """The largest difference between an original and a downcast value,
+    relative to the original value. Zeros are always exact."""
+
+
+def reduce_precision(
+    data: Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix],
+    precision: FloatPrecision,
+) -> Tuple[Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix], PrecisionReport]:
+    """Downcast the float columns of data to a lower precision.
+
+    Only the downcast columns are copied, at their new width. Non-float
+    columns and columns that already are narrow enough are kept as they are.
+    A 2D array is downcast as a whole, to a dtype all of its columns fit,
+    and sparse matrices to float32 at most.
+
+    Args:
+        data: The data to downcast.
+        precision: The narrowest dtype to downcast to.
+
+    Returns:
+        A tuple of (the downcast data, a report of the downcast columns and
+        the error introduced).
+    """
+    if precision not in _CANDIDATES:
+        raise ValueError(
+            f"Unsupported precision: {precision!r}, expected one of "
+            f"{sorted(_CANDIDATES)}"
+        )
+    candidates = _CANDIDATES[precision]
+
+    if is_sparse(data):
+        matrix: SparseMatrix = data
+        # scipy.sparse does not support float16
+        dtype = _narrowest_fitting_dtype(
+            matrix.data, tuple(dtype for dtype in candidates if dtype.itemsize >= 4)
+        )
+        if dtype is None:
+            return data, PrecisionReport()
+        downcast = matrix.astype(dtype)
+        return downcast, _array_report(matrix.data, downcast.data, matrix.shape[1])
+
+    if isinstance(data, np.ndarray):
+        dtype = _narrowest_fitting_dtype(data, candidates)
+        if dtype is None:
+            return data, PrecisionReport()
+        downcast = data.astype(dtype)
+        n_columns = 1 if data.ndim == 1 else data.shape[1]
+        return downcast, _array_report(data, downcast, n_columns)
+
+    dtypes: Dict[Union[str, int], str] = {}
+    columns: Dict[int, ColumnValues] = {}
+    max_abs_error = max_rel_error = 0.0
+    for position, (label, values) in enumerate(iter_columns(data)):
+        if not isinstance(values, np.ndarray):
+            continue
+        dtype = _narrowest_fitting_dtype(values, candidates)
+        if dtype is None:
+            continue
+
+        downcast_values = values.astype(dtype)
+        abs_error, rel_error = _errors(values, downcast_values)
+        columns[position] = downcast_values
+        dtypes[encode_label(label)] = str(dtype)
+        max_abs_error = max(max_abs_error, abs_error)
+        max_rel_error = max(max_rel_error, rel_error)
+
+    report = PrecisionReport(
+        dtypes=dtypes, max_abs_error=max_abs_error, max_rel_error=max_rel_error
+    )
+    if not columns:
+        return data, report
+    if isinstance(data, pd.Series):
+        return pd.Series(columns[0], index=data.index, name=data.name), report
+
+    downcast = pd.DataFrame(
+        {
+            position: columns.get(position, values)
+            for position, (_, values) in enumerate(iter_columns(data))
+        },
+        index=data.index,
+        copy=False,
+    )
+    downcast.columns = data.columns
+    return downcast, report
+
+
+def _array_report(
+    values: np.ndarray, downcast: np.ndarray, n_columns: int
+) -> PrecisionReport:
+    abs_error, rel_error = _errors(values, downcast)
+    return PrecisionReport(
+        dtypes={position: str(downcast.dtype) for position in range(n_columns)},
+        max_abs_error=abs_error,
+        max_rel_error=rel_error,
+    )
+
+
+def _narrowest_fitting_dtype(
+    values: np.ndarray, candidates: Tuple[np.dtype, ...]
+) -> Any:
+    # The first candidate narrower than the values whose normal range holds
+    # all of their finite non-zero magnitudes, None if there is none
+    if values.dtype.kind != "f":
+        return None
+    narrower = [dtype for dtype in candidates if dtype.itemsize < values.dtype.itemsize]
+    if not narrower:
+        return None
+
+    magnitudes = np.abs(values)
+    magnitudes = magnitudes[np.isfinite(magnitudes) & (magnitudes > 0)]
+    if magnitudes.size == 0:
+        return narrower[0]
+    smallest, largest = magnitudes.min(), magnitudes.max()
+
+    for dtype in narrower:
+        info = np.finfo(dtype)
+        if smallest >= info.tiny and largest <= info.max:
+            return dtype
+    return None
+
+
+def _errors(values: np.ndarray, downcast: np.ndarray) -> Tuple[float, float]:
+    # fmax ignores the NaN of missing values and of infinities minus themselves
+    with np.errstate(invalid="ignore"):
+        differences = np.abs(values - downcast.astype(values.dtype))
+    magnitudes = np.abs(values)
+    relative = np.divide(
+        differences,
+        magnitudes,
+        out=np.zeros_like(differences),
+        where=np.isfinite(magnitudes) & (magnitudes > 0),
+    )
+    return (
+        float(np.fmax.reduce(differences, axis=None, initial=0.0)),
+        float(np.fmax.reduce(relative, axis=None, initial=0.0)),
+    )
@@ -0,0 +1,154 @@
+"""Column schemas of serialized data."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .columns import encode_label, iter_columns
+from .sparse import SparseMatrix, is_sparse
+
+
+# Marks a line of a CSV payload holding the schema of its columns
+CSV_SCHEMA_PREAMBLE = b"#schema:"
+
+SCHEMA_VERSION = 1
+
+
+@dataclass(frozen=True)
+class FrameSchema:
+    """The column labels and dtypes of serialized data."""
+
+    columns: Tuple[Union[str, int], ...]
+    """The column labels, as encoded by `encode_label`."""
+
+    dtypes: Tuple[str, ...]
+    """The dtype of each column, as understood by `np.dtype` or pandas."""
+
+    def __post_init__(self) -> None:
+        if len(self.columns) != len(self.dtypes):
+            raise ValueError(
+                f"Got {len(self.columns)} columns but {len(self.dtypes)} dtypes"
+            )
+
+    @classmethod
+    def from_data(
+        cls, data: Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix]
+    ) -> "FrameSchema":
+        """Get the schema of data.
+
+        Args:
+            data: The data to get the schema of. The columns of a sparse
+                matrix are labeled by their position.
+
+        Returns:
+            The schema of the data.
+        """
+        if is_sparse(data):
+            n_columns = data.shape[1]
+            return cls(
+                columns=tuple(range(n_columns)),
+                dtypes=(str(data.dtype),) * n_columns,
+            )
+
+        columns = []
+        dtypes = []
+        for label, values in iter_columns(data):
+            columns.append(encode_label(label))
+            dtypes.append(str(values.dtype))
+
+        return cls(columns=tuple(columns), dtypes=tuple(dtypes))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the schema to a JSON-compatible dictionary."""
+        return {
+            "version": SCHEMA_VERSION,
+            "columns": list(self.columns),
+            "dtypes": list(self.dtypes),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FrameSchema":
+        """Create a schema from the output of `to_dict`."""
+        if data.get("version", SCHEMA_VERSION) > SCHEMA_VERSION:
+            raise ValueError(f"Unsupported schema version: {data['version']}")
+
+        return cls(columns=tuple(data["columns"]), dtypes=tuple(data["dtypes"]))
+
+    @property
+    def is_numeric(self) -> bool:
+        """Whether all columns have a NumPy numeric or bool dtype."""
+        return all(_is_numeric(dtype) for dtype in self.dtypes)
+
+    def check_columns(self, labels: Iterable) -> None:
+        """Check that column labels match the schema.
+
+        Labels are compared as strings, as formats like CSV do not preserve
+        their types.
+
+        Args:
+            labels: The column labels to check.
+        """
+        expected = [str(label) for label in self.columns]
+        actual = [str(label) for label in labels]
+        if actual != expected:
+            raise ValueError(
+                f"Columns {actual} do not match the schema columns {expected}"
+            )
+
+    def check_compatible(self, other: "FrameSchema") -> None:
+        """Check that data of another schema can be used in place of this one.
+
+        This is e.g. the case for the test data of a model fit on training
+        data: both must have the same columns, in the same order, with the
+        same dtypes.
+
+        Args:
+            other: The schema to check.
+        """
+        problems: List[str] = []
+        if len(other.columns) != len(self.columns):
+            problems.append(
+                f"expected {len(self.columns)} columns, got {len(other.columns)}"
+            )
+        for position, (expected, actual) in enumerate(
+            zip(
+                zip(self.columns, self.dtypes),
+                zip(other.columns, other.dtypes),
+            )
+        ):
+            if str(actual[0]) != str(expected[0]):
+                problems.append(
+                    f"column {position} is {actual[0]!r}, expected {expected[0]!r}"
+                )
+            elif actual[1] != expected[1]:
+                problems.append(
+                    f"column {actual[0]!r} has dtype {actual[1]}, "
+                    f"expected {expected[1]}"
+                )
+
+        if problems:
+            raise ValueError(f"Incompatible schemas: {'; '.join(problems)}")
+
+    def common_dtype(self) -> np.dtype:
+        """Get the dtype that all columns can be stored in.
+
+        Returns:
+            The common NumPy dtype of the columns.
+        """
+        if not self.is_numeric:
+            raise ValueError(f"Schema has non-numeric dtypes: {self.dtypes}")
+        if not self.dtypes:
+            return np.dtype(np.float64)
+
+        return np.result_type(*[np.dtype(dtype) for dtype in self.dtypes])
+
+
+def _is_numeric(dtype: str) -> bool:
+    try:
+        return np.dtype(dtype).kind in "biuf"
+    except TypeError:
+        return False
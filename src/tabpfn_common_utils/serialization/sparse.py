@@ -0,0 +1,62 @@
+"""Access to scipy.sparse matrices shared by the serializers."""
+
+from __future__ import annotations
+
+from typing import Any, Iterator, Tuple
+
+import numpy as np
+import scipy.sparse
+
+
+# A scipy.sparse matrix or array, of any sparse format. scipy's own type
+# hints do not expose the methods shared by all formats.
+SparseMatrix = Any
+
+# Number of cells of the dense row blocks materialized from a sparse matrix
+DENSE_BLOCK_CELLS = 1 << 20
+
+
+def is_sparse(data: Any) -> bool:
+    """Check whether data is a scipy.sparse matrix or array.
+
+    Args:
+        data: The data to check.
+
+    Returns:
+        True if `data` is sparse.
+    """
+    return scipy.sparse.issparse(data)
+
+
+def as_row_sliceable(matrix: SparseMatrix) -> SparseMatrix:
+    """Get a sparse matrix whose row blocks can be sliced cheaply.
+
+    Args:
+        matrix: A sparse matrix of any format.
+
+    Returns:
+        `matrix` itself if it is in CSR format, a CSR copy of it otherwise.
+    """
+    return matrix if matrix.format == "csr" else matrix.tocsr()
+
+
+def iter_dense_row_blocks(
+    matrix: SparseMatrix, block_cells: int = DENSE_BLOCK_CELLS
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """Iterate over dense blocks of consecutive rows of a sparse matrix.
+
+    Only one block is dense at a time, so memory stays bounded by
+    `block_cells` whatever the density of the matrix.
+
+    Args:
+        matrix: The sparse matrix.
+        block_cells: The maximum number of cells of a block.
+
+    Returns:
+        An iterator over (start row, dense block) pairs.
+    """
+    matrix = as_row_sliceable(matrix)
+    n_rows, n_columns = matrix.shape
+    block_rows = max(1, block_cells // max(n_columns, 1))
+    for start in range(0, n_rows, block_rows):
+        yield start, matrix[start : start + block_rows].toarray()
@@ -0,0 +1,181 @@
+"""File objects that stream upload content without loading it into memory."""
+
+from __future__ import annotations
+
+import io
+import lzma
+import mmap
+import os
+import zlib
+from typing import IO, Any, Iterable, Iterator, Optional, Union
+
+from .compression import DEFAULT_BLOCK_SIZE, Compression
+from .formats import BufferReader
+
+
+# Content of a file upload, either in memory or streamed from a source
+UploadContent = Union[
+    bytes,
+    bytearray,
+    memoryview,
+    mmap.mmap,
+    "os.PathLike[str]",
+    IO[bytes],
+    Iterable[bytes],
+]
+
+# A readable binary file object
+BinaryStream = Union[IO[bytes], io.RawIOBase]
+
+
+def open_upload_content(content: UploadContent) -> Union[bytes, BinaryStream]:
+    """Turn upload content into something an HTTP client can send.
+
+    Bytes are returned as they are. Everything else becomes a binary file
+    object that is read chunk by chunk as the request is sent: memoryviews
+    and memory-mapped files are read in place, paths are opened on first
+    read and closed at the end, and iterators of byte chunks are consumed
+    as they are read.
+
+    Args:
+        content: The content of the upload.
+
+    Returns:
+        The bytes or binary file object to send.
+    """
+    if isinstance(content, bytes):
+        return content
+    if isinstance(content, (bytearray, memoryview, mmap.mmap)):
+        return BufferReader(content)  # type: ignore[arg-type]
+    if isinstance(content, str):
+        raise TypeError(
+            "Upload content must be bytes, pass a pathlib.Path to upload a file"
+        )
+    if isinstance(content, os.PathLike):
+        return PathReader(content)
+    if isinstance(content, io.TextIOBase):
+        raise TypeError("Upload file objects must be opened in binary mode")
+    if hasattr(content, "read"):
+        return content  # type: ignore[return-value]
+    if isinstance(content, Iterable):
+        return IterableReader(content)
+
+    raise TypeError(f"Unsupported upload content: {type(content).__name__}")
+
+
+class PathReader(io.RawIOBase):
+    """A binary file object over a path, which is only open while reading.
+
+    The file is opened on the first read or seek and closed once it has
+    been read to the end, so building many uploads holds no file handles.
+    """
+
+    def __init__(self, path: "os.PathLike[str]") -> None:
+        self._path = os.fspath(path)
+        self._file: Optional[IO[bytes]] = None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._open().seek(offset, whence)
+
+    def tell(self) -> int:
+        return 0 if self._file is None else self._file.tell()
+
+    def readinto(self, buffer: Any) -> int:
+        size = self._open().readinto(buffer)  # type: ignore[attr-defined]
+        if not size:
+            self._release()
+        return size
+
+    def close(self) -> None:
+        self._release()
+        super().close()
+
+    def _open(self) -> IO[bytes]:
+        if self._file is None:
+            self._file = open(self._path, "rb", buffering=0)
+        return self._file
+
+    def _release(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class IterableReader(io.RawIOBase):
+    """A binary file object over an iterable of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = memoryview(chunk).cast("B")
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+class CompressingReader(io.RawIOBase):
+    """A binary file object compressing another one as it is read.
+
+    The output is a single gzip member, zlib stream or xz stream, which
+    `decompress_payload` reads like the output of `compress_payload`.
+    """
+
+    def __init__(
+        self,
+        source: BinaryStream,
+        compression: Compression,
+        level: Optional[int] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ) -> None:
+        if compression == "gzip" or compression == "zlib":
+            self._compressor: Any = zlib.compressobj(
+                zlib.Z_DEFAULT_COMPRESSION if level is None else level,
+                zlib.DEFLATED,
+                31 if compression == "gzip" else 15,
+            )
+        elif compression == "lzma":
+            self._compressor = lzma.LZMACompressor(
+                preset=lzma.PRESET_DEFAULT if level is None else level
+            )
+        else:
+            raise ValueError(f"Unsupported compression: {compression}")
+
+        self._source = source
+        self._block_size = block_size
+        self._pending = memoryview(b"")
+        self._finished = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._pending and not self._finished:
+            block = self._source.read(self._block_size)
+            if block:
+                compressed = self._compressor.compress(block)
+            else:
+                compressed = self._compressor.flush()
+                self._finished = True
+            self._pending = memoryview(compressed)
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
@@ -1,3 +1,6 @@
+import io
+import itertools
+import mimetypes
 import time
 import typing
 
@@ -11,33 +14,670 @@ from typing import Literal, Union, Dict, Any
 from dataclasses import dataclass
 from typing_extensions import override
 
+from .serialization import (
+    CONTENT_ENCODINGS,
+    BinaryStream,
+    BufferPool,
+    BufferWriter,
+    BytesLike,
+    Compression,
+    CompressingReader,
+    DeltaPayload,
+    FloatPrecision,
+    FrameSchema,
+    PayloadCache,
+    SerializationFormat,
+    ParallelBackend,
+    SparseMatrix,
+    UploadContent,
+    adapt_input,
+    as_row_sliceable,
+    check_float_precision,
+    compress_payload,
+    decode_arrow_stream,
+    decode_binary_array,
+    decode_binary_frame,
+    decode_csv_array,
+    decode_csv_frame,
+    decompress_payload,
+    detect_append,
+    detect_format,
+    encode_arrow_stream,
+    encode_binary_frame,
+    encode_binary_sparse,
+    encode_csv,
+    encode_csv_dictionaries,
+    encode_csv_parallel,
+    encode_csv_schema,
+    fingerprint_data,
+    format_csv_temporal_columns,
+    is_sparse,
+    open_upload_content,
+    payload_cache_key,
+    read_arrow_schema,
+    read_binary_schema,
+    read_csv_schema,
+    reduce_precision,
+    resolve_n_jobs,
+    to_arrow_table,
+)
+
+
+# Number of cells formatted at a time when writing CSV into pooled buffers
+_POOLED_CSV_BLOCK_CELLS = 1 << 16
+
 
 def serialize_to_csv_formatted_bytes(
+    data: typing.Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix],
+    float_precision: typing.Optional[int] = None,
+    n_jobs: typing.Optional[int] = None,
+    backend: ParallelBackend = "process",
+    dictionary_encode: bool = False,
+    include_schema: bool = False,
+    precision: typing.Optional[FloatPrecision] = None,
+    cache: typing.Optional[PayloadCache] = None,
+) -> bytes:
+    """Serialize data to CSV formatted bytes.
+
+    Args:
+        data: The data to serialize. scipy.sparse matrices are formatted one
+            dense block of rows at a time, so they are never fully densified.
+            Arrow tables, polars frames, torch tensors and other objects
+            exporting the Arrow, DLPack or NumPy array interfaces are
+            converted without copying their values where possible, see
+            `register_input_adapter`.
+        float_precision: The number of significant digits written for float
+            values. Defaults to the shortest representation that round-trips
+            exactly, which takes about twice the bytes of 6-7 digits.
+        n_jobs: The number of workers serializing blocks of rows in parallel,
+            -1 uses all CPUs. The output is identical for any value.
+        backend: Whether the workers are processes or threads. Formatting
+            holds the GIL, so threads only pay off on free-threaded Python.
+        dictionary_encode: Whether to write categorical and string columns
+            as integer codes, preceded by a preamble line holding their
+            dictionaries. Much smaller for low-cardinality columns, but only
+            readable by `deserialize_from_formatted_bytes`.
+        include_schema: Whether to start with a preamble line holding the
+            column labels and dtypes. `deserialize_from_formatted_bytes` then
+            parses every column with its original dtype, e.g. bool,
+            datetime, float32 or nullable integers, instead of inferring it,
+            and `read_schema` reads it without parsing the rows. Categorical
+            columns only keep their categories with `dictionary_encode`.
+        precision: If given, float columns are downcast to this dtype, or
+            for "float16" to float32 where their values exceed the float16
+            range, before they are written. Use `reduce_precision` to get
+            the error this introduces.
+        cache: If given, the payload is looked up in the cache by the
+            fingerprint of the data and the options, and only serialized and
+            cached if it is not found there. Sparse matrices are not cached.
+
+    Returns:
+        The CSV formatted bytes.
+    """
+    if cache is not None:
+        options = {
+            "serializer": "csv",
+            "float_precision": float_precision,
+            "dictionary_encode": dictionary_encode,
+            "include_schema": include_schema,
+            "precision": precision,
+        }
+        return _cached_payload(
+            cache,
+            data,
+            options,
+            n_jobs,
+            lambda: serialize_to_csv_formatted_bytes(
+                data,
+                float_precision=float_precision,
+                n_jobs=n_jobs,
+                backend=backend,
+                dictionary_encode=dictionary_encode,
+                include_schema=include_schema,
+                precision=precision,
+            ),
+        )
+
+    data = _as_serializable(data, precision=precision)
+    check_float_precision(float_precision)
+    data, preamble = _csv_preamble(data, dictionary_encode, include_schema)
+
+    if resolve_n_jobs(n_jobs) > 1:
+        payload = encode_csv_parallel(
+            data, float_precision=float_precision, n_jobs=n_jobs, backend=backend
+        )
+    else:
+        payload = encode_csv(data, header=True, float_precision=float_precision)
+    return preamble + payload if preamble else payload
+
+
+def iter_csv_formatted_bytes(
+    data: typing.Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix],
+    chunk_rows: int = 10_000,
+    float_precision: typing.Optional[int] = None,
+    dictionary_encode: bool = False,
+    include_schema: bool = False,
+    precision: typing.Optional[FloatPrecision] = None,
+) -> typing.Iterator[bytes]:
+    """Serialize data to CSV formatted bytes, one block of rows at a time.
+
+    The concatenation of all chunks equals the output of
+    `serialize_to_csv_formatted_bytes`, but only a single block of rows is
+    held as text at any time, so peak memory does not grow with the input.
+    The chunks can be passed directly to an HTTP request body or a file.
+
+    Args:
+        data: The data to serialize.
+        chunk_rows: The number of rows serialized per chunk.
+        float_precision: The number of significant digits written for float
+            values, see `serialize_to_csv_formatted_bytes`.
+        dictionary_encode: Whether to dictionary-encode categorical and
+            string columns, see `serialize_to_csv_formatted_bytes`.
+        include_schema: Whether to start with the schema of the columns, see
+            `serialize_to_csv_formatted_bytes`.
+        precision: The dtype float columns are downcast to, see
+            `serialize_to_csv_formatted_bytes`.
+
+    Returns:
+        An iterator over the CSV formatted bytes of consecutive row blocks,
+        the first chunk starting with the header, or with the preamble lines
+        if there are any.
+    """
+    data = _as_serializable(data, precision=precision)
+    check_float_precision(float_precision)
+    if chunk_rows < 1:
+        raise ValueError(f"chunk_rows must be positive, got {chunk_rows}")
+
+    data, preamble = _csv_preamble(data, dictionary_encode, include_schema)
+
+    chunks = _iter_csv_chunks(data, chunk_rows, float_precision)
+    return itertools.chain([preamble], chunks) if preamble else chunks
+
+
+def _csv_preamble(
+    data: Any, dictionary_encode: bool, include_schema: bool
+) -> typing.Tuple[Any, bytes]:
+    # The schema describes the columns before dictionary encoding
+    preamble = encode_csv_schema(data) if include_schema else b""
+    if dictionary_encode:
+        data, dictionaries = encode_csv_dictionaries(data)
+        preamble += dictionaries
+    return data, preamble
+
+
+def _iter_csv_chunks(
+    data: typing.Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix],
+    chunk_rows: int,
+    float_precision: typing.Optional[int],
+) -> typing.Iterator[bytes]:
+    n_rows = data.shape[0]
+    if is_sparse(data):
+        data = as_row_sliceable(data)
+    elif n_rows > chunk_rows:
+        # All chunks must use the same format for datetimes and timedeltas
+        data = format_csv_temporal_columns(data)
+
+    # Always emit at least one chunk, so that empty data still yields a header
+    for start in range(0, max(n_rows, 1), chunk_rows):
+        block = _slice_rows(data, start, start + chunk_rows)
+        yield encode_csv(block, header=start == 0, float_precision=float_precision)
+
+
+def fingerprint(
     data: typing.Union[pd.DataFrame, pd.Series, np.ndarray],
+    n_jobs: typing.Optional[int] = None,
+) -> str:
+    """Compute a content fingerprint of data, without serializing it.
+
+    The fingerprint only depends on the shape, column labels, dtypes and
+    values, so it can be used to check whether the same data was already
+    uploaded. It is the same for C and Fortran ordered arrays, and for an
+    array and a DataFrame wrapping it.
+
+    Args:
+        data: The data to fingerprint.
+        n_jobs: The number of threads hashing columns, -1 uses all CPUs.
+
+    Returns:
+        The hex digest of the fingerprint.
+    """
+    data = _as_serializable(data, allow_sparse=False)
+
+    return fingerprint_data(data, n_jobs=n_jobs)
+
+
+def serialize_to_formatted_bytes(
+    data: typing.Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix],
+    format: SerializationFormat = "csv",
+    *,
+    float_precision: typing.Optional[int] = None,
+    compression: typing.Optional[Compression] = None,
+    n_jobs: typing.Optional[int] = None,
+    dictionary_encode: bool = False,
+    include_schema: bool = False,
+    precision: typing.Optional[FloatPrecision] = None,
+    cache: typing.Optional[PayloadCache] = None,
 ) -> bytes:
-    if type(data) not in [pd.DataFrame, pd.Series, np.ndarray]:
-        raise TypeError(f"({type(data)}) is not supported for serialization")
+    """Serialize data to bytes in the given wire format.
+
+    Args:
+        data: The data to serialize.
+        format: The wire format. "csv" produces the same output as
+            `serialize_to_csv_formatted_bytes`. "binary" writes a small
+            self-describing header followed by raw little-endian column
+            buffers, and "arrow" writes an Arrow IPC stream (requires pyarrow).
+            Both binary formats skip float formatting and are typically a
+            fraction of the size of the CSV output. scipy.sparse matrices
+            are supported by "csv" and by "binary", which stores their CSR or
+            CSC arrays.
+        float_precision: The number of significant digits written for float
+            values, only supported by the "csv" format.
+        compression: If given, the serialized bytes are compressed. Send them
+            with the Content-Encoding from `CONTENT_ENCODINGS`.
+        n_jobs: The number of workers serializing blocks of rows in the "csv"
+            format, and compressing blocks of the payload, -1 uses all CPUs.
+        dictionary_encode: Whether to dictionary-encode categorical and
+            string columns in the "csv" format, see
+            `serialize_to_csv_formatted_bytes`. The "binary" format always
+            dictionary-encodes them, with int8 to int64 codes depending on
+            the number of distinct values.
+        include_schema: Whether to start a "csv" payload with the schema of
+            its columns, see `serialize_to_csv_formatted_bytes`. The "binary"
+            and "arrow" formats always describe their columns.
+        precision: If given, float columns are downcast to this dtype, see
+            `serialize_to_csv_formatted_bytes`. Halves the size of float64
+            columns in the "binary" and "arrow" formats.
+        cache: If given, the payload is looked up in the cache first, see
+            `serialize_to_csv_formatted_bytes`.
+
+    Returns:
+        The serialized bytes.
+    """
+    if cache is not None:
+        options = {
+            "serializer": "formatted",
+            "format": format,
+            "float_precision": float_precision,
+            "compression": compression,
+            "dictionary_encode": dictionary_encode,
+            "include_schema": include_schema,
+            "precision": precision,
+        }
+        return _cached_payload(
+            cache,
+            data,
+            options,
+            n_jobs,
+            lambda: serialize_to_formatted_bytes(
+                data,
+                format,
+                float_precision=float_precision,
+                compression=compression,
+                n_jobs=n_jobs,
+                dictionary_encode=dictionary_encode,
+                include_schema=include_schema,
+                precision=precision,
+            ),
+        )
+
+    # Arrow inputs are written to Arrow streams as they are
+    table = to_arrow_table(data) if format == "arrow" and precision is None else None
+    data = _as_serializable(data, precision=precision)
+
+    if format == "csv":
+        payload = serialize_to_csv_formatted_bytes(
+            data,
+            float_precision=float_precision,
+            n_jobs=n_jobs,
+            dictionary_encode=dictionary_encode,
+            include_schema=include_schema,
+        )
+    elif float_precision is not None:
+        raise ValueError("float_precision is only supported by the 'csv' format")
+    elif format == "binary":
+        if is_sparse(data):
+            payload = encode_binary_sparse(data)
+        else:
+            payload = encode_binary_frame(data)
+    elif format == "arrow":
+        if is_sparse(data):
+            raise TypeError("Sparse matrices are not supported by the 'arrow' format")
+        payload = encode_arrow_stream(data if table is None else table)
+    else:
+        raise ValueError(f"Unsupported serialization format: {format}")
+
+    if compression is None:
+        return payload
+    return compress_payload(payload, compression, n_jobs=n_jobs)
+
+
+def serialize_to_pooled_buffer(
+    data: typing.Union[pd.DataFrame, pd.Series, np.ndarray, SparseMatrix],
+    pool: BufferPool,
+    format: typing.Literal["csv", "binary"] = "binary",
+    *,
+    float_precision: typing.Optional[int] = None,
+    dictionary_encode: bool = False,
+    include_schema: bool = False,
+    precision: typing.Optional[FloatPrecision] = None,
+    chunk_rows: typing.Optional[int] = None,
+    size_hint: typing.Optional[int] = None,
+) -> memoryview:
+    """Serialize data into a reusable buffer instead of a new bytes object.
+
+    The payload equals the output of `serialize_to_formatted_bytes`. The
+    "binary" format is written straight into a buffer of the exact size,
+    the "csv" format one block of `chunk_rows` rows at a time. Once the
+    buffers of a steady stream of similar-sized payloads are in the pool,
+    serializing allocates no further payload-sized objects.
+
+    Args:
+        data: The data to serialize.
+        pool: The pool the buffer is taken from.
+        format: The wire format, "csv" or "binary".
+        float_precision: See `serialize_to_formatted_bytes`.
+        dictionary_encode: See `serialize_to_formatted_bytes`.
+        include_schema: See `serialize_to_formatted_bytes`.
+        precision: See `serialize_to_formatted_bytes`.
+        chunk_rows: The number of rows formatted at a time in the "csv"
+            format. Defaults to blocks of about 65k cells, which bounds the
+            temporary text to a few megabytes.
+        size_hint: The expected size of a "csv" payload, whose buffer is
+            otherwise grown as it is written. Defaults to the size of the
+            last payload written into `pool` this way.
+
+    Returns:
+        A view of the payload in a buffer of `pool`. Pass it to
+        `pool.release` once the payload was sent.
+    """
+    data = _as_serializable(data, precision=precision)
+
+    if format == "csv":
+        block_rows = chunk_rows
+        if block_rows is None:
+            n_columns = 1 if data.ndim == 1 else data.shape[1]
+            block_rows = max(1, _POOLED_CSV_BLOCK_CELLS // max(n_columns, 1))
+        writer = BufferWriter(pool, size_hint)
+        for chunk in iter_csv_formatted_bytes(
+            data,
+            chunk_rows=block_rows,
+            float_precision=float_precision,
+            dictionary_encode=dictionary_encode,
+            include_schema=include_schema,
+        ):
+            writer.write(chunk)
+        return writer.getvalue()
+
+    if float_precision is not None:
+        raise ValueError("float_precision is only supported by the 'csv' format")
+    if format == "binary":
+        if is_sparse(data):
+            return encode_binary_sparse(data, pool=pool)
+        return encode_binary_frame(data, pool=pool)
+
+    raise ValueError(f"Unsupported format for pooled buffers: {format}")
+
+
+def serialize_delta_to_formatted_bytes(
+    data: typing.Union[pd.DataFrame, pd.Series, np.ndarray],
+    base_fingerprint: typing.Optional[str] = None,
+    base_n_rows: typing.Optional[int] = None,
+    format: SerializationFormat = "csv",
+    *,
+    float_precision: typing.Optional[int] = None,
+    compression: typing.Optional[Compression] = None,
+    n_jobs: typing.Optional[int] = None,
+    precision: typing.Optional[FloatPrecision] = None,
+) -> DeltaPayload:
+    """Serialize only the rows appended to previously serialized data.
+
+    If the first `base_n_rows` rows of `data` have the fingerprint of the
+    base, only the remaining rows are serialized, otherwise, e.g. when rows
+    of the base changed, all rows are. The prefix and the full fingerprint
+    are computed in a single pass, which is much cheaper than serializing
+    the rows of the base again.
+
+    Args:
+        data: The data to serialize.
+        base_fingerprint: The `fingerprint` of the previously serialized
+            data, e.g. `DeltaPayload.fingerprint` of the previous call.
+        base_n_rows: The number of rows of the previously serialized data,
+            e.g. `DeltaPayload.n_rows` of the previous call.
+        format: The wire format, see `serialize_to_formatted_bytes`. A "csv"
+            delta starts with its own header line.
+        float_precision: See `serialize_to_formatted_bytes`.
+        compression: See `serialize_to_formatted_bytes`.
+        n_jobs: The number of workers fingerprinting and serializing, -1
+            uses all CPUs.
+        precision: See `serialize_to_formatted_bytes`. Fingerprints are
+            computed from the values at full precision.
+
+    Returns:
+        The payload, with the fingerprint and number of rows to pass as the
+        base of the next delta.
+    """
+    data = _as_serializable(data, allow_sparse=False)
+    is_append, data_fingerprint = detect_append(
+        data, base_fingerprint, base_n_rows, n_jobs=n_jobs
+    )
+    start_row = base_n_rows if is_append and base_n_rows is not None else 0
+
+    payload = serialize_to_formatted_bytes(
+        _slice_rows(data, start_row, len(data)),
+        format,
+        float_precision=float_precision,
+        compression=compression,
+        n_jobs=n_jobs,
+        precision=precision,
+    )
+    return DeltaPayload(
+        payload=payload,
+        start_row=start_row,
+        base_fingerprint=base_fingerprint if is_append else None,
+        fingerprint=data_fingerprint,
+        n_rows=len(data),
+    )
+
+
+@typing.overload
+def deserialize_from_formatted_bytes(
+    buffer: BytesLike,
+    format: typing.Optional[SerializationFormat] = None,
+    compression: typing.Optional[Compression] = None,
+    schema: None = None,
+) -> pd.DataFrame: ...
+
+
+@typing.overload
+def deserialize_from_formatted_bytes(
+    buffer: BytesLike,
+    format: typing.Optional[SerializationFormat] = None,
+    compression: typing.Optional[Compression] = None,
+    *,
+    schema: FrameSchema,
+) -> np.ndarray: ...
+
+
+def deserialize_from_formatted_bytes(
+    buffer: BytesLike,
+    format: typing.Optional[SerializationFormat] = None,
+    compression: typing.Optional[Compression] = None,
+    schema: typing.Optional[FrameSchema] = None,
+) -> typing.Union[pd.DataFrame, np.ndarray]:
+    """Deserialize bytes produced by `serialize_to_formatted_bytes`.
+
+    Memoryviews and memory-mapped files are read without copying them.
 
-    if isinstance(data, np.ndarray):
-        data = pd.DataFrame(data)
+    Args:
+        buffer: The serialized bytes.
+        format: The wire format of `buffer`. Detected from the leading bytes
+            if not given.
+        compression: The compression applied to `buffer`, if any.
+        schema: The schema of the serialized data, e.g. from
+            `FrameSchema.from_data`. If given, all of its columns must be
+            numeric and the data is parsed straight into a preallocated
+            array of their common dtype, skipping dtype inference.
 
-    # data is now of type pd.DataFrame
-    csv_bytes = data.to_csv(index=False).encode("utf-8")
+    Returns:
+        The deserialized DataFrame, or array if `schema` is given. Sparse
+        matrices in the "binary" format are deserialized to a DataFrame of
+        sparse columns.
+    """
+    if compression is not None:
+        buffer = decompress_payload(buffer, compression)
+    if format is None:
+        format = detect_format(buffer)
+
+    if format == "csv":
+        if schema is not None:
+            return decode_csv_array(buffer, schema)
+        return decode_csv_frame(buffer)
+    if format == "binary":
+        if schema is not None:
+            return decode_binary_array(buffer, schema)
+        return decode_binary_frame(buffer)
+    if format == "arrow":
+        frame = decode_arrow_stream(buffer)
+        if schema is not None:
+            schema.check_columns(frame.columns)
+            return frame.to_numpy(dtype=schema.common_dtype())
+        return frame
+
+    raise ValueError(f"Unsupported serialization format: {format}")
+
+
+def read_schema(
+    buffer: BytesLike,
+    format: typing.Optional[SerializationFormat] = None,
+    compression: typing.Optional[Compression] = None,
+) -> typing.Optional[FrameSchema]:
+    """Read the schema of serialized data, without deserializing the rows.
+
+    Compare the schemas of two payloads with `FrameSchema.check_compatible`,
+    e.g. to check that test data matches the training data before sending it.
+
+    Args:
+        buffer: The serialized bytes.
+        format: The wire format of `buffer`. Detected from the leading bytes
+            if not given.
+        compression: The compression applied to `buffer`, if any. The whole
+            payload is decompressed.
+
+    Returns:
+        The schema of the data, None for "csv" payloads serialized without
+        `include_schema`.
+    """
+    if compression is not None:
+        buffer = decompress_payload(buffer, compression)
+    if format is None:
+        format = detect_format(buffer)
+
+    if format == "csv":
+        return read_csv_schema(buffer)
+    if format == "binary":
+        return read_binary_schema(buffer)
+    if format == "arrow":
+        return read_arrow_schema(buffer)
+
+    raise ValueError(f"Unsupported serialization format: {format}")
+
+
+def _cached_payload(
+    cache: PayloadCache,
+    data: Any,
+    options: typing.Dict[str, Any],
+    n_jobs: typing.Optional[int],
+    serialize: typing.Callable[[], bytes],
+) -> bytes:
+    serializable = _as_serializable(data)
+    if is_sparse(serializable):
+        return serialize()
+
+    # The output for e.g. an Arrow table differs from the one for the
+    # DataFrame it is converted to, which has the same fingerprint
+    options = {"input": type(data).__name__, **options}
+    key = payload_cache_key(fingerprint_data(serializable, n_jobs=n_jobs), options)
+    return cache.get_or_create(key, serialize)
+
+
+def _slice_rows(data: Any, start: int, stop: int) -> Any:
+    if isinstance(data, np.ndarray) or is_sparse(data):
+        return data[start:stop]
+    return data.iloc[start:stop]
+
+
+def _as_serializable(
+    data: Any,
+    allow_sparse: bool = True,
+    precision: typing.Optional[FloatPrecision] = None,
+) -> Any:
+    data = adapt_input(data)
+    if is_sparse(data):
+        if not allow_sparse:
+            raise TypeError(f"({type(data)}) is not supported")
+    elif type(data) not in [pd.DataFrame, pd.Series, np.ndarray]:
+        raise TypeError(f"({type(data)}) is not supported for serialization")
 
-    return csv_bytes
+    if precision is not None:
+        data, _ = reduce_precision(data, precision)
+    return data
 
 
 FileName = str
-FileContent = bytes
+FileContent = UploadContent
 FileCategory = str
 FileUpload = typing.Tuple[FileCategory, FileName, FileContent]
 
 
-def to_httpx_post_file_format(file_uploads: typing.List[FileUpload]) -> typing.Dict:
+def to_httpx_post_file_format(
+    file_uploads: typing.List[FileUpload],
+    compression: typing.Optional[Compression] = None,
+    n_jobs: typing.Optional[int] = None,
+) -> typing.Dict:
+    """Convert file uploads to the `files` argument of an httpx request.
+
+    Besides bytes, the content of an upload can be a `pathlib.Path`, a binary
+    file object, a memoryview, a memory-mapped file or an iterable of byte
+    chunks. These are streamed as the request is sent, so large files are
+    never loaded into memory.
+
+    Args:
+        file_uploads: The files to upload.
+        compression: If given, the content of every file is compressed and
+            its part carries the matching Content-Encoding header. Streamed
+            content is compressed as it is read.
+        n_jobs: The number of threads compressing blocks of each in-memory
+            file, see `compress_payload`.
+
+    Returns:
+        A mapping of file category to the httpx file specification.
+    """
     ret = {}
     for file_upload in file_uploads:
         file_category, filename, content = file_upload
-        ret[file_category] = (filename, content)
+        if compression is None:
+            ret[file_category] = (filename, open_upload_content(content))
+            continue
+
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            compressed: typing.Union[bytes, BinaryStream] = compress_payload(
+                content,  # type: ignore[arg-type]
+                compression,
+                n_jobs=n_jobs,
+            )
+        else:
+            source = open_upload_content(content)
+            if isinstance(source, bytes):
+                source = io.BytesIO(source)
+            compressed = CompressingReader(source, compression)
+
+        content_type, _ = mimetypes.guess_type(filename)
+        ret[file_category] = (
+            filename,
+            compressed,
+            content_type or "application/octet-stream",
+            {"Content-Encoding": CONTENT_ENCODINGS[compression]},
+        )
 
     return ret
 
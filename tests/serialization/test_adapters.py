@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tabpfn_common_utils.serialization import adapters
+from tabpfn_common_utils.serialization.adapters import (
+    adapt_input,
+    register_input_adapter,
+    to_arrow_table,
+)
+from tabpfn_common_utils.serialization.arrow import _HAS_PYARROW
+from tabpfn_common_utils.serialization.csv_format import encode_csv
+
+
+class _DLPackArray:
+    """An array exposing only the DLPack protocol."""
+
+    def __init__(self, array: np.ndarray) -> None:
+        self._array = array
+
+    def __dlpack__(self, **kwargs):
+        return self._array.__dlpack__(**kwargs)
+
+    def __dlpack_device__(self):
+        return self._array.__dlpack_device__()
+
+
+class _ArrayLike:
+    """An array exposing only the NumPy array protocol."""
+
+    def __init__(self, array: np.ndarray) -> None:
+        self._array = array
+
+    def __array__(self, dtype=None, copy=None):
+        return self._array
+
+
+class TestAdaptInput:
+    """Test the conversion of inputs from other libraries."""
+
+    array = np.random.RandomState(0).rand(20, 3)
+
+    def test_supported_inputs_are_kept(self) -> None:
+        """Test that NumPy and pandas inputs are passed through."""
+        frame = pd.DataFrame(self.array)
+        assert adapt_input(self.array) is self.array
+        assert adapt_input(frame) is frame
+
+    def test_dlpack_input_is_a_view(self) -> None:
+        """Test that DLPack exports are wrapped without copying."""
+        converted = adapt_input(_DLPackArray(self.array))
+        assert isinstance(converted, np.ndarray)
+        assert np.shares_memory(converted, self.array)
+
+    def test_array_interface_input(self) -> None:
+        """Test that `__array__` objects are converted by NumPy."""
+        converted = adapt_input(_ArrayLike(self.array))
+        assert np.shares_memory(converted, self.array)
+
+    def test_unsupported_input_is_returned(self) -> None:
+        """Test that inputs no adapter applies to are left to the caller."""
+        data = [[1, 2], [3, 4]]
+        assert adapt_input(data) is data
+
+    def test_registered_adapter(self, monkeypatch) -> None:
+        """Test that custom adapters take precedence."""
+        monkeypatch.setattr(adapters, "_INPUT_ADAPTERS", [])
+        register_input_adapter(
+            lambda data: isinstance(data, _ArrayLike),
+            lambda data: pd.DataFrame(data._array, columns=["a", "b", "c"]),
+        )
+        converted = adapt_input(_ArrayLike(self.array))
+        assert list(converted.columns) == ["a", "b", "c"]
+
+
+@pytest.mark.skipif(not _HAS_PYARROW, reason="pyarrow is not installed")
+class TestArrowInputs:
+    """Test Arrow and polars inputs."""
+
+    frame = pd.DataFrame(
+        {"a": np.random.RandomState(0).rand(20), "b": np.arange(20), "c": ["x"] * 20}
+    )
+
+    def test_arrow_table_columns_are_views(self) -> None:
+        """Test that numeric columns share the Arrow buffers."""
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(self.frame, preserve_index=False)
+        converted = adapt_input(table)
+        pd.testing.assert_frame_equal(converted, self.frame, check_dtype=False)
+        assert np.shares_memory(
+            converted["a"].to_numpy(), table.column("a").chunk(0).to_numpy()
+        )
+        assert encode_csv(converted) == encode_csv(self.frame)
+
+    def test_polars_inputs(self) -> None:
+        """Test that polars frames and series go through Arrow."""
+        pl = pytest.importorskip("polars")
+
+        converted = adapt_input(pl.from_pandas(self.frame))
+        assert encode_csv(converted) == encode_csv(self.frame)
+
+        series = adapt_input(pl.Series("a", self.frame["a"].to_numpy()))
+        assert encode_csv(series) == encode_csv(self.frame[["a"]])
+
+    def test_to_arrow_table_ignores_pandas(self) -> None:
+        """Test that pandas inputs are not converted to Arrow."""
+        assert to_arrow_table(self.frame) is None
+
+
+class TestTorchInputs:
+    """Test torch tensor inputs."""
+
+    def test_cpu_tensor_is_a_view(self) -> None:
+        """Test that CPU tensors are serialized from their own memory."""
+        torch = pytest.importorskip("torch")
+
+        tensor = torch.rand(10, 3, dtype=torch.float64)
+        converted = adapt_input(tensor)
+        assert isinstance(converted, np.ndarray)
+        assert converted.ctypes.data == tensor.data_ptr()
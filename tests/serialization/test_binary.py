@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tabpfn_common_utils.serialization.binary import (
+    BINARY_MAGIC,
+    decode_binary_frame,
+    encode_binary_frame,
+    read_binary_header,
+)
+
+
+class TestBinaryFrame:
+    """Test the binary columnar format."""
+
+    def test_roundtrip_dataframe_preserves_dtypes(self) -> None:
+        """Test that numeric, bool and datetime columns survive a round trip."""
+        frame = pd.DataFrame(
+            {
+                "f64": np.array([0.1, np.nan, -3.5]),
+                "f32": np.array([1.5, 2.5, 3.5], dtype=np.float32),
+                "i64": np.array([1, 2, 3]),
+                "i8": np.array([-1, 0, 1], dtype=np.int8),
+                "flag": np.array([True, False, True]),
+                "when": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]),
+            }
+        )
+        decoded = decode_binary_frame(encode_binary_frame(frame))
+        pd.testing.assert_frame_equal(decoded, frame)
+
+    def test_roundtrip_numpy_array(self) -> None:
+        """Test that arrays decode to a frame with integer column labels."""
+        for array in (
+            np.random.RandomState(0).rand(7, 3),
+            np.asfortranarray(np.arange(12.0).reshape(4, 3)),
+        ):
+            decoded = decode_binary_frame(encode_binary_frame(array))
+            assert list(decoded.columns) == [0, 1, 2]
+            np.testing.assert_array_equal(decoded.to_numpy(), array)
+
+    def test_roundtrip_series(self) -> None:
+        """Test that a series decodes to a single column frame."""
+        series = pd.Series([1.0, 2.0, 3.0], name="target")
+        decoded = decode_binary_frame(encode_binary_frame(series))
+        pd.testing.assert_frame_equal(decoded, series.to_frame())
+
+    def test_big_endian_input_is_stored_little_endian(self) -> None:
+        """Test that big-endian arrays are converted to little-endian buffers."""
+        array = np.arange(6, dtype=">f8").reshape(3, 2)
+        payload = encode_binary_frame(array)
+        header, _ = read_binary_header(payload)
+        assert {column["dtype"] for column in header["columns"]} == {"<f8"}
+        np.testing.assert_array_equal(decode_binary_frame(payload).to_numpy(), array)
+
+    def test_columns_are_aligned_views(self) -> None:
+        """Test that decoded columns are aligned views over the payload."""
+        payload = encode_binary_frame(np.random.RandomState(0).rand(5, 3))
+        header, data_start = read_binary_header(payload)
+        assert payload.startswith(BINARY_MAGIC)
+        assert data_start % 8 == 0
+        assert all(column["offset"] % 8 == 0 for column in header["columns"])
+
+        decoded = decode_binary_frame(memoryview(payload))
+        assert np.shares_memory(decoded.iloc[:, 0].to_numpy(), np.frombuffer(payload))
+
+    def test_empty_frame(self) -> None:
+        """Test that frames without rows keep their columns."""
+        frame = pd.DataFrame({"a": np.array([], dtype=np.float64)})
+        pd.testing.assert_frame_equal(
+            decode_binary_frame(encode_binary_frame(frame)), frame
+        )
+
+    def test_unsupported_dtype_raises_error(self) -> None:
+        """Test that interval columns and arbitrary objects are rejected."""
+        for frame in (
+            pd.DataFrame({"a": pd.arrays.IntervalArray.from_breaks([0, 1, 2])}),
+            pd.DataFrame({"a": np.array([object(), object()], dtype=object)}),
+        ):
+            with pytest.raises(TypeError):
+                encode_binary_frame(frame)
+
+    def test_dictionary_encoded_columns(self) -> None:
+        """Test that categorical and string columns decode exactly."""
+        frame = pd.DataFrame(
+            {
+                "category": pd.Categorical(
+                    ["b", "a", None, "b"], categories=["b", "a", "c"], ordered=True
+                ),
+                "int_category": pd.Categorical([3, 1, 3, 3]),
+                "object": np.array(["x", "y", "x", np.nan], dtype=object),
+                "string": pd.array(["u", None, "v", "u"], dtype="string"),
+                "float": np.arange(4.0),
+            }
+        )
+        payload = encode_binary_frame(frame)
+        header, _ = read_binary_header(payload)
+        assert [column["dtype"] for column in header["columns"]][:4] == ["|i1"] * 4
+        pd.testing.assert_frame_equal(decode_binary_frame(payload), frame)
+
+    def test_codes_dtype_depends_on_cardinality(self) -> None:
+        """Test that codes grow with the number of distinct values."""
+        for n_values, dtype in ((100, "|i1"), (1000, "<i2"), (100_000, "<i4")):
+            frame = pd.DataFrame({"a": pd.Categorical(np.arange(n_values))})
+            header, _ = read_binary_header(encode_binary_frame(frame))
+            assert header["columns"][0]["dtype"] == dtype
+
+    def test_invalid_buffer_raises_error(self) -> None:
+        """Test that buffers without the magic are rejected."""
+        with pytest.raises(ValueError):
+            decode_binary_frame(b"a,b\n1,2\n")
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+import threading
+
+import pytest
+
+from tabpfn_common_utils.serialization.cache import PayloadCache, payload_cache_key
+
+
+class TestPayloadCacheKey:
+    """Test the keys of cached payloads."""
+
+    def test_key_depends_on_fingerprint_and_options(self) -> None:
+        """Test that keys differ unless the fingerprint and options match."""
+        key = payload_cache_key("abc", {"format": "csv", "compression": None})
+        assert key == payload_cache_key("abc", {"compression": None, "format": "csv"})
+        assert key != payload_cache_key("abd", {"format": "csv", "compression": None})
+        assert key != payload_cache_key("abc", {"format": "csv", "compression": "gzip"})
+
+
+class TestPayloadCache:
+    """Test the in-memory and on-disk tiers of the payload cache."""
+
+    def test_get_or_create_serializes_once(self) -> None:
+        """Test that a cached payload is not created again."""
+        cache = PayloadCache()
+        calls = []
+
+        def create() -> bytes:
+            calls.append(1)
+            return b"payload"
+
+        assert cache.get_or_create("key", create) == b"payload"
+        assert cache.get_or_create("key", create) == b"payload"
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_least_recently_used_payloads_are_evicted(self) -> None:
+        """Test that the memory budget is respected in LRU order."""
+        cache = PayloadCache(max_bytes=10)
+        cache.put("a", b"1234")
+        cache.put("b", b"1234")
+        assert cache.get("a") == b"1234"
+        cache.put("c", b"1234")
+
+        assert "b" not in cache
+        assert "a" in cache and "c" in cache
+        assert cache.n_bytes == 8
+
+    def test_payload_larger_than_budget_is_not_kept(self) -> None:
+        """Test that a single large payload does not evict everything."""
+        cache = PayloadCache(max_bytes=10)
+        cache.put("small", b"1234")
+        cache.put("large", b"x" * 11)
+        assert cache.get("large") is None
+        assert cache.get("small") == b"1234"
+
+    def test_disk_tier_survives_eviction_and_restart(self, tmp_path) -> None:
+        """Test that payloads are read back from disk."""
+        cache = PayloadCache(max_bytes=0, directory=tmp_path)
+        cache.put("key", b"payload")
+        assert len(cache) == 0
+        assert cache.get("key") == b"payload"
+
+        assert PayloadCache(directory=tmp_path).get("key") == b"payload"
+
+        cache.clear()
+        assert cache.get("key") is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_disk_budget_removes_least_recently_used_files(self, tmp_path) -> None:
+        """Test that the oldest files are removed beyond the disk budget."""
+        cache = PayloadCache(max_bytes=0, directory=tmp_path, max_disk_bytes=10)
+        cache.put("old", b"1234")
+        cache.put("new", b"1234")
+        for offset, key in enumerate(["old", "new"]):
+            path = tmp_path / f"{key}.payload"
+            os.utime(path, (1_000_000 + offset, 1_000_000 + offset))
+
+        cache.put("newest", b"1234")
+        assert "old" not in cache
+        assert "new" in cache and "newest" in cache
+
+    def test_concurrent_access(self) -> None:
+        """Test that the budget holds with several threads."""
+        cache = PayloadCache(max_bytes=100)
+
+        def work(thread: int) -> None:
+            for index in range(200):
+                cache.get_or_create(f"{thread}-{index % 20}", lambda: b"x" * 10)
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert cache.n_bytes == sum(len(p) for p in cache._payloads.values())
+        assert cache.n_bytes <= 100
+
+    def test_negative_budget_raises_error(self) -> None:
+        """Test that budgets must not be negative."""
+        with pytest.raises(ValueError):
+            PayloadCache(max_bytes=-1)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pytest
+import requests
+
+from tabpfn_common_utils.serialization.chunks import (
+    ChunkInfo,
+    ChunkManifest,
+    upload_chunks,
+)
+from tabpfn_common_utils.utils import serialize_to_formatted_bytes
+
+
+class _ChunkServer(ThreadingHTTPServer):
+    """A stand-in upload server storing chunks, which can fail once."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _ChunkHandler)
+        self.received: Dict[int, bytes] = {}
+        self.requests: List[int] = []
+        self.fail_once: set = set()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _ChunkHandler(BaseHTTPRequestHandler):
+    server: _ChunkServer  # type: ignore[assignment]
+
+    def do_POST(self) -> None:
+        index = int(self.path.rsplit("/", 1)[-1])
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(index)
+
+        digest = hashlib.blake2b(body, digest_size=32).hexdigest()
+        if index in self.server.fail_once:
+            self.server.fail_once.discard(index)
+            self.send_response(503)
+        elif digest != self.headers["X-Chunk-Digest"]:
+            self.send_response(400)
+        else:
+            self.server.received[index] = body
+            self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[_ChunkServer]:
+    server = _ChunkServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestChunkManifest:
+    """Test splitting payloads into chunks."""
+
+    payload = np.random.RandomState(0).bytes(10_000)
+
+    def test_chunks_cover_payload(self) -> None:
+        """Test that chunks are contiguous and hashed independently."""
+        manifest = ChunkManifest.from_payload(self.payload, chunk_size=3000, n_jobs=2)
+        assert [chunk.size for chunk in manifest.chunks] == [3000, 3000, 3000, 1000]
+        last = manifest.chunks[-1]
+        assert (
+            last.digest
+            == hashlib.blake2b(self.payload[9000:], digest_size=32).hexdigest()
+        )
+
+    def test_digest_does_not_depend_on_threads(self) -> None:
+        """Test that the payload digest is reproducible."""
+        assert (
+            ChunkManifest.from_payload(self.payload, 1000, n_jobs=1).digest
+            == ChunkManifest.from_payload(self.payload, 1000, n_jobs=3).digest
+        )
+
+    def test_save_and_load(self, tmp_path) -> None:
+        """Test that acknowledged chunks survive a round trip to disk."""
+        manifest = ChunkManifest.from_payload(self.payload, chunk_size=3000)
+        manifest.acknowledge(1)
+        manifest.save(tmp_path / "manifest.json")
+
+        loaded = ChunkManifest.load(tmp_path / "manifest.json")
+        assert loaded == manifest
+        assert [chunk.index for chunk in loaded.missing()] == [0, 2, 3]
+
+    def test_changed_payload_is_rejected(self) -> None:
+        """Test that chunks are verified before they are sent."""
+        manifest = ChunkManifest.from_payload(self.payload, chunk_size=3000)
+        changed = b"x" + self.payload[1:]
+        with pytest.raises(ValueError):
+            upload_chunks(changed, manifest, lambda chunk, data: None)
+
+
+class TestResumableUpload:
+    """Test uploading chunks to a local HTTP server."""
+
+    def _send(self, url: str):
+        def send(chunk: ChunkInfo, data: memoryview) -> None:
+            response = requests.post(
+                f"{url}/chunks/{chunk.index}",
+                data=bytes(data),
+                headers={"X-Chunk-Digest": chunk.digest},
+            )
+            response.raise_for_status()
+
+        return send
+
+    def test_interrupted_upload_resumes(self, server, tmp_path) -> None:
+        """Test that a resumed upload only sends the missing chunks."""
+        data = np.random.RandomState(0).rand(500, 8)
+        payload = serialize_to_formatted_bytes(data, format="binary")
+        manifest_path = tmp_path / "manifest.json"
+        manifest = ChunkManifest.from_payload(payload, chunk_size=4096)
+        n_chunks = len(manifest.chunks)
+
+        server.fail_once = {3}
+        with pytest.raises(requests.HTTPError):
+            upload_chunks(payload, manifest, self._send(server.url), manifest_path)
+        assert server.requests == [0, 1, 2, 3]
+
+        resumed = ChunkManifest.load(manifest_path)
+        assert resumed.acknowledged == {0, 1, 2}
+        upload_chunks(payload, resumed, self._send(server.url), manifest_path)
+
+        assert resumed.is_complete
+        assert ChunkManifest.load(manifest_path).is_complete
+        assert server.requests == [0, 1, 2, 3, *range(3, n_chunks)]
+        assert b"".join(server.received[i] for i in range(n_chunks)) == payload
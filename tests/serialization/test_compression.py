@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import gzip
+import lzma
+import zlib
+
+import numpy as np
+import pytest
+
+from tabpfn_common_utils.serialization.compression import (
+    compress_payload,
+    decompress_payload,
+)
+
+
+@pytest.fixture
+def payload() -> bytes:
+    rng = np.random.RandomState(0)
+    return rng.randint(0, 16, size=100_000, dtype=np.uint8).tobytes()
+
+
+class TestCompression:
+    """Test block-parallel payload compression."""
+
+    @pytest.mark.parametrize("compression", ["gzip", "zlib", "lzma"])
+    def test_roundtrip(self, payload: bytes, compression) -> None:
+        """Test that multi-block payloads decompress to the original."""
+        compressed = compress_payload(payload, compression, n_jobs=4, block_size=16_384)
+        assert len(compressed) < len(payload)
+        assert decompress_payload(compressed, compression) == payload
+
+    def test_standard_decompressors(self, payload: bytes) -> None:
+        """Test that the output is readable by the standard library."""
+        kwargs = {"n_jobs": 4, "block_size": 10_000}
+        assert gzip.decompress(compress_payload(payload, "gzip", **kwargs)) == payload
+        assert zlib.decompress(compress_payload(payload, "zlib", **kwargs)) == payload
+        assert lzma.decompress(compress_payload(payload, "lzma", **kwargs)) == payload
+
+    @pytest.mark.parametrize("compression", ["gzip", "zlib", "lzma"])
+    def test_output_does_not_depend_on_threads(self, payload: bytes, compression):
+        """Test that compression is deterministic for any number of threads."""
+        outputs = {
+            compress_payload(payload, compression, n_jobs=n_jobs, block_size=8_192)
+            for n_jobs in (None, 2, -1)
+        }
+        assert len(outputs) == 1
+
+    @pytest.mark.parametrize("compression", ["gzip", "zlib", "lzma"])
+    def test_empty_payload(self, compression) -> None:
+        """Test that empty payloads produce a valid stream."""
+        compressed = compress_payload(b"", compression)
+        assert decompress_payload(compressed, compression) == b""
+
+    def test_invalid_arguments_raise_error(self, payload: bytes) -> None:
+        """Test that unknown formats and block sizes are rejected."""
+        with pytest.raises(ValueError):
+            compress_payload(payload, "zstd")  # type: ignore[arg-type]
+        with pytest.raises(ValueError):
+            compress_payload(payload, "gzip", block_size=0)
+        with pytest.raises(ValueError):
+            compress_payload(payload, "gzip", n_jobs=0, block_size=1_000)
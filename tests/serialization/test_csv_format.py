@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import io
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tabpfn_common_utils.serialization.csv_format import (
+    can_encode_csv_array,
+    decode_csv_frame,
+    encode_csv,
+    encode_csv_array,
+    encode_csv_dictionaries,
+    encode_csv_parallel,
+)
+from tabpfn_common_utils.serialization.dictionary import CSV_DICTIONARY_PREAMBLE
+
+
+def _pandas_csv(
+    array: np.ndarray, header: bool = True, float_format: Optional[str] = None
+) -> bytes:
+    return (
+        pd.DataFrame(array)
+        .to_csv(index=False, header=header, float_format=float_format)
+        .encode("utf-8")
+    )
+
+
+class TestEncodeCsvArray:
+    """Test the ndarray CSV fast path."""
+
+    def test_matches_pandas_output(self) -> None:
+        """Test that the output is byte-identical to the DataFrame path."""
+        rng = np.random.RandomState(0)
+        array = rng.randn(300, 7) * 10.0 ** rng.randint(-30, 30, size=(300, 7))
+        assert encode_csv_array(array) == _pandas_csv(array)
+        assert encode_csv_array(array, header=False) == _pandas_csv(array, False)
+
+    def test_fortran_order_matches_pandas_output(self) -> None:
+        """Test that Fortran ordered arrays are serialized row by row."""
+        array = np.asfortranarray(np.random.RandomState(0).rand(20, 5))
+        assert encode_csv_array(array) == _pandas_csv(array)
+
+    def test_special_values_match_pandas_output(self) -> None:
+        """Test that NaN, infinities and signed zeros are written like pandas."""
+        array = np.array(
+            [[np.nan, np.inf, -np.inf], [0.0, -0.0, 1e16], [1e-5, 5e-324, np.nan]]
+        )
+        assert encode_csv_array(array) == _pandas_csv(array)
+
+    def test_one_dimensional_array(self) -> None:
+        """Test that 1D arrays are written as a single column."""
+        array = np.array([0.5, np.nan, 2.5])
+        assert encode_csv_array(array) == _pandas_csv(array)
+        assert len(pd.read_csv(io.BytesIO(encode_csv_array(array)))) == 3
+
+    def test_float_precision_matches_pandas_float_format(self) -> None:
+        """Test that a fixed precision matches pandas' float_format output."""
+        rng = np.random.RandomState(0)
+        array = rng.randn(300, 7) * 10.0 ** rng.randint(-30, 30, size=(300, 7))
+        array[::13, 2] = np.nan
+        for precision in (1, 6, 17):
+            assert encode_csv_array(array, float_precision=precision) == _pandas_csv(
+                array, float_format=f"%.{precision}g"
+            )
+
+    def test_float_precision_shrinks_output(self) -> None:
+        """Test that fewer significant digits produce smaller payloads."""
+        array = np.random.RandomState(0).rand(100, 10)
+        full = encode_csv_array(array)
+        reduced = encode_csv_array(array, float_precision=6)
+        assert len(reduced) < len(full) / 1.8
+        np.testing.assert_allclose(
+            pd.read_csv(io.BytesIO(reduced)).to_numpy(), array, rtol=1e-5
+        )
+
+    def test_column_labels_are_quoted_like_pandas(self) -> None:
+        """Test that the header quotes labels the way pandas does."""
+        array = np.random.RandomState(0).rand(3, 3)
+        columns = ["plain", "with,comma", 'with "quote"']
+        expected = pd.DataFrame(array, columns=columns).to_csv(index=False)
+        assert encode_csv_array(array, columns=columns) == expected.encode("utf-8")
+
+    @pytest.mark.parametrize(
+        "columns",
+        [
+            pd.Index([None, "a"]),
+            pd.Index([np.nan, 1.0]),
+            pd.Index([2.0, 3.123456789]),
+            pd.to_datetime(["2020-01-01", "2020-01-02"]),
+        ],
+    )
+    def test_other_column_labels_match_pandas_output(self, columns) -> None:
+        """Test missing, float and datetime labels in the header."""
+        frame = pd.DataFrame(np.random.RandomState(0).rand(3, 2), columns=columns)
+        for float_precision in (None, 3):
+            float_format = None if float_precision is None else f"%.{float_precision}g"
+            expected = frame.to_csv(index=False, float_format=float_format)
+            assert encode_csv(frame, float_precision=float_precision) == (
+                expected.encode("utf-8")
+            )
+
+    def test_unsupported_arrays(self) -> None:
+        """Test which arrays take the fast path."""
+        assert can_encode_csv_array(np.zeros((2, 2)))
+        assert not can_encode_csv_array(np.zeros((2, 2), dtype=np.float32))
+        assert can_encode_csv_array(np.zeros((2, 2), dtype=np.float32), 6)
+        assert not can_encode_csv_array(np.zeros((2, 2), dtype=np.int64))
+        assert not can_encode_csv_array(np.zeros((0, 2)))
+        assert not can_encode_csv_array(np.zeros((2, 2, 2)))
+
+
+class TestEncodeCsvParallel:
+    """Test serializing blocks of rows in parallel."""
+
+    @pytest.mark.parametrize("backend", ["process", "thread"])
+    def test_output_matches_serial_output(self, backend) -> None:
+        """Test that the output is byte-identical to serial serialization."""
+        rng = np.random.RandomState(0)
+        frame = pd.DataFrame(
+            {
+                "x": rng.rand(101),
+                "y": rng.randint(0, 5, size=101),
+                "z": rng.choice(["a", "b,c"], size=101),
+            }
+        )
+        for data in (frame, frame["x"], frame[["x"]].to_numpy()):
+            for float_precision in (None, 6):
+                assert encode_csv_parallel(
+                    data, float_precision, n_jobs=3, backend=backend
+                ) == encode_csv(data, float_precision=float_precision)
+
+    @pytest.mark.parametrize("backend", ["process", "thread"])
+    def test_temporal_columns_match_serial_output(self, backend) -> None:
+        """Test that blocks of temporal columns are formatted alike."""
+        # Only the last block has a time of day, the other ones all midnight
+        times = ["2020-01-01 00:00", "2020-01-02 00:00", None, "2020-01-03 12:00"]
+        frame = pd.DataFrame(
+            {
+                "t": pd.to_datetime(times),
+                "tz": pd.to_datetime(times).tz_localize("Europe/Berlin"),
+                "d": pd.to_timedelta(["1 days", "2 days", None, "3 days 04:00:00"]),
+                "x": [1.5, 2.5, 3.5, 4.5],
+            }
+        )
+        for data in (frame, frame["t"], frame["d"].to_numpy()):
+            assert encode_csv_parallel(data, n_jobs=4, backend=backend) == encode_csv(
+                data
+            )
+        assert b"2020-01-01 00:00:00," in encode_csv_parallel(frame, n_jobs=4)
+
+    def test_single_row(self) -> None:
+        """Test that data too small to split is serialized as a whole."""
+        array = np.array([[1.0, 2.0]])
+        assert encode_csv_parallel(array, n_jobs=4) == encode_csv(array)
+
+    def test_invalid_backend_raises_error(self) -> None:
+        """Test that unknown backends are rejected."""
+        with pytest.raises(ValueError):
+            encode_csv_parallel(np.zeros((4, 2)), n_jobs=2, backend="gpu")  # type: ignore[arg-type]
+
+
+class TestCsvDictionaries:
+    """Test dictionary encoding of CSV payloads."""
+
+    frame = pd.DataFrame(
+        {
+            "category": pd.Categorical(
+                ["low", "high", None, "low"] * 250, categories=["low", "high"]
+            ),
+            "value": np.arange(1000.0),
+            "label": np.array(["spam", "ham", np.nan, "spam"] * 250, dtype=object),
+        }
+    )
+
+    def test_roundtrip_restores_columns(self) -> None:
+        """Test that encoded columns decode to their original values."""
+        encoded, preamble = encode_csv_dictionaries(self.frame)
+        assert preamble.startswith(CSV_DICTIONARY_PREAMBLE)
+        assert isinstance(encoded, pd.DataFrame)
+        assert list(encoded.columns) == list(self.frame.columns)
+
+        payload = preamble + encode_csv(encoded)
+        pd.testing.assert_frame_equal(decode_csv_frame(payload), self.frame)
+        assert len(payload) < len(encode_csv(self.frame)) * 0.8
+
+    def test_data_without_dictionary_columns_is_kept(self) -> None:
+        """Test that numeric data gets no preamble."""
+        array = np.arange(6.0).reshape(3, 2)
+        encoded, preamble = encode_csv_dictionaries(array)
+        assert encoded is array
+        assert preamble == b""
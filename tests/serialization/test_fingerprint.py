@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from tabpfn_common_utils.serialization.delta import detect_append
+from tabpfn_common_utils.serialization.fingerprint import (
+    fingerprint_data,
+    fingerprint_prefix,
+)
+
+
+class TestFingerprint:
+    """Test content fingerprints."""
+
+    def test_layout_independent(self) -> None:
+        """Test that memory layout, wrapping and chunking do not matter."""
+        array = np.random.RandomState(0).rand(1000, 7)
+        expected = fingerprint_data(array)
+
+        assert fingerprint_data(np.asfortranarray(array)) == expected
+        assert fingerprint_data(pd.DataFrame(array)) == expected
+        assert fingerprint_data(array[:, ::-1][:, ::-1]) == expected
+        assert fingerprint_data(array.astype(">f8")) == expected
+        assert fingerprint_data(array, chunk_bytes=100) == expected
+        assert fingerprint_data(array, n_jobs=3, chunk_bytes=1000) == expected
+
+    def test_sensitive_to_content(self) -> None:
+        """Test that values, dtypes, labels and shape change the fingerprint."""
+        array = np.random.RandomState(0).rand(100, 3)
+        expected = fingerprint_data(array)
+
+        modified = array.copy()
+        modified[50, 1] += 1e-12
+        assert fingerprint_data(modified) != expected
+        assert fingerprint_data(array.astype(np.float32)) != expected
+        assert fingerprint_data(pd.DataFrame(array, columns=["a", "b", "c"])) != (
+            expected
+        )
+        assert fingerprint_data(array[:99]) != expected
+        assert fingerprint_data(array.reshape(300, 1)) != expected
+
+    def test_series_matches_single_column_frame(self) -> None:
+        """Test that a series is fingerprinted like a single column frame."""
+        series = pd.Series([1.0, 2.0, 3.0], name="target")
+        assert fingerprint_data(series) == fingerprint_data(series.to_frame())
+
+    def test_object_and_extension_columns(self) -> None:
+        """Test that non-numeric columns are fingerprinted by value."""
+        frame = pd.DataFrame(
+            {
+                "category": pd.Categorical(["a", "b", "a"]),
+                "string": ["x", "y", None],
+                "nullable": pd.array([1, None, 3], dtype="Int64"),
+            }
+        )
+        assert fingerprint_data(frame) == fingerprint_data(frame.copy())
+        assert fingerprint_data(frame) != fingerprint_data(
+            frame.astype({"category": object})
+        )
+
+        modified = frame.copy()
+        modified.loc[2, "string"] = "z"
+        assert fingerprint_data(modified) != fingerprint_data(frame)
+
+    def test_sensitive_to_categories(self) -> None:
+        """Test that categoricals with other categories differ."""
+        values = ["x", "y", "x"]
+        frame = pd.DataFrame({"c": pd.Categorical(values, categories=["x", "y"])})
+        expected = fingerprint_data(frame)
+
+        assert fingerprint_data(frame.copy()) == expected
+        for other in (
+            pd.Categorical(values, categories=["y", "x"]),
+            pd.Categorical(values, categories=["x", "y", "z"]),
+            pd.Categorical(values, categories=["x", "y"], ordered=True),
+        ):
+            assert fingerprint_data(pd.DataFrame({"c": other})) != expected
+
+    def test_prefix_matches_fingerprint_of_leading_rows(self) -> None:
+        """Test that a single pass gives the prefix and full fingerprints."""
+        array = np.random.RandomState(0).rand(100, 4)
+        frame = pd.DataFrame(array).assign(label=["x", "y"] * 50)
+        for data in (array, np.asfortranarray(array), frame):
+            for prefix_rows in (0, 37, 100):
+                prefix, full = fingerprint_prefix(data, prefix_rows, chunk_bytes=64)
+                assert prefix == fingerprint_data(data[:prefix_rows])
+                assert full == fingerprint_data(data)
+
+
+class TestDetectAppend:
+    """Test detecting rows appended to a base."""
+
+    base = np.random.RandomState(0).rand(50, 3)
+
+    def test_appended_rows(self) -> None:
+        """Test that the base fingerprint is found at the start of the data."""
+        grown = np.vstack([self.base, np.ones((5, 3))])
+        is_append, full = detect_append(grown, fingerprint_data(self.base), 50)
+        assert is_append
+        assert full == fingerprint_data(grown)
+
+    def test_changed_or_removed_rows(self) -> None:
+        """Test that modified or shrunk data is not an append."""
+        changed = self.base.copy()
+        changed[3, 1] = 0.0
+        base_fingerprint = fingerprint_data(self.base)
+        assert not detect_append(changed, base_fingerprint, 50)[0]
+        assert not detect_append(self.base[:40], base_fingerprint, 50)[0]
+        assert not detect_append(self.base, None, None)[0]
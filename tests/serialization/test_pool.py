@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse
+
+from tabpfn_common_utils.serialization.binary import (
+    decode_binary_frame,
+    encode_binary_frame,
+    encode_binary_sparse,
+)
+from tabpfn_common_utils.serialization.pool import BufferPool, BufferWriter
+
+
+class TestBufferPool:
+    """Test leasing and reusing buffers."""
+
+    def test_size_classes_are_powers_of_two(self) -> None:
+        """Test that sizes are rounded up, but not below the minimum."""
+        pool = BufferPool(min_size=16)
+        assert [pool.size_class(size) for size in (0, 16, 17, 1000)] == [
+            16,
+            16,
+            32,
+            1024,
+        ]
+
+    def test_released_buffers_are_reused(self) -> None:
+        """Test that a released buffer serves the next request of its class."""
+        pool = BufferPool(min_size=16)
+        view = pool.acquire(100)
+        assert len(view) == 100
+        buffer = view.obj
+        pool.release(view)
+
+        reused = pool.acquire(120)
+        assert reused.obj is buffer
+        assert pool.allocations == 1
+        pool.release(reused)
+        assert pool.n_bytes == 128
+
+    def test_release_checks_the_buffer(self) -> None:
+        """Test that foreign and already released buffers are rejected."""
+        pool = BufferPool()
+        with pytest.raises(ValueError):
+            pool.release(memoryview(bytearray(10)))
+
+        view = pool.acquire(10)
+        slice_ = view[2:5]
+        pool.release(view)
+        with pytest.raises(ValueError):
+            pool.release(slice_)
+
+    def test_number_of_kept_buffers_is_bounded(self) -> None:
+        """Test that surplus released buffers are dropped."""
+        pool = BufferPool(max_buffers_per_size=1, min_size=16)
+        views = [pool.acquire(16) for _ in range(3)]
+        for view in views:
+            pool.release(view)
+        assert pool.n_bytes == 16
+
+        pool.clear()
+        assert pool.n_bytes == 0
+
+
+class TestBufferWriter:
+    """Test writing bytes of unknown size into pooled buffers."""
+
+    def test_writer_grows_through_size_classes(self) -> None:
+        """Test that the written bytes survive growing the buffer."""
+        pool = BufferPool(min_size=16)
+        writer = BufferWriter(pool)
+        chunks = [bytes([i]) * 10 for i in range(10)]
+        for chunk in chunks:
+            writer.write(chunk)
+
+        value = writer.getvalue()
+        assert bytes(value) == b"".join(chunks)
+        assert memoryview(value.obj).nbytes == 128
+        pool.release(value)
+        # The smaller buffers were returned while growing
+        assert pool.n_bytes == 16 + 32 + 64 + 128
+
+    def test_writer_starts_at_size_of_last_payload(self) -> None:
+        """Test that a repeated payload does not grow the buffer again."""
+        pool = BufferPool(min_size=16)
+        for _ in range(2):
+            writer = BufferWriter(pool)
+            for _ in range(10):
+                writer.write(b"x" * 10)
+            pool.release(writer.getvalue())
+        assert pool.last_written == 100
+        # The second writer took the 128 byte buffer right away
+        assert pool.allocations == 4
+
+        writer = BufferWriter(pool, size_hint=0)
+        assert memoryview(writer.getvalue().obj).nbytes == 16
+
+
+class TestPooledBinaryEncoding:
+    """Test encoding binary payloads into pooled buffers."""
+
+    def test_frame_matches_bytes_output(self) -> None:
+        """Test that the pooled payload equals the bytes payload."""
+        frame = pd.DataFrame(
+            {"a": np.arange(1000, dtype=np.int32), "b": np.random.rand(1000)}
+        )
+        pool = BufferPool()
+        view = encode_binary_frame(frame, pool=pool)
+        assert bytes(view) == encode_binary_frame(frame)
+        pd.testing.assert_frame_equal(decode_binary_frame(bytes(view)), frame)
+        pool.release(view)
+
+        for _ in range(3):
+            pool.release(encode_binary_frame(frame, pool=pool))
+        assert pool.allocations == 1
+
+    def test_c_ordered_array_matches_bytes_output(self) -> None:
+        """Test that strided columns are copied into the buffer correctly."""
+        array = np.random.RandomState(0).rand(100, 7)
+        pool = BufferPool()
+        for data in (array, array.astype(">f8"), array[::2, 1:]):
+            view = encode_binary_frame(data, pool=pool)
+            assert bytes(view) == encode_binary_frame(np.asfortranarray(data))
+            pool.release(view)
+
+    def test_sparse_matches_bytes_output(self) -> None:
+        """Test pooled payloads of sparse matrices."""
+        matrix = scipy.sparse.csr_matrix(np.eye(10))
+        pool = BufferPool()
+        view = encode_binary_sparse(matrix, pool=pool)
+        assert bytes(view) == encode_binary_sparse(matrix)
+        pool.release(view)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse
+
+from tabpfn_common_utils.serialization.precision import reduce_precision
+
+
+class TestReducePrecision:
+    """Test downcasting float columns to a lower precision."""
+
+    rng = np.random.RandomState(0)
+    frame = pd.DataFrame(
+        {
+            "small": rng.rand(1000) * 100,
+            "large": rng.rand(1000) * 1e6,
+            "tiny": rng.rand(1000) * 1e-7,
+            "count": np.arange(1000),
+            "name": ["x"] * 1000,
+        }
+    )
+
+    def test_float32_downcasts_all_float_columns(self) -> None:
+        """Test that only the float columns change, within float32 error."""
+        downcast, report = reduce_precision(self.frame, "float32")
+        assert report.dtypes == {
+            "small": "float32",
+            "large": "float32",
+            "tiny": "float32",
+        }
+        assert downcast["count"].dtype == np.int64
+        pd.testing.assert_series_equal(downcast["name"], self.frame["name"])
+        assert 0 < report.max_rel_error <= np.finfo(np.float32).eps / 2
+
+        for column in report.dtypes:
+            np.testing.assert_allclose(
+                downcast[column], self.frame[column], rtol=report.max_rel_error
+            )
+            assert (
+                np.abs(downcast[column] - self.frame[column]).max()
+                <= report.max_abs_error
+            )
+
+    def test_float16_falls_back_to_float32_outside_its_range(self) -> None:
+        """Test that no value overflows or loses its normal precision."""
+        downcast, report = reduce_precision(self.frame, "float16")
+        assert report.dtypes == {
+            "small": "float16",
+            "large": "float32",
+            "tiny": "float32",
+        }
+        assert report.max_rel_error <= np.finfo(np.float16).eps / 2
+        assert np.isfinite(downcast["large"]).all()
+
+    def test_missing_and_infinite_values(self) -> None:
+        """Test that NaN and infinities are kept and do not count as error."""
+        values = np.array([np.nan, np.inf, -np.inf, 0.0, 0.5])
+        downcast, report = reduce_precision(values, "float16")
+        assert downcast.dtype == np.float16
+        np.testing.assert_array_equal(downcast, values)
+        assert report.max_abs_error == report.max_rel_error == 0.0
+
+    def test_array_is_downcast_as_a_whole(self) -> None:
+        """Test that a 2D array gets the dtype all of its columns fit."""
+        array = np.column_stack([self.frame["small"], self.frame["large"]])
+        downcast, report = reduce_precision(array, "float16")
+        assert downcast.dtype == np.float32
+        assert report.dtypes == {0: "float32", 1: "float32"}
+
+    def test_sparse_matrix_is_downcast_to_float32(self) -> None:
+        """Test that sparse matrices are not downcast to float16."""
+        matrix = scipy.sparse.csr_matrix(np.eye(3) * 0.1)
+        downcast, report = reduce_precision(matrix, "float16")
+        assert downcast.dtype == np.float32
+        assert report.max_rel_error > 0
+
+    def test_data_without_float_columns_is_kept(self) -> None:
+        """Test that nothing is copied if nothing is downcast."""
+        frame = self.frame[["count", "name"]]
+        downcast, report = reduce_precision(frame, "float32")
+        assert downcast is frame
+        assert report.dtypes == {}
+
+    def test_unsupported_precision_raises_error(self) -> None:
+        """Test that only float32 and float16 are supported."""
+        with pytest.raises(ValueError):
+            reduce_precision(self.frame, "int8")  # type: ignore[arg-type]
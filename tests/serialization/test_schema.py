@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import mmap
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse
+
+from tabpfn_common_utils.serialization.binary import (
+    decode_binary_array,
+    encode_binary_frame,
+)
+from tabpfn_common_utils.serialization.csv_format import (
+    decode_csv_array,
+    decode_csv_frame,
+    encode_csv,
+    encode_csv_schema,
+    read_csv_schema,
+)
+from tabpfn_common_utils.serialization.schema import FrameSchema
+
+
+class TestFrameSchema:
+    """Test the column schema of serialized data."""
+
+    def test_from_data(self) -> None:
+        """Test that labels are encoded and dtypes kept per column."""
+        frame = pd.DataFrame(
+            {"a": np.array([1, 2], dtype=np.int32), 3: np.array([0.5, 1.5])}
+        )
+        schema = FrameSchema.from_data(frame)
+        assert schema.columns == ("a", 3)
+        assert schema.dtypes == ("int32", "float64")
+        assert schema.common_dtype() == np.float64
+
+    def test_non_numeric_schema_has_no_common_dtype(self) -> None:
+        """Test that object columns cannot be stored in a numeric array."""
+        schema = FrameSchema.from_data(pd.DataFrame({"a": ["x", "y"]}))
+        assert not schema.is_numeric
+        with pytest.raises(ValueError):
+            schema.common_dtype()
+
+    def test_mismatched_lengths_raise_error(self) -> None:
+        """Test that every column needs a dtype."""
+        with pytest.raises(ValueError):
+            FrameSchema(columns=("a", "b"), dtypes=("float64",))
+
+    def test_dict_roundtrip(self) -> None:
+        """Test that the JSON-compatible form restores the schema."""
+        schema = FrameSchema(columns=("a", 1), dtypes=("Int64", "category"))
+        assert FrameSchema.from_dict(schema.to_dict()) == schema
+        with pytest.raises(ValueError):
+            FrameSchema.from_dict({**schema.to_dict(), "version": 99})
+
+    def test_sparse_columns_are_labeled_by_position(self) -> None:
+        """Test the schema of a sparse matrix."""
+        matrix = scipy.sparse.csr_matrix(np.eye(3, dtype=np.float32))
+        schema = FrameSchema.from_data(matrix)
+        assert schema == FrameSchema(columns=(0, 1, 2), dtypes=("float32",) * 3)
+
+    def test_check_compatible(self) -> None:
+        """Test that labels, dtypes and the number of columns must match."""
+        schema = FrameSchema(columns=("a", "b"), dtypes=("float64", "bool"))
+        schema.check_compatible(FrameSchema(columns=("a", "b"), dtypes=schema.dtypes))
+
+        incompatible = [
+            FrameSchema(columns=("a", "c"), dtypes=schema.dtypes),
+            FrameSchema(columns=("a", "b"), dtypes=("float32", "bool")),
+            FrameSchema(columns=("a",), dtypes=("float64",)),
+        ]
+        for other in incompatible:
+            with pytest.raises(ValueError, match="Incompatible schemas"):
+                schema.check_compatible(other)
+
+
+class TestDecodeWithSchema:
+    """Test decoding into preallocated arrays."""
+
+    array = np.random.RandomState(0).rand(1000, 5)
+
+    def test_csv_array_matches_frame_decoding(self) -> None:
+        """Test that the array and the inferred frame restore the exact values."""
+        payload = encode_csv(self.array)
+        decoded = decode_csv_array(payload, FrameSchema.from_data(self.array))
+        assert decoded.dtype == np.float64
+        np.testing.assert_array_equal(decoded, self.array)
+        np.testing.assert_array_equal(decode_csv_frame(payload).to_numpy(), self.array)
+
+    def test_csv_array_with_missing_values_and_integers(self) -> None:
+        """Test that int columns are widened to the common float dtype."""
+        frame = pd.DataFrame({"i": [1, 2, 3], "f": [0.5, np.nan, 2.5]})
+        decoded = decode_csv_array(encode_csv(frame), FrameSchema.from_data(frame))
+        np.testing.assert_array_equal(decoded, frame.to_numpy())
+
+    def test_csv_array_without_rows(self) -> None:
+        """Test that a header-only payload decodes to an empty array."""
+        frame = pd.DataFrame({"a": np.array([], dtype=np.float64)})
+        decoded = decode_csv_array(encode_csv(frame), FrameSchema.from_data(frame))
+        assert decoded.shape == (0, 1)
+
+    def test_mismatched_columns_raise_error(self) -> None:
+        """Test that the payload columns are checked against the schema."""
+        schema = FrameSchema(columns=("x",), dtypes=("float64",))
+        with pytest.raises(ValueError):
+            decode_csv_array(encode_csv(self.array), schema)
+        with pytest.raises(ValueError):
+            decode_binary_array(encode_binary_frame(self.array), schema)
+
+    def test_binary_array(self) -> None:
+        """Test that binary columns are copied into a single array."""
+        frame = pd.DataFrame(
+            {"a": np.arange(4, dtype=np.int16), "b": np.linspace(0, 1, 4)}
+        )
+        decoded = decode_binary_array(
+            encode_binary_frame(frame), FrameSchema.from_data(frame)
+        )
+        assert decoded.flags.f_contiguous
+        np.testing.assert_array_equal(decoded, frame.to_numpy())
+
+    def test_memoryview_and_mmap_input(self, tmp_path) -> None:
+        """Test that buffers other than bytes are decoded without conversion."""
+        schema = FrameSchema.from_data(self.array)
+        path = tmp_path / "data.csv"
+        path.write_bytes(encode_csv(self.array))
+
+        with (
+            open(path, "rb") as file,
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+        ):
+            from_mmap = decode_csv_array(mapped, schema)
+            from_view = decode_csv_frame(memoryview(mapped)[:])
+
+        np.testing.assert_array_equal(from_mmap, from_view.to_numpy())
+
+
+class TestCsvSchemaPreamble:
+    """Test CSV payloads starting with the schema of their columns."""
+
+    frame = pd.DataFrame(
+        {
+            "flag": [True, False, True],
+            "count": pd.array([1, None, 3], dtype="Int64"),
+            "score": np.array([0.1, 0.2, np.nan], dtype=np.float32),
+            "time": pd.to_datetime(["2024-01-01 00:00", "2024-03-01 12:30", None]),
+            "zone": pd.to_datetime(
+                ["2024-01-01", "2024-07-01", "2025-01-01"]
+            ).tz_localize("Europe/Berlin"),
+            "wait": pd.to_timedelta([1, 2, 3], unit="s"),
+        }
+    )
+
+    def test_roundtrip_restores_dtypes(self) -> None:
+        """Test that every column is parsed with its original dtype."""
+        payload = encode_csv_schema(self.frame) + encode_csv(self.frame)
+        assert read_csv_schema(payload) == FrameSchema.from_data(self.frame)
+        pd.testing.assert_frame_equal(decode_csv_frame(payload), self.frame)
+
+    def test_floats_are_restored_exactly(self) -> None:
+        """Test that float64 and float32 columns keep every bit of their values."""
+        rng = np.random.RandomState(0)
+        frame = pd.DataFrame(
+            {
+                "double": rng.rand(1000),
+                "single": rng.rand(1000).astype(np.float32),
+            }
+        )
+        payload = encode_csv_schema(frame) + encode_csv(frame)
+        pd.testing.assert_frame_equal(
+            decode_csv_frame(payload), frame, check_exact=True
+        )
+
+    def test_integer_labels_are_restored(self) -> None:
+        """Test that array columns keep their integer labels."""
+        array = np.arange(6.0).reshape(3, 2)
+        payload = encode_csv_schema(array) + encode_csv(array)
+        pd.testing.assert_frame_equal(decode_csv_frame(payload), pd.DataFrame(array))
+
+    def test_without_rows(self) -> None:
+        """Test that an empty frame keeps its dtypes."""
+        empty = self.frame.iloc[:0]
+        decoded = decode_csv_frame(encode_csv_schema(empty) + encode_csv(empty))
+        pd.testing.assert_series_equal(decoded.dtypes, empty.dtypes)
+
+    def test_array_decoding_skips_the_preamble(self) -> None:
+        """Test that the preamble does not count as a row."""
+        array = np.arange(6.0).reshape(3, 2)
+        schema = FrameSchema.from_data(array)
+        payload = encode_csv_schema(array) + encode_csv(array)
+        np.testing.assert_array_equal(decode_csv_array(payload, schema), array)
+
+    def test_payload_without_schema(self) -> None:
+        """Test that plain CSV has no schema."""
+        assert read_csv_schema(encode_csv(self.frame)) is None
+
+    def test_mismatched_header_raises_error(self) -> None:
+        """Test that the header has to match the schema."""
+        payload = encode_csv_schema(self.frame) + encode_csv(
+            self.frame.rename(columns={"flag": "other"})
+        )
+        with pytest.raises(ValueError):
+            decode_csv_frame(payload)
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse
+
+from tabpfn_common_utils.serialization.binary import (
+    decode_binary_array,
+    decode_binary_frame,
+    decode_binary_sparse,
+    encode_binary_frame,
+    encode_binary_sparse,
+    read_binary_header,
+)
+from tabpfn_common_utils.serialization.csv_format import encode_csv
+from tabpfn_common_utils.serialization.schema import FrameSchema
+from tabpfn_common_utils.serialization.sparse import iter_dense_row_blocks
+
+
+def _random_sparse(n_rows: int, n_columns: int, dtype=np.float64):
+    rng = np.random.RandomState(0)
+    dense = rng.rand(n_rows, n_columns) * 100
+    dense[rng.rand(n_rows, n_columns) > 0.01] = 0
+    return scipy.sparse.csr_matrix(dense.astype(dtype))
+
+
+class TestSparseCsv:
+    """Test CSV serialization of sparse matrices."""
+
+    def test_dense_row_blocks_are_bounded(self) -> None:
+        """Test that blocks cover all rows without exceeding the cell budget."""
+        matrix = _random_sparse(100, 30)
+        blocks = list(iter_dense_row_blocks(matrix.tocsc(), block_cells=300))
+        assert all(block.size <= 300 for _, block in blocks)
+        np.testing.assert_array_equal(
+            np.vstack([block for _, block in blocks]), matrix.toarray()
+        )
+
+    @pytest.mark.parametrize("dtype", [np.float64, np.float32, np.int64])
+    def test_matches_dense_output(self, dtype) -> None:
+        """Test that the bytes equal the ones of the densified matrix."""
+        matrix = _random_sparse(1100, 1000, dtype=dtype)
+        assert encode_csv(matrix) == encode_csv(matrix.toarray())
+        assert encode_csv(matrix, float_precision=6) == encode_csv(
+            matrix.toarray(), float_precision=6
+        )
+
+    def test_empty_matrix_has_header(self) -> None:
+        """Test that a matrix without rows still gets a header line."""
+        matrix = scipy.sparse.csr_matrix((0, 3))
+        assert encode_csv(matrix) == encode_csv(np.empty((0, 3)))
+
+
+class TestSparseBinary:
+    """Test binary serialization of sparse matrices."""
+
+    @pytest.mark.parametrize("sparse_format", ["csr", "csc", "coo"])
+    def test_roundtrip(self, sparse_format) -> None:
+        """Test that CSR and CSC are kept and other formats become CSR."""
+        matrix = _random_sparse(50, 20).asformat(sparse_format)
+        decoded = decode_binary_sparse(encode_binary_sparse(matrix))
+        assert decoded.format == ("csc" if sparse_format == "csc" else "csr")
+        np.testing.assert_array_equal(decoded.toarray(), matrix.toarray())
+
+    def test_payload_scales_with_nonzeros(self) -> None:
+        """Test that the payload is much smaller than the dense one."""
+        matrix = _random_sparse(1000, 100)
+        sparse_size = len(encode_binary_sparse(matrix))
+        assert sparse_size < len(encode_binary_frame(matrix.toarray())) / 10
+
+    def test_frame_and_array_decoding(self) -> None:
+        """Test decoding to a sparse DataFrame and to a dense array."""
+        matrix = _random_sparse(40, 5)
+        payload = encode_binary_sparse(matrix)
+
+        frame = decode_binary_frame(payload)
+        assert all(isinstance(dtype, pd.SparseDtype) for dtype in frame.dtypes)
+        np.testing.assert_array_equal(frame.sparse.to_dense(), matrix.toarray())
+
+        schema = FrameSchema.from_data(matrix.toarray())
+        np.testing.assert_array_equal(
+            decode_binary_array(payload, schema), matrix.toarray()
+        )
+
+    def test_sparse_payloads_need_version_two(self) -> None:
+        """Test that only sparse payloads require a reader of version 2."""
+        matrix = _random_sparse(10, 5)
+        for payload, version in (
+            (encode_binary_frame(matrix.toarray()), 1),
+            (encode_binary_sparse(matrix), 2),
+        ):
+            assert int.from_bytes(payload[4:6], "little") == version
+            read_binary_header(payload)
+
+        with pytest.raises(ValueError):
+            decode_binary_sparse(encode_binary_frame(matrix.toarray()))
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import io
+import mmap
+
+import pytest
+
+from tabpfn_common_utils.serialization.compression import decompress_payload
+from tabpfn_common_utils.serialization.formats import BufferReader
+from tabpfn_common_utils.serialization.streams import (
+    CompressingReader,
+    IterableReader,
+    PathReader,
+    open_upload_content,
+)
+
+
+class TestUploadStreams:
+    """Test the file objects streaming upload content."""
+
+    content = b"0123456789" * 1000
+
+    def test_path_reader_is_only_open_while_reading(self, tmp_path) -> None:
+        """Test that the file is opened lazily and closed at the end."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(self.content)
+
+        reader = PathReader(path)
+        assert reader._file is None
+        assert reader.seek(0, io.SEEK_END) == len(self.content)
+        reader.seek(0)
+        assert reader.read() == self.content
+        assert reader._file is None
+
+    def test_buffer_reader_over_mmap(self, tmp_path) -> None:
+        """Test that a mapped file is read in place and can be closed after."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(self.content)
+
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            with BufferReader(mapped) as reader:
+                assert reader.seek(0, io.SEEK_END) == len(self.content)
+                reader.seek(0)
+                assert reader.read(7) == self.content[:7]
+                assert reader.read() == self.content[7:]
+            mapped.close()
+
+    def test_iterable_reader_splits_and_joins_chunks(self) -> None:
+        """Test that reads of any size see the concatenated chunks."""
+        chunks = [self.content[i : i + 333] for i in range(0, len(self.content), 333)]
+        reader = IterableReader(iter([b"", *chunks]))
+        parts = []
+        while part := reader.read(500):
+            parts.append(part)
+        assert b"".join(parts) == self.content
+
+    @pytest.mark.parametrize("compression", ["gzip", "zlib", "lzma"])
+    def test_compressing_reader(self, compression) -> None:
+        """Test that the streamed output decompresses to the source."""
+        reader = CompressingReader(
+            io.BytesIO(self.content), compression, block_size=1024
+        )
+        assert decompress_payload(reader.read(), compression) == self.content
+
+    def test_unsupported_content_raises_error(self) -> None:
+        """Test that text content is rejected rather than sent as is."""
+        with pytest.raises(TypeError):
+            open_upload_content("data.csv")  # type: ignore[arg-type]
+        with pytest.raises(TypeError):
+            open_upload_content(io.StringIO("a,b"))  # type: ignore[arg-type]
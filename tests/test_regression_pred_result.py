@@ -1,4 +1,8 @@
+import subprocess
+import sys
+import tracemalloc
 import unittest
+from unittest import mock
 import numpy as np
 
 from tabpfn_common_utils.regression_pred_result import RegressionPredictResult
@@ -29,6 +33,25 @@ class TestRegressionPredResult(unittest.TestCase):
         for key in res:
             self.assertTrue(np.array_equal(res[key], self.pred_res[key]))
 
+    def test_deserialize_converts_on_access(self):
+        res = RegressionPredictResult.from_basic_representation(
+            self.pred_res_serialized_ref
+        )
+        self.assertEqual(list(res), list(self.pred_res))
+
+        with mock.patch.object(np, "array", wraps=np.array) as convert:
+            mean = res["mean"]
+            self.assertIs(res["mean"], mean)
+            self.assertEqual(convert.call_count, 1)
+
+        # The arrays can be used to create a result
+        result = RegressionPredictResult(dict(res))
+        np.testing.assert_array_equal(result.quantiles["quantile_0.75"], [5, 6, 7])
+
+    def test_deserialize_without_mean_raises_error(self):
+        with self.assertRaises(KeyError):
+            RegressionPredictResult.from_basic_representation({"median": [1]})
+
     def test_invalid_input_raises_error(self):
         bad_input = {
             "mean": {"a": 1, "b": 2},
@@ -39,3 +62,269 @@ class TestRegressionPredResult(unittest.TestCase):
         }
         with self.assertRaises(ValueError):
             RegressionPredictResult(bad_input)
+
+    def test_quantiles_are_stored_sorted_by_level(self):
+        pred_res = {
+            "mean": np.array([1.0, 2.0]),
+            "median": np.array([1.0, 2.0]),
+            "mode": np.array([1.0, 2.0]),
+            "quantile_0.9": np.array([3.0, 4.0]),
+            "quantile_0.1": np.array([0.0, 1.0]),
+            "quantile_0.5": np.array([1.0, 2.0]),
+        }
+        res = RegressionPredictResult(pred_res)
+
+        np.testing.assert_array_equal(res.quantile_levels, [0.1, 0.5, 0.9])
+        np.testing.assert_array_equal(
+            res.quantile_values, [[0.0, 1.0], [1.0, 2.0], [3.0, 4.0]]
+        )
+        self.assertTrue(res.quantile_values.flags.c_contiguous)
+
+        # The view keeps the original keys and order, and shares memory
+        self.assertEqual(
+            list(res.quantiles), ["quantile_0.9", "quantile_0.1", "quantile_0.5"]
+        )
+        self.assertTrue(
+            np.shares_memory(res.quantiles["quantile_0.9"], res.quantile_values)
+        )
+        np.testing.assert_array_equal(res.quantiles["quantile_0.9"], [3.0, 4.0])
+
+    def test_quantiles_of_lists_are_lists(self):
+        res = RegressionPredictResult(self.pred_res_serialized_ref)
+        self.assertEqual(res.quantiles["quantile_0.25"], [4, 5, 6])
+        self.assertEqual(res.quantile_values.shape, (2, 3))
+        self.assertEqual(
+            RegressionPredictResult.to_basic_representation(res),
+            self.pred_res_serialized_ref,
+        )
+
+    def test_lists_are_kept_as_they_are(self):
+        pred_res = {
+            **self.pred_res_serialized_ref,
+            "quantile_0.25": [1, 2, 3],
+            "quantile_0.75": [1.5, 2.5, 3.5],
+        }
+        res = RegressionPredictResult(pred_res)
+        self.assertIs(res.quantiles["quantile_0.25"], pred_res["quantile_0.25"])
+        self.assertEqual(
+            RegressionPredictResult.to_basic_representation(res)["quantile_0.25"],
+            [1, 2, 3],
+        )
+        self.assertIsInstance(res[1:].quantiles["quantile_0.25"][0], int)
+
+        # Ragged lists pass through unless the quantile values are used
+        ragged = {**self.pred_res_serialized_ref, "quantile_0.75": [5, 6]}
+        res = RegressionPredictResult(ragged)
+        self.assertEqual(RegressionPredictResult.to_basic_representation(res), ragged)
+        with self.assertRaises(ValueError):
+            res.quantile_values
+
+    def test_without_quantiles(self):
+        res = RegressionPredictResult(
+            {k: v for k, v in self.pred_res.items() if not k.startswith("quantile_")}
+        )
+        self.assertEqual(len(res.quantiles), 0)
+        self.assertEqual(res.quantile_values.shape, (0, 3))
+
+    def test_invalid_quantile_key_raises_error(self):
+        with self.assertRaises(ValueError):
+            RegressionPredictResult({**self.pred_res, "quantile_high": np.array([1])})
+
+    def test_bytes_roundtrip(self):
+        pred_res = {
+            **self.pred_res,
+            "mean": np.array([1.5, 2.5, 3.5], dtype=np.float32),
+            "quantile_0.1": np.array([0.0, 1.0, 2.0]),
+        }
+        res = RegressionPredictResult(pred_res)
+        payload = RegressionPredictResult.to_bytes(res)
+        decoded = RegressionPredictResult.from_bytes(payload)
+
+        self.assertEqual(decoded.mean.dtype, np.float32)
+        self.assertEqual(list(decoded.quantiles), list(res.quantiles))
+        np.testing.assert_array_equal(decoded.quantile_levels, res.quantile_levels)
+        np.testing.assert_array_equal(decoded.quantile_values, res.quantile_values)
+        self.assertEqual(
+            RegressionPredictResult.to_basic_representation(decoded),
+            RegressionPredictResult.to_basic_representation(res),
+        )
+
+        # The arrays are views of the payload
+        buffer = np.frombuffer(payload, dtype=np.uint8)
+        self.assertTrue(np.shares_memory(decoded.quantile_values, buffer))
+        self.assertTrue(np.shares_memory(decoded.mode, buffer))
+
+    def test_bytes_of_list_result(self):
+        res = RegressionPredictResult(self.pred_res_serialized_ref)
+        decoded = RegressionPredictResult.from_bytes(
+            RegressionPredictResult.to_bytes(res)
+        )
+        self.assertIs(decoded.val_type, np.ndarray)
+        np.testing.assert_array_equal(decoded.quantiles["quantile_0.75"], [5, 6, 7])
+
+    def test_from_invalid_bytes_raises_error(self):
+        with self.assertRaises(ValueError):
+            RegressionPredictResult.from_bytes(b"not a result")
+
+    def test_import_does_not_load_serialization(self):
+        code = (
+            "import sys\n"
+            "import tabpfn_common_utils.regression_pred_result\n"
+            "print(sorted({'pandas', 'scipy'} & set(sys.modules)))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, check=True, text=True
+        ).stdout
+        self.assertEqual(output.strip(), "[]")
+
+    def _normal_result(self):
+        # Quantiles of unit normal distributions centered at 0, 1 and 2
+        levels = [0.1, 0.25, 0.5, 0.75, 0.9]
+        z = [-1.2815515655, -0.6744897502, 0.0, 0.6744897502, 1.2815515655]
+        center = np.array([0.0, 1.0, 2.0])
+        pred_res = {"mean": center, "median": center, "mode": center}
+        for level, offset in zip(levels, z):
+            pred_res[f"quantile_{level}"] = center + offset
+        return RegressionPredictResult(pred_res)
+
+    def test_quantile_interpolates_stored_levels(self):
+        res = self._normal_result()
+        np.testing.assert_allclose(res.quantile(0.5), [0.0, 1.0, 2.0])
+        np.testing.assert_allclose(
+            res.quantile([0.25, 0.3]),
+            [res.quantiles["quantile_0.25"], res.quantiles["quantile_0.25"] + 0.1349],
+            atol=1e-4,
+        )
+        # Levels outside the stored ones are clamped to the outermost quantiles
+        np.testing.assert_allclose(res.quantile(0.01), res.quantiles["quantile_0.1"])
+        with self.assertRaises(ValueError):
+            res.quantile(1.5)
+        with self.assertRaises(ValueError):
+            res.quantile([0.5, np.nan])
+
+    def test_cdf_inverts_quantile(self):
+        res = self._normal_result()
+        for level in [0.1, 0.2, 0.5, 0.7, 0.85]:
+            np.testing.assert_allclose(res.cdf(res.quantile(level)), level)
+        # The mass above the highest stored level is at the highest quantile
+        np.testing.assert_array_equal(res.cdf(res.quantile(0.9)), 1.0)
+        np.testing.assert_array_equal(res.cdf(-10.0), 0.0)
+        np.testing.assert_array_equal(res.cdf(10.0), 1.0)
+        np.testing.assert_array_equal(res.cdf([np.nan, 1.0, 2.0])[0], np.nan)
+        self.assertTrue(np.isnan(res.prob_between(np.nan, 1.0)).all())
+
+        np.testing.assert_allclose(
+            res.prob_between(0.0, [0.0, 1.0, 2.0]),
+            [0.0, 0.5 - res.cdf(0.0)[1], 0.5],
+        )
+        lower, upper = res.interval(0.5)
+        np.testing.assert_allclose(lower, res.quantiles["quantile_0.25"])
+        np.testing.assert_allclose(upper, res.quantiles["quantile_0.75"])
+
+    def test_crossing_quantiles_are_repaired(self):
+        pred_res = {
+            **self.pred_res,
+            "quantile_0.25": np.array([5.0, 5.0, 6.0]),
+            "quantile_0.75": np.array([4.0, 6.0, 7.0]),
+        }
+        res = RegressionPredictResult(pred_res)
+        np.testing.assert_allclose(res.quantile([0.25, 0.75])[:, 0], [4.0, 5.0])
+        np.testing.assert_allclose(res.cdf(4.5)[0], 0.5)
+
+    def test_quantile_without_quantiles_raises_error(self):
+        res = RegressionPredictResult(
+            {k: v for k, v in self.pred_res.items() if not k.startswith("quantile_")}
+        )
+        with self.assertRaises(ValueError):
+            res.cdf(0.0)
+
+    def test_sample_follows_the_distribution(self):
+        res = self._normal_result()
+        draws = res.sample(20000, rng=0)
+        self.assertEqual(draws.shape, (3, 20000))
+
+        np.testing.assert_allclose(np.median(draws, axis=1), [0, 1, 2], atol=0.05)
+        np.testing.assert_allclose(
+            np.mean(draws <= res.quantiles["quantile_0.25"][:, np.newaxis], axis=1),
+            0.25,
+            atol=0.02,
+        )
+        # Draws stay within the outermost stored quantiles
+        self.assertTrue(np.all(draws >= res.quantiles["quantile_0.1"][:, np.newaxis]))
+
+    def test_sample_is_reproducible_across_chunk_sizes(self):
+        res = self._normal_result()
+        draws = res.sample(100, rng=np.random.default_rng(1))
+        np.testing.assert_array_equal(draws, res.sample(100, rng=1, max_bytes=100))
+        self.assertEqual(res.sample(0, rng=1).shape, (3, 0))
+        with self.assertRaises(ValueError):
+            res.sample(-1)
+
+    def test_sample_stays_within_max_bytes(self):
+        center = np.zeros(10000)
+        res = RegressionPredictResult(
+            {
+                "mean": center,
+                "median": center,
+                "mode": center,
+                **{f"quantile_{level}": center + level for level in (0.1, 0.5, 0.9)},
+            }
+        )
+        max_bytes = 1 << 22
+        tracemalloc.start()
+        try:
+            draws = res.sample(200, rng=0, max_bytes=max_bytes)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # The sorted quantile values are allocated once besides the draws
+        self.assertLess(peak - draws.nbytes, max_bytes + 2 * center.nbytes * 4)
+
+    def test_concat(self):
+        first = RegressionPredictResult(self.pred_res)
+        reordered = {k: self.pred_res[k] * 10 for k in reversed(list(self.pred_res))}
+        second = RegressionPredictResult(reordered)
+        lists = RegressionPredictResult(self.pred_res_serialized_ref)
+
+        res = RegressionPredictResult.concat([first, second, lists])
+        self.assertEqual(len(res), 9)
+        self.assertIs(res.val_type, np.ndarray)
+        self.assertEqual(list(res.quantiles), list(first.quantiles))
+        for key, value in self.pred_res.items():
+            expected = np.concatenate([value, value * 10, value])
+            np.testing.assert_array_equal(
+                RegressionPredictResult.to_basic_representation(res)[key], expected
+            )
+
+        with self.assertRaises(ValueError):
+            RegressionPredictResult.concat([])
+        with self.assertRaises(ValueError):
+            RegressionPredictResult.concat(
+                [
+                    first,
+                    RegressionPredictResult(
+                        {**self.pred_res, "quantile_0.5": np.array([1, 2, 3])}
+                    ),
+                ]
+            )
+
+    def test_slicing_returns_views(self):
+        res = RegressionPredictResult(self.pred_res)
+        self.assertEqual(len(res), 3)
+
+        tail = res[1:]
+        self.assertEqual(len(tail), 2)
+        np.testing.assert_array_equal(tail.mean, [2, 3])
+        np.testing.assert_array_equal(tail.quantiles["quantile_0.75"], [6, 7])
+        self.assertTrue(np.shares_memory(tail.mean, res.mean))
+        self.assertTrue(np.shares_memory(tail.quantile_values, res.quantile_values))
+
+        last = res[-1]
+        self.assertEqual(len(last), 1)
+        np.testing.assert_array_equal(last.quantiles["quantile_0.25"], [6])
+        with self.assertRaises(IndexError):
+            res[3]
+
+        lists = RegressionPredictResult(self.pred_res_serialized_ref)[:2]
+        self.assertIs(lists.val_type, list)
+        self.assertEqual(lists.quantiles["quantile_0.25"], [4, 5])
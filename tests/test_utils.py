@@ -1,11 +1,30 @@
+import gzip
+import tempfile
 import unittest
 from io import BytesIO
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import scipy.sparse
 
+from tabpfn_common_utils.serialization import (
+    BufferPool,
+    FrameSchema,
+    PayloadCache,
+    decompress_payload,
+)
+from tabpfn_common_utils.serialization.arrow import _HAS_PYARROW
 from tabpfn_common_utils.utils import (
+    deserialize_from_formatted_bytes,
+    fingerprint,
+    iter_csv_formatted_bytes,
+    read_schema,
+    serialize_delta_to_formatted_bytes,
     serialize_to_csv_formatted_bytes,
+    serialize_to_formatted_bytes,
+    serialize_to_pooled_buffer,
+    to_httpx_post_file_format,
     assert_y_pred_proba_is_valid,
     shape_of,
 )
@@ -27,6 +46,401 @@ class TestDataSerialization(unittest.TestCase):
         data_recovered = pd.read_csv(BytesIO(csv_bytes), delimiter=",")
         pd.testing.assert_frame_equal(test_data, data_recovered)
 
+    def test_iter_csv_formatted_bytes_matches_full_serialization(self):
+        rng = np.random.RandomState(0)
+        test_data = [
+            rng.rand(25, 4),
+            pd.DataFrame(rng.rand(25, 3), columns=pd.Index(["a", "b", "c"])),
+            pd.Series(rng.rand(25), name="target"),
+        ]
+        for data in test_data:
+            chunks = list(iter_csv_formatted_bytes(data, chunk_rows=10))
+            self.assertEqual(len(chunks), 3)
+            self.assertEqual(b"".join(chunks), serialize_to_csv_formatted_bytes(data))
+
+    def test_iter_csv_formatted_bytes_formats_temporal_columns_alike(self):
+        # Only the second chunk has a time of day
+        test_data = pd.DataFrame(
+            {
+                "t": pd.to_datetime(
+                    ["2020-01-01 00:00", "2020-01-02 00:00", "2020-01-03 12:00"]
+                ),
+                "d": pd.to_timedelta(["1 days", "2 days", "3 days 04:00:00"]),
+                "x": [1.5, 2.5, 3.5],
+            }
+        )
+        for data in (test_data, test_data["t"]):
+            chunks = list(iter_csv_formatted_bytes(data, chunk_rows=2))
+            self.assertEqual(len(chunks), 2)
+            self.assertEqual(b"".join(chunks), serialize_to_csv_formatted_bytes(data))
+        chunk = next(iter_csv_formatted_bytes(test_data, chunk_rows=2))
+        self.assertIn(b"2020-01-01 00:00:00,1 days 00:00:00", chunk)
+
+    def test_serialize_mixed_dataframe_to_csv_formatted_bytes(self):
+        test_data = pd.DataFrame(
+            {
+                "f64": [0.1, np.nan, 1e-7],
+                "f32": np.array([0.1, 0.2, 0.3], dtype=np.float32),
+                "int": [1, 2, 3],
+                "str": ["a", "b,c", "d"],
+            }
+        )
+        for columns in (["f64"], ["f64", "f32"], list(test_data.columns)):
+            for float_precision in (None, 6):
+                float_format = None if float_precision is None else "%.6g"
+                expected = test_data[columns].to_csv(
+                    index=False, float_format=float_format
+                )
+                csv_bytes = serialize_to_csv_formatted_bytes(
+                    test_data[columns], float_precision=float_precision
+                )
+                self.assertEqual(csv_bytes, expected.encode("utf-8"))
+
+    def test_serialize_in_parallel_is_deterministic(self):
+        test_data = pd.DataFrame(np.random.RandomState(0).rand(100, 4))
+        self.assertEqual(
+            serialize_to_csv_formatted_bytes(test_data, n_jobs=2),
+            serialize_to_csv_formatted_bytes(test_data),
+        )
+
+    def test_serialize_with_invalid_float_precision_raises_error(self):
+        with self.assertRaises(ValueError):
+            serialize_to_csv_formatted_bytes(np.zeros((2, 2)), float_precision=0)
+
+    def test_iter_csv_formatted_bytes_empty_data_yields_header(self):
+        test_data = pd.DataFrame(columns=pd.Index(["a", "b"]))
+        chunks = list(iter_csv_formatted_bytes(test_data))
+        self.assertEqual(chunks, [serialize_to_csv_formatted_bytes(test_data)])
+
+    def test_iter_csv_formatted_bytes_invalid_input_raises_error(self):
+        with self.assertRaises(TypeError):
+            iter_csv_formatted_bytes([[1, 2], [3, 4]])  # type: ignore[arg-type]
+        with self.assertRaises(ValueError):
+            iter_csv_formatted_bytes(np.zeros((2, 2)), chunk_rows=0)
+
+
+class TestFormattedSerialization(unittest.TestCase):
+    test_data = pd.DataFrame(
+        np.random.RandomState(0).rand(50, 4), columns=pd.Index(["a", "b", "c", "d"])
+    )
+
+    def test_csv_format_matches_csv_serializer(self):
+        self.assertEqual(
+            serialize_to_formatted_bytes(self.test_data, format="csv"),
+            serialize_to_csv_formatted_bytes(self.test_data),
+        )
+
+    def test_binary_format_roundtrip(self):
+        payload = serialize_to_formatted_bytes(self.test_data, format="binary")
+        self.assertLess(
+            len(payload), len(serialize_to_csv_formatted_bytes(self.test_data))
+        )
+        pd.testing.assert_frame_equal(
+            deserialize_from_formatted_bytes(payload), self.test_data
+        )
+
+    def test_csv_format_roundtrip(self):
+        payload = serialize_to_formatted_bytes(self.test_data)
+        pd.testing.assert_frame_equal(
+            deserialize_from_formatted_bytes(payload), self.test_data, check_exact=True
+        )
+
+    @unittest.skipUnless(_HAS_PYARROW, "pyarrow is not installed")
+    def test_arrow_format_roundtrip(self):
+        payload = serialize_to_formatted_bytes(self.test_data, format="arrow")
+        pd.testing.assert_frame_equal(
+            deserialize_from_formatted_bytes(payload), self.test_data
+        )
+
+    def test_deserialize_with_schema_returns_array(self):
+        schema = FrameSchema.from_data(self.test_data)
+        for format in ("csv", "binary", "arrow"):
+            if format == "arrow" and not _HAS_PYARROW:
+                continue
+            payload = serialize_to_formatted_bytes(self.test_data, format=format)
+            decoded = deserialize_from_formatted_bytes(
+                memoryview(payload), schema=schema
+            )
+            np.testing.assert_array_equal(decoded, self.test_data.to_numpy())
+
+    def test_sparse_roundtrip(self):
+        dense = self.test_data.to_numpy()
+        matrix = scipy.sparse.csr_matrix(np.where(dense > 0.8, dense, 0.0))
+        self.assertEqual(
+            serialize_to_csv_formatted_bytes(matrix),
+            serialize_to_csv_formatted_bytes(matrix.toarray()),
+        )
+        self.assertEqual(
+            b"".join(iter_csv_formatted_bytes(matrix, chunk_rows=7)),
+            serialize_to_csv_formatted_bytes(matrix),
+        )
+        payload = serialize_to_formatted_bytes(matrix, format="binary")
+        np.testing.assert_array_equal(
+            deserialize_from_formatted_bytes(payload).sparse.to_dense(),
+            matrix.toarray(),
+        )
+        with self.assertRaises(TypeError):
+            serialize_to_formatted_bytes(matrix, format="arrow")
+        with self.assertRaises(TypeError):
+            fingerprint(matrix)  # type: ignore[arg-type]
+
+    @unittest.skipUnless(_HAS_PYARROW, "pyarrow is not installed")
+    def test_arrow_table_input(self):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(self.test_data, preserve_index=False)
+        self.assertEqual(
+            serialize_to_csv_formatted_bytes(table),
+            serialize_to_csv_formatted_bytes(self.test_data),
+        )
+        self.assertEqual(fingerprint(table), fingerprint(self.test_data))
+        pd.testing.assert_frame_equal(
+            deserialize_from_formatted_bytes(
+                serialize_to_formatted_bytes(table, format="arrow")
+            ),
+            self.test_data,
+        )
+
+    def test_delta_only_contains_appended_rows(self):
+        base = self.test_data.iloc[:40]
+        first = serialize_delta_to_formatted_bytes(base)
+        self.assertFalse(first.is_delta)
+        self.assertEqual(first.fingerprint, fingerprint(base))
+
+        delta = serialize_delta_to_formatted_bytes(
+            self.test_data, first.fingerprint, first.n_rows
+        )
+        self.assertTrue(delta.is_delta)
+        self.assertEqual(delta.start_row, 40)
+        pd.testing.assert_frame_equal(
+            pd.concat(
+                [
+                    deserialize_from_formatted_bytes(first.payload),
+                    deserialize_from_formatted_bytes(delta.payload),
+                ],
+                ignore_index=True,
+            ),
+            self.test_data,
+        )
+
+        changed = self.test_data.copy()
+        changed.iloc[0, 0] = -1.0
+        fallback = serialize_delta_to_formatted_bytes(
+            changed, delta.fingerprint, delta.n_rows, format="binary"
+        )
+        self.assertFalse(fallback.is_delta)
+        pd.testing.assert_frame_equal(
+            deserialize_from_formatted_bytes(fallback.payload), changed
+        )
+
+    def test_dictionary_encoded_roundtrip(self):
+        data = self.test_data.assign(
+            color=pd.Categorical(["red", "green"] * 25), name=["x", "y"] * 25
+        )
+        for format in ("csv", "binary"):
+            payload = serialize_to_formatted_bytes(
+                data, format=format, dictionary_encode=True
+            )
+            pd.testing.assert_frame_equal(
+                deserialize_from_formatted_bytes(payload), data
+            )
+
+        self.assertEqual(
+            b"".join(
+                iter_csv_formatted_bytes(data, chunk_rows=7, dictionary_encode=True)
+            ),
+            serialize_to_csv_formatted_bytes(data, dictionary_encode=True),
+        )
+
+    def test_object_columns_keep_their_dtype(self):
+        data = self.test_data.assign(
+            name=pd.Series(["x", np.nan, "y"] * 16 + ["x", "y"], dtype=object),
+            text=["x", "y"] * 25,
+        )
+        for format in ("csv", "binary", "arrow"):
+            if format == "arrow" and not _HAS_PYARROW:
+                continue
+            payload = serialize_to_formatted_bytes(
+                data, format=format, dictionary_encode=True
+            )
+            decoded = deserialize_from_formatted_bytes(payload)
+            self.assertEqual(decoded["name"].dtype, object)
+            self.assertEqual(decoded["text"].dtype, data["text"].dtype)
+            pd.testing.assert_frame_equal(decoded, data)
+
+    def test_schema_roundtrip(self):
+        data = self.test_data.assign(
+            flag=[True, False] * 25,
+            count=pd.array([1, None] * 25, dtype="Int64"),
+            small=self.test_data.iloc[:, 0].astype(np.float32),
+            time=pd.date_range("2024-01-01", periods=50, freq="h"),
+            color=pd.Categorical(["red", "green"] * 25),
+        )
+        payload = serialize_to_formatted_bytes(
+            data, include_schema=True, dictionary_encode=True
+        )
+        pd.testing.assert_frame_equal(deserialize_from_formatted_bytes(payload), data)
+        self.assertEqual(
+            b"".join(
+                iter_csv_formatted_bytes(
+                    data, chunk_rows=7, dictionary_encode=True, include_schema=True
+                )
+            ),
+            payload,
+        )
+
+        schema = FrameSchema.from_data(data)
+        formats = ("csv", "binary", "arrow") if _HAS_PYARROW else ("csv", "binary")
+        for format in formats:
+            payload = serialize_to_formatted_bytes(
+                data.drop(columns="count"), format=format, include_schema=True
+            )
+            read = read_schema(payload)
+            assert read is not None
+            with self.assertRaises(ValueError):
+                schema.check_compatible(read)
+            read.check_compatible(FrameSchema.from_data(data.drop(columns="count")))
+
+        self.assertIsNone(read_schema(serialize_to_csv_formatted_bytes(data)))
+
+    def test_reduced_precision_roundtrip(self):
+        for format in ("csv", "binary"):
+            payload = serialize_to_formatted_bytes(
+                self.test_data, format=format, precision="float32"
+            )
+            self.assertLess(
+                len(payload), len(serialize_to_formatted_bytes(self.test_data, format))
+            )
+            decoded = deserialize_from_formatted_bytes(payload)
+            pd.testing.assert_frame_equal(
+                decoded.astype(np.float64), self.test_data, rtol=1e-6
+            )
+
+    def test_cached_serialization(self):
+        cache = PayloadCache()
+        payload = serialize_to_formatted_bytes(self.test_data, "binary", cache=cache)
+        self.assertEqual(
+            serialize_to_formatted_bytes(self.test_data.copy(), "binary", cache=cache),
+            payload,
+        )
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # Other options and other data are serialized again
+        serialize_to_formatted_bytes(
+            self.test_data, "binary", compression="gzip", cache=cache
+        )
+        changed = self.test_data.copy()
+        changed.iloc[0, 0] = -1.0
+        self.assertEqual(
+            serialize_to_csv_formatted_bytes(changed, cache=cache),
+            serialize_to_csv_formatted_bytes(changed),
+        )
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_cached_serialization_of_categoricals(self):
+        cache = PayloadCache()
+        first = pd.DataFrame({"c": pd.Categorical(["x", "y"], categories=["x", "y"])})
+        second = pd.DataFrame(
+            {"c": pd.Categorical(["x", "y"], categories=["y", "x", "z"])}
+        )
+        serialize_to_formatted_bytes(first, "binary", cache=cache)
+        decoded = deserialize_from_formatted_bytes(
+            serialize_to_formatted_bytes(second, "binary", cache=cache)
+        )
+        self.assertEqual(list(decoded["c"].cat.categories), ["y", "x", "z"])
+
+    def test_pooled_serialization(self):
+        pool = BufferPool()
+        for format in ("csv", "binary"):
+            view = serialize_to_pooled_buffer(
+                self.test_data, pool, format, chunk_rows=7
+            )
+            self.assertEqual(
+                bytes(view), serialize_to_formatted_bytes(self.test_data, format)
+            )
+            pool.release(view)
+
+        allocations = pool.allocations
+        for format in ("csv", "binary"):
+            pool.release(serialize_to_pooled_buffer(self.test_data, pool, format))
+        self.assertEqual(pool.allocations, allocations)
+
+        with self.assertRaises(ValueError):
+            serialize_to_pooled_buffer(self.test_data, pool, "arrow")  # type: ignore[arg-type]
+
+    def test_float_precision_requires_csv_format(self):
+        with self.assertRaises(ValueError):
+            serialize_to_formatted_bytes(
+                self.test_data, format="binary", float_precision=6
+            )
+
+    def test_compressed_roundtrip(self):
+        for format in ("csv", "binary"):
+            payload = serialize_to_formatted_bytes(
+                self.test_data, format=format, compression="gzip", n_jobs=2
+            )
+            pd.testing.assert_frame_equal(
+                deserialize_from_formatted_bytes(payload, compression="gzip"),
+                self.test_data,
+            )
+
+    def test_fingerprint_is_layout_independent(self):
+        array = self.test_data.to_numpy()
+        self.assertEqual(fingerprint(array), fingerprint(np.asfortranarray(array)))
+        self.assertNotEqual(fingerprint(array), fingerprint(self.test_data))
+        with self.assertRaises(TypeError):
+            fingerprint(array.tolist())  # type: ignore[arg-type]
+
+    def test_unknown_format_raises_error(self):
+        with self.assertRaises(ValueError):
+            serialize_to_formatted_bytes(self.test_data, format="xml")  # type: ignore[arg-type]
+
+
+class TestHttpxPostFileFormat(unittest.TestCase):
+    def test_uncompressed_files(self):
+        files = to_httpx_post_file_format([("x_file", "x.csv", b"a,b\n1,2\n")])
+        self.assertEqual(files, {"x_file": ("x.csv", b"a,b\n1,2\n")})
+
+    def test_compressed_files_carry_content_encoding(self):
+        content = b"a,b\n1,2\n" * 1000
+        files = to_httpx_post_file_format(
+            [("x_file", "x.csv", content)], compression="gzip"
+        )
+        filename, compressed, content_type, headers = files["x_file"]
+        self.assertEqual(filename, "x.csv")
+        self.assertEqual(content_type, "text/csv")
+        self.assertEqual(headers, {"Content-Encoding": "gzip"})
+        self.assertEqual(gzip.decompress(compressed), content)
+
+    def test_streamed_files(self):
+        content = b"a,b\n1,2\n" * 1000
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "x.csv"
+            path.write_bytes(content)
+            files = to_httpx_post_file_format(
+                [
+                    ("path_file", "x.csv", path),
+                    ("view_file", "x.csv", memoryview(content)),
+                    ("chunks_file", "x.csv", iter([content[:5], content[5:]])),
+                ]
+            )
+            for filename, stream in files.values():
+                self.assertEqual(filename, "x.csv")
+                self.assertEqual(stream.read(), content)
+
+    def test_streamed_files_are_compressed_as_read(self):
+        content = b"a,b\n1,2\n" * 1000
+        for compression in ("gzip", "zlib", "lzma"):
+            files = to_httpx_post_file_format(
+                [("x_file", "x.csv", BytesIO(content))], compression=compression
+            )
+            _, stream, _, _ = files["x_file"]
+            self.assertEqual(decompress_payload(stream.read(), compression), content)
+
+    def test_text_content_raises_error(self):
+        with self.assertRaises(TypeError):
+            to_httpx_post_file_format([("x_file", "x.csv", "a,b\n")])  # type: ignore[list-item]
+
 
 class TestAssertYPredProbaIsValid(unittest.TestCase):
     x_test = pd.DataFrame([[1, 2, 3], [4, 5, 6]])
@@ -121,6 +535,9 @@ class TestShapeOf(unittest.TestCase):
         rng = range(5)
         self.assertEqual(shape_of(rng), (5, 1))
 
+    def test_scipy_sparse_matrix(self):
+        self.assertEqual(shape_of(scipy.sparse.csr_matrix((5, 3))), (5, 3))
+
     def test_1d_array_edge_case(self):
         # This tests the condition where shape[1] > 1 would exclude arrays like (100, 1)
         # These should be treated as having 1 column, not 0 columns